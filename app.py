@@ -1,124 +1,78 @@
-import csv
+import base64
+import functools
+import os
 from datetime import datetime, timedelta
-from gc import freeze
-from mimetypes import init
 
-import pandas
-import pip
-import streamlit
 import streamlit as st
-import base64
 
-from gitdb.db import git
-from packaging import requirements
+from concurrency import ConflictError
+from event_manager import EventManager
+from events import FREQUENCIES, Recurrence
+from reminders import LogSink, ReminderScheduler, enable_reminder_log
+from timeframes import TIMEFRAMES
 
 
-# Function to encode an image into base64
-def get_base64_image(image_path):
+IMAGE_TYPES = {'.avif': 'image/avif', '.webp': 'image/webp', '.png': 'image/png', '.jpg': 'image/jpeg',
+               '.jpeg': 'image/jpeg'}
+# Smaller encodings tried next to the requested image, e.g. pinguin.avif for pinguin.png
+IMAGE_VARIANTS = ['.avif', '.webp']
+
+
+# Function to encode an image into base64, once per file version
+@functools.lru_cache(maxsize=32)
+def _encode_image(image_path, mtime_ns):
     with open(image_path, "rb") as img_file:
         return base64.b64encode(img_file.read()).decode()
 
-# Class for Event and EventManager
-class Event:
-    def __init__(self, name, date, comments, category, notifications):
-        self.name = name
-        self.date = date
-        self.comments = comments
-        self.category = category
-        self.notifications = notifications
-
-    def to_dict(self):
-        return {
-            'name': self.name,
-            'date': self.date.strftime('%d-%m-%Y %H:%M'),
-            'comments': self.comments,
-            'category': self.category,
-            'notifications': self.notifications
-        }
 
-class EventManager:
-    def __init__(self, filename='events.csv'):
-        self.filename = filename
-        self.events = self.load_events()
-
-    def load_events(self):
-        events = []
-        try:
-            with open(self.filename, mode='r', newline='') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    row['date'] = datetime.strptime(row['date'], '%d-%m-%Y %H:%M')
-                    events.append(
-                        Event(row['name'], row['date'], row['comments'], row['category'], row['notifications']))
-        except FileNotFoundError:
-            pass
-        return events
-
-    def save_events(self):
-        with open(self.filename, mode='w', newline='') as file:
-            writer = csv.DictWriter(file, fieldnames=['name', 'date', 'comments', 'category', 'notifications'])
-            writer.writeheader()
-            for event in self.events:
-                writer.writerow(event.to_dict())
-
-    def add_event(self, name, date, comments, category, notifications):
-        event = Event(name, date, comments, category, notifications)
-        self.events.append(event)
-        self.save_events()
-
-    def remove_event(self, index):
-        """Method to remove an event by its index."""
-        if 0 <= index < len(self.events):
-            self.events.pop(index)
-            self.save_events()
-
-    def filter_events(self, timeframe="today", category=""):
-        now = datetime.now()
-        filtered_events = []
-
-        if timeframe == "today":
-            start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            end = start + timedelta(days=1)
-        elif timeframe == "this_week":
-            start = now - timedelta(days=now.weekday())  # Start of this week (Monday)
-            end = start + timedelta(weeks=1)
-        elif timeframe == "this_month":
-            start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            end = (start.replace(month=start.month % 12 + 1, day=1) if start.month < 12 else start.replace(month=1, year=start.year+1))
-
-        # Filter events based on category and timeframe
-        for event in self.events:
-            if start <= event.date < end:
-                if category.lower() in event.category.lower() if category else True:
-                    filtered_events.append(event)
-
-        return filtered_events
-
-    def summarize_events(self, timeframe):
-        now = datetime.now()
-        summary = {}
-
-        # Define the time range based on the selected timeframe
-        if timeframe == "today":
-            start_time = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            end_time = now.replace(hour=23, minute=59, second=59, microsecond=999999)
-        elif timeframe == "this_week":
-            start_time = now - timedelta(days=now.weekday())  # Start of this week (Monday)
-            end_time = start_time + timedelta(days=6, hours=23, minutes=59, seconds=59)
-        elif timeframe == "this_month":
-            start_time = datetime(now.year, now.month, 1)  # First day of this month
-            end_time = datetime(now.year, now.month, 1) + timedelta(days=31)  # Rough end of the month
-            end_time = end_time.replace(hour=23, minute=59, second=59, microsecond=999999)
-
-        # Filter events within the time range
-        for event in self.events:
-            if start_time <= event.date <= end_time:
-                category = event.category
-                if category not in summary:
-                    summary[category] = 0
-                summary[category] += 1
-
-        return summary
+# Function to encode an image into base64
+def get_base64_image(image_path):
+    return _encode_image(image_path, os.stat(image_path).st_mtime_ns)
+
+
+# Function to pick the smallest available encoding of an image
+def find_image_variant(image_path):
+    stem = os.path.splitext(image_path)[0]
+    best = image_path
+    for extension in IMAGE_VARIANTS:
+        candidate = stem + extension
+        if os.path.exists(candidate) and os.path.getsize(candidate) < os.path.getsize(best):
+            best = candidate
+    return best
+
+
+# Function to get an <img> src: a static file URL when static serving is on, otherwise a cached data URI
+def get_image_src(image_path):
+    image_path = find_image_variant(image_path)
+    file_name = os.path.basename(image_path)
+    if st.get_option("server.enableStaticServing") and os.path.exists(os.path.join("static", file_name)):
+        return f"app/static/{file_name}"
+    image_type = IMAGE_TYPES.get(os.path.splitext(image_path)[1].lower(), 'image/jpeg')
+    return f"data:{image_type};base64,{get_base64_image(image_path)}"
+
+# One EventManager per storage file, shared by every rerun and browser session
+@st.cache_resource
+def _shared_event_manager(filename, storage):
+    # Writes go to a background thread so a rerun never waits for the disk, and
+    # a file watcher tells when other processes changed the events. The page's
+    # category filter matches any part of the category name.
+    manager = EventManager(filename, storage=storage, durability='async', watch=True, category_contains=True)
+    # One reminder thread per server process; reminders go to the server's stderr
+    enable_reminder_log()
+    manager.set_scheduler(ReminderScheduler([LogSink()]).start())
+    return manager
+
+
+# Function to get the shared EventManager, brought up to date with changes made by other processes
+def get_event_manager(filename='events.csv', storage='journal'):
+    manager = _shared_event_manager(filename, storage)
+    try:
+        manager.refresh()
+    except ConflictError as error:
+        # Raised by a background write; the reload shows the other session's version
+        st.warning(f"Some changes were not saved: {error}")
+    return manager
+
 
 # Page Functions
 def show_welcome_page(image_path):
@@ -153,12 +107,47 @@ def show_welcome_page(image_path):
                 st.warning("Please enter your name to proceed.")
 
     with col2:
-        encoded_image = get_base64_image(image_path1)
         st.markdown(
-            f'<img src="data:image/jpg;base64,{encoded_image}" alt="Penguin" style="width:100%; height:auto;">',
+            f'<img src="{get_image_src(image_path1)}" alt="Penguin" style="width:100%; height:auto;">',
             unsafe_allow_html=True,
         )
 
+PAGE_SIZES = [25, 50, 100, 250]
+
+
+def event_label(event):
+    return f"{event.id}: {event.name} - {event.date.strftime('%d-%m-%Y %H:%M')} - {event.category}"
+
+
+# Function to render events as one table widget instead of a write() per event
+def show_events(events):
+    st.dataframe([{'id': event.id, 'name': event.name, 'date': event.date, 'category': event.category,
+                   'comments': event.comments, 'notifications': event.notifications,
+                   'repeats': str(event.recurrence or '')} for event in events],
+                 hide_index=True, use_container_width=True)
+
+
+# Function to pick a timeframe: a named one, a number of days around today, or a custom date range
+def choose_timeframe():
+    choice = st.selectbox("Timeframe", TIMEFRAMES + ("last_7_days", "next_7_days", "last_30_days", "next_30_days",
+                                                     "custom range"))
+    if choice != "custom range":
+        return choice
+    first = st.date_input("From")
+    last = st.date_input("To (included)", value=first, min_value=first)
+    return first, last + timedelta(days=1)
+
+
+# Function to find events for a picker: the event with that id, then the best full-text matches
+def find_events(manager, query, limit=20):
+    matches = manager.search(query, limit)
+    if query.strip().isdigit():
+        event = manager.get_event(int(query))
+        if event is not None:
+            matches = [event] + [match for match in matches if match is not event]
+    return matches[:limit]
+
+
 def show_todo_page(image_path):
     st.markdown(
         """
@@ -174,10 +163,11 @@ def show_todo_page(image_path):
 
     with col1:
         st.subheader(f"Hello {st.session_state.get('name', 'User')}, welcome to your ToDo List!")
-        manager = EventManager()
+        manager = get_event_manager()
 
         option = st.selectbox("Select an option",
-                              ["Add Event", "Remove Event", "List Events", "Filter Events", "Summarize Events"])
+                              ["Add Event", "Remove Event", "List Events", "Filter Events", "Summarize Events",
+                               "Search Events"])
 
         if option == "Add Event":
             name = st.text_input("Event Name")
@@ -186,34 +176,51 @@ def show_todo_page(image_path):
             comments = st.text_input("Comments")
             category = st.text_input("Category")
             notifications = st.text_input("Notifications")
+            frequency = st.selectbox("Repeats", ("never",) + FREQUENCIES)
+            recurrence = None
+            if frequency != "never":
+                interval = st.number_input("Every how many days, weeks or months", min_value=1, value=1, step=1)
+                count = st.number_input("Number of occurrences (0 for no end)", min_value=0, value=0, step=1)
+                recurrence = Recurrence(frequency, int(interval), int(count) or None)
 
             if st.button("Add Event"):
                 event_date = datetime.combine(date, time)
-                manager.add_event(name, event_date, comments, category, notifications)
+                manager.add_event(name, event_date, comments, category, notifications, recurrence)
                 st.success("Event added successfully!")
 
         elif option == "Remove Event":
-            events = manager.events
-            if events:
-                event_names = [f"{idx}: {event.name} - {event.date.strftime('%d-%m-%Y %H:%M')} - {event.category}" for idx, event in enumerate(events)]
-                event_to_remove = st.selectbox("Select an event to remove", event_names)
-                index = int(event_to_remove.split(":")[0])
-                if st.button("Remove Event"):
-                    manager.remove_event(index)
-                    st.success("Event removed successfully!")
-            else:
-                st.write("No events found to remove.")
+            # Only the events matching the query are offered, never the whole list
+            query = st.text_input("Find the event to remove (id, or words from its name, comments or notifications)")
+            if query:
+                matches = find_events(manager, query)
+                if matches:
+                    labels = {event.id: event_label(event) for event in matches}
+                    event_id = st.selectbox("Select an event to remove", list(labels), format_func=labels.get)
+                    if st.button("Remove Event"):
+                        try:
+                            manager.remove_event(event_id)
+                        except KeyError:
+                            # Another session removed it since the matches were found
+                            st.warning("That event was already removed.")
+                        else:
+                            st.success("Event removed successfully!")
+                else:
+                    st.write("No events found to remove.")
 
         elif option == "List Events":
-            events = manager.events
-            if not events:
+            total = manager.count()
+            if not total:
                 st.write("No events found.")
             else:
-                for idx, event in enumerate(events):
-                    st.write(f"{idx}: {event.name} - {event.date.strftime('%d-%m-%Y %H:%M')} - {event.category}")
+                page_size = st.selectbox("Events per page", PAGE_SIZES, index=1)
+                pages = (total + page_size - 1) // page_size
+                page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1)
+                events = manager.list_page((page - 1) * page_size, page_size)
+                show_events(events)
+                st.caption(f"Page {page} of {pages} - {total} events by date")
 
         elif option == "Filter Events":
-            timeframe = st.selectbox("Timeframe", ["today", "this_week", "this_month"])
+            timeframe = choose_timeframe()
             category = st.text_input("Category (leave blank for all)")
 
             if st.button("Filter Events"):
@@ -221,11 +228,10 @@ def show_todo_page(image_path):
                 if not filtered_events:
                     st.write("No events found for the specified criteria.")
                 else:
-                    for event in filtered_events:
-                        st.write(f"{event.name} - {event.date.strftime('%d-%m-%Y %H:%M')} - {event.category}")
+                    show_events(filtered_events)
 
         elif option == "Summarize Events":
-            timeframe = st.selectbox("Timeframe", ["today", "this_week", "this_month"])
+            timeframe = choose_timeframe()
             if st.button("Summarize Events"):
                 summary = manager.summarize_events(timeframe)
                 if not summary:
@@ -234,13 +240,21 @@ def show_todo_page(image_path):
                     for category, count in summary.items():
                         st.write(f"{category}: {count} event(s)")
 
+        elif option == "Search Events":
+            query = st.text_input("Search names, comments and notifications (e.g. ooo)")
+            if query:
+                results = manager.search(query)
+                if not results:
+                    st.write("No events found.")
+                else:
+                    show_events(results)
+
         if st.button("Back to Welcome Page"):
             st.session_state["page"] = "welcome"
 
     with col2:
-        encoded_image = get_base64_image(image_path)
         st.markdown(
-            f'<img src="data:image/jpg;base64,{encoded_image}" alt="Penguin" style="width:100%; height:100%;">',
+            f'<img src="{get_image_src(image_path)}" alt="Penguin" style="width:100%; height:100%;">',
             unsafe_allow_html=True,
         )
 
@@ -0,0 +1,84 @@
+import atexit
+import threading
+
+
+# Runs storage writes on a daemon thread so callers do not wait for the disk.
+#
+# submit() queues an item and returns at once. The thread hands every item
+# queued since its last write to `write` in one call, so a burst of changes
+# costs one write. If `write` fails with an OSError the items are kept and
+# retried with the next submit; flush() waits for the queue to drain and
+# re-raises the last error.
+class BackgroundWriter:
+    def __init__(self, write, name='event-writer'):
+        self.write = write
+        self.pending = []
+        self.busy = False
+        self.error = None
+        # Set after a failed write; cleared by the next submit() or flush(), which retry
+        self.failed = False
+        self.closed = False
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+        # Daemon threads are killed at exit; write what is still queued first
+        atexit.register(self.close)
+
+    def submit(self, item):
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("writer is closed")
+            self.pending.append(item)
+            self.failed = False
+            self.condition.notify_all()
+
+    def has_pending(self):
+        with self.condition:
+            return bool(self.pending) or self.busy
+
+    def flush(self, timeout=None):
+        """Wait until everything submitted so far is written; returns False on timeout."""
+        with self.condition:
+            done = self.condition.wait_for(lambda: not (self.pending and not self.failed) and not self.busy,
+                                           timeout)
+            if self.error is not None:
+                error, self.error = self.error, None
+                self.failed = False
+                self.condition.notify_all()
+                raise error
+            return done
+
+    def close(self):
+        with self.condition:
+            if self.closed:
+                return
+        try:
+            self.flush()
+        finally:
+            with self.condition:
+                self.closed = True
+                self.condition.notify_all()
+            self.thread.join()
+            atexit.unregister(self.close)
+
+    def _run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.closed or (self.pending and not self.failed))
+                if self.closed:
+                    return
+                items, self.pending = self.pending, []
+                self.busy = True
+            try:
+                self.write(items)
+            except Exception as error:
+                with self.condition:
+                    if isinstance(error, OSError):
+                        # Keep the items so the next attempt includes them
+                        self.pending[:0] = items
+                        self.failed = True
+                    self.error = error
+            finally:
+                with self.condition:
+                    self.busy = False
+                    self.condition.notify_all()
@@ -0,0 +1,136 @@
+"""Load test for the event API: requests/second and latency percentiles.
+
+Start the API first, e.g. from the mysite directory:
+
+    uvicorn mysite.asgi:application --workers 1
+
+Each client thread keeps one HTTP connection open and sends a mix of list,
+filtered list, summary, create and delete requests for `--seconds`. The
+events it creates are removed again, so the storage ends up as it started.
+
+Usage: python benchmarks/bench_api.py [--url http://127.0.0.1:8000/api/events/] [--clients 8] [--seconds 10]
+"""
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+# (label, weight) of the request mix
+MIX = [('list', 4), ('filter', 3), ('summary', 2), ('create', 1), ('delete', 1)]
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Client:
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.path = parts.path
+        self.connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+        self.created = []
+
+    def request(self, method, path, body=None):
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        self.connection.request(method, self.path + path, body=None if body is None else json.dumps(body),
+                                headers=headers)
+        response = self.connection.getresponse()
+        data = response.read()
+        if response.status >= 400:
+            raise RuntimeError(f"{method} {path}: {response.status} {data[:200]!r}")
+        return json.loads(data) if data else None
+
+    def run(self, label, rng):
+        if label == 'list':
+            self.request('GET', f"?offset={rng.randrange(0, 200)}&limit=50")
+        elif label == 'filter':
+            day = rng.randrange(1, 28)
+            self.request('GET', f"?start=2025-01-{day:02d}T00:00&end=2025-01-{day + 1:02d}T00:00&category=work")
+        elif label == 'summary':
+            timeframe = rng.choice(['today', 'this_week', 'this_month', 'last_30_days'])
+            self.request('GET', f"summary/?timeframe={timeframe}")
+        elif label == 'create' or not self.created:
+            event = self.request('POST', '', {'name': 'load test', 'date': f"2025-01-{rng.randrange(1, 29):02d}T09:00",
+                                              'category': 'work'})
+            self.created.append(event['id'])
+            return 'create'
+        else:
+            self.request('DELETE', f"{self.created.pop()}/")
+        return label
+
+    def cleanup(self):
+        # The server may have dropped an idle connection; the next request reopens it
+        self.connection.close()
+        while self.created:
+            self.request('DELETE', f"{self.created.pop()}/")
+        self.connection.close()
+
+
+def worker(url, deadline, seed, latencies, errors):
+    client = Client(url)
+    rng = random.Random(seed)
+    labels = [label for label, weight in MIX for _ in range(weight)]
+    try:
+        while time.perf_counter() < deadline:
+            begin = time.perf_counter()
+            try:
+                label = client.run(rng.choice(labels), rng)
+            except (RuntimeError, OSError, http.client.HTTPException) as exc:
+                errors.append(str(exc))
+                client.connection.close()
+                continue
+            latencies[label].append(time.perf_counter() - begin)
+    finally:
+        client.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8000/api/events/')
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+
+    # Seed events to query, removed again at the end
+    seeder = Client(args.url)
+    seeded = seeder.request('POST', 'bulk/', {'events': [
+        {'name': f"seed {i}", 'date': f"2025-01-{i % 28 + 1:02d}T{i % 24:02d}:00",
+         'category': ('work', 'personal')[i % 2]} for i in range(1000)]})
+    seeder.created = [event['id'] for event in seeded['events']]
+
+    latencies = defaultdict(list)
+    errors = []
+    deadline = time.perf_counter() + args.seconds
+    threads = [threading.Thread(target=worker, args=(args.url, deadline, seed, latencies, errors))
+               for seed in range(args.clients)]
+    begin = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - begin
+    seeder.cleanup()
+
+    print(f"{args.clients} clients for {elapsed:.1f} s against {args.url}")
+    print(f"{'request':>8} {'count':>8} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    everything = []
+    for label, _ in MIX:
+        values = latencies[label]
+        everything += values
+        if values:
+            print(f"{label:>8} {len(values):>8} {len(values) / elapsed:>8.0f} "
+                  f"{percentile(values, 0.5) * 1000:>8.1f} {percentile(values, 0.99) * 1000:>8.1f}")
+    if everything:
+        print(f"{'all':>8} {len(everything):>8} {len(everything) / elapsed:>8.0f} "
+              f"{percentile(everything, 0.5) * 1000:>8.1f} {percentile(everything, 0.99) * 1000:>8.1f}")
+    if errors:
+        print(f"{len(errors)} failed request(s), e.g. {errors[0]}")
+
+
+if __name__ == '__main__':
+    main()
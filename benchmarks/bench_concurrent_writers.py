@@ -0,0 +1,126 @@
+"""Concurrent writers: throughput and lost-update check for every storage.
+
+Each writer has its own EventManager on the same storage (like separate
+Streamlit processes or CLI sessions). It adds events, edits every second one
+it added and removes every fifth, then the storage is reloaded and checked:
+every surviving event must be there exactly once with its last edit, and no
+removed event may come back.
+
+Usage: python benchmarks/bench_concurrent_writers.py [--writers 4] [--operations 100]
+       [--mode process|thread] [--storages csv journal sqlite]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from concurrency import ConflictError  # noqa: E402
+from event_manager import EventManager  # noqa: E402
+
+
+def run_writer(task):
+    """Run one writer; returns (expected {name: comments} of its surviving events, operations, conflicts)."""
+    filename, storage, database, durability, writer, operations = task
+    manager = EventManager(filename, storage=storage, database=database, durability=durability)
+    expected = {}
+    count = 0
+    conflicts = 0
+    for i in range(operations):
+        name = f"writer {writer} event {i}"
+        event = manager.add_event(name, datetime(2025, 1, 1) + timedelta(minutes=i), "", f"writer {writer}", "")
+        expected[name] = ''
+        count += 1
+        if i % 2 == 0:
+            # Only this writer touches its own events, so a conflict here is a bug
+            try:
+                manager.edit_event(event.id, comments=f"edited {i}")
+                expected[name] = f"edited {i}"
+            except ConflictError:
+                conflicts += 1
+            count += 1
+        if i % 5 == 0:
+            try:
+                manager.remove_event(event.id)
+                del expected[name]
+            except ConflictError:
+                conflicts += 1
+            count += 1
+    manager.flush()
+    return expected, count, conflicts
+
+
+def check(filename, storage, database, expected):
+    """Return a list of problems found in the storage after all writers finished."""
+    events = EventManager(filename, storage=storage, database=database).events
+    problems = []
+    ids = [event.id for event in events]
+    if len(ids) != len(set(ids)):
+        problems.append(f"{len(ids) - len(set(ids))} duplicate id(s)")
+    found = {}
+    for event in events:
+        if event.name in found:
+            problems.append(f"{event.name!r} stored twice")
+        found[event.name] = event.comments or ''
+    lost = [name for name in expected if name not in found]
+    resurrected = [name for name in found if name.startswith('writer ') and name not in expected]
+    stale = [name for name in expected if name in found and found[name] != expected[name]]
+    for label, names in (('lost', lost), ('resurrected', resurrected), ('lost edits', stale)):
+        if names:
+            problems.append(f"{len(names)} {label}, e.g. {names[0]!r}")
+    return problems
+
+
+def run(storage, args, tmp):
+    filename = os.path.join(tmp, f"{storage}.csv")
+    database = os.path.join(tmp, f"{storage}.sqlite3")
+    # A few events to start from, as a real file would have
+    EventManager(filename, storage=storage, database=database).add_events(
+        [(f"initial {i}", datetime(2024, 1, 1), "", "initial", "") for i in range(args.initial)])
+
+    tasks = [(filename, storage, database, args.durability, writer, args.operations)
+             for writer in range(args.writers)]
+    executor = ProcessPoolExecutor if args.mode == 'process' else ThreadPoolExecutor
+    begin = time.perf_counter()
+    with executor(args.writers) as pool:
+        results = list(pool.map(run_writer, tasks))
+    elapsed = time.perf_counter() - begin
+
+    expected = {}
+    for writer_expected, _, _ in results:
+        expected.update(writer_expected)
+    operations = sum(count for _, count, _ in results)
+    conflicts = sum(conflict for _, _, conflict in results)
+    problems = check(filename, storage, database, expected)
+    if conflicts:
+        problems.append(f"{conflicts} unexpected conflict(s)")
+    print(f"{storage:>8} {operations:>10} {elapsed:>9.2f} {operations / elapsed:>10.0f}  "
+          f"{'; '.join(problems) or 'ok'}")
+    return not problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--operations', type=int, default=100, help="events added per writer")
+    parser.add_argument('--initial', type=int, default=1000, help="events in the file before the writers start")
+    parser.add_argument('--mode', choices=('process', 'thread'), default='process')
+    parser.add_argument('--durability', choices=('sync', 'fsync', 'async'), default='sync')
+    parser.add_argument('--storages', nargs='+', choices=('csv', 'journal', 'sqlite'),
+                        default=['csv', 'journal', 'sqlite'])
+    args = parser.parse_args()
+
+    print(f"{args.writers} {args.mode} writer(s), {args.operations} adds each, durability={args.durability}")
+    print(f"{'storage':>8} {'mutations':>10} {'seconds':>9} {'ops/s':>10}  check")
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [run(storage, args, tmp) for storage in args.storages]
+    # Non-zero exit status if any update was lost
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Date parsing in load_events: datetime.strptime vs. the fixed-layout fast path.
+
+Usage: python benchmarks/bench_dates.py [--rows 200000] [--distinct 50000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fast_dates  # noqa: E402
+from fast_dates import DATE_FORMAT, parse_event_date, parse_event_dates  # noqa: E402
+from event_manager import EventManager  # noqa: E402
+
+
+def timed(label, function, baseline=None):
+    begin = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - begin
+    speed_up = f"{baseline / elapsed:>8.1f}x" if baseline else ''
+    print(f"{label:<34} {elapsed * 1000:>10.1f} ms {speed_up}")
+    return elapsed, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--distinct', type=int, default=50000, help="number of distinct date values")
+    args = parser.parse_args()
+
+    start = datetime(2024, 1, 1)
+    pool = [(start + timedelta(minutes=15 * i)).strftime(DATE_FORMAT) for i in range(args.distinct)]
+    texts = [random.choice(pool) for _ in range(args.rows)]
+
+    baseline, expected = timed("strptime", lambda: [datetime.strptime(text, DATE_FORMAT) for text in texts])
+    fast_dates._date_memo.clear()
+    _, scalar = timed("parse_event_date (cold memo)", lambda: [parse_event_date(text) for text in texts], baseline)
+    timed("parse_event_date (warm memo)", lambda: [parse_event_date(text) for text in texts], baseline)
+    _, bulk = timed("parse_event_dates (bulk)", lambda: parse_event_dates(texts), baseline)
+    assert scalar == expected and bulk == expected
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'events.csv')
+        with open(filename, mode='w', newline='') as file:
+            file.write('name,date,comments,category,notifications\n')
+            for i, text in enumerate(texts):
+                file.write(f"event {i},{text},,work,\n")
+        fast_dates._date_memo.clear()
+        timed(f"EventManager load ({args.rows} rows)", lambda: EventManager(filename))
+
+
+if __name__ == '__main__':
+    main()
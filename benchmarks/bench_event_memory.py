@@ -0,0 +1,65 @@
+"""Bytes per event: the old __dict__-based Event vs. the slotted, interned Event.
+
+Usage: python benchmarks/bench_event_memory.py [--events 1000000]
+"""
+import argparse
+import csv
+import gc
+import io
+import os
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from events import Event  # noqa: E402
+from fast_dates import parse_event_date  # noqa: E402
+
+
+# The Event class as it was before it became a slotted record
+class DictEvent:
+    def __init__(self, name, date, comments, category, notifications):
+        self.name = name
+        self.date = date
+        self.comments = comments
+        self.category = category
+        self.notifications = notifications
+
+
+def csv_rows(count):
+    """Rows as they come out of csv.DictReader, so every field is a fresh string."""
+    start = datetime(2024, 1, 1)
+    buffer = io.StringIO()
+    buffer.write('name,date,comments,category,notifications\n')
+    for i in range(count):
+        date = (start + timedelta(minutes=7 * i)).strftime('%d-%m-%Y %H:%M')
+        buffer.write(f"event {i},{date},,{('work', 'personal')[i % 2]},check if someone is ooo\n")
+    buffer.seek(0)
+    return csv.DictReader(buffer)
+
+
+def measure(event_class, count):
+    gc.collect()
+    tracemalloc.start()
+    events = [event_class(row['name'], parse_event_date(row['date']), row['comments'], row['category'],
+                          row['notifications']) for row in csv_rows(count)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del events
+    return current / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=1000000)
+    args = parser.parse_args()
+
+    before = measure(DictEvent, args.events)
+    after = measure(Event, args.events)
+    print(f"{'events':>10} {'dict Event (B)':>16} {'slotted Event (B)':>18} {'saving':>8}")
+    print(f"{args.events:>10} {before:>16.0f} {after:>18.0f} {1 - after / before:>7.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Mutation latency: full CSV rewrite vs. append-only journal.
+
+Usage: python benchmarks/bench_journal.py [--sizes 1000 100000 1000000] [--mutations 5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_manager import EventManager  # noqa: E402
+
+
+def write_events(filename, count):
+    start = datetime(2024, 1, 1)
+    with open(filename, mode='w', newline='') as file:
+        file.write('name,date,comments,category,notifications\n')
+        for i in range(count):
+            date = (start + timedelta(minutes=7 * i)).strftime('%d-%m-%Y %H:%M')
+            file.write(f"event {i},{date},some comment,{('work', 'personal')[i % 2]},check if someone is ooo\n")
+
+
+def time_mutations(manager, mutations):
+    timings = []
+    for i in range(mutations):
+        begin = time.perf_counter()
+        event = manager.add_event(f"bench {i}", datetime(2025, 1, 1), "", "work", "")
+        timings.append(time.perf_counter() - begin)
+        begin = time.perf_counter()
+        manager.remove_event(event.id)
+        timings.append(time.perf_counter() - begin)
+    return sum(timings) / len(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000])
+    parser.add_argument('--mutations', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'events':>10} {'csv rewrite (ms)':>18} {'journal (ms)':>14} {'speed-up':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            results = {}
+            for storage in ('csv', 'journal'):
+                filename = os.path.join(tmp, f"{storage}-{size}.csv")
+                write_events(filename, size)
+                manager = EventManager(filename, storage=storage)
+                # Keep compaction out of the measured window
+                if manager.journal is not None:
+                    manager.journal.compact_every = 2 * args.mutations + 1
+                results[storage] = time_mutations(manager, args.mutations) * 1000
+            print(f"{size:>10} {results['csv']:>18.3f} {results['journal']:>14.3f} "
+                  f"{results['csv'] / results['journal']:>9.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Parallel load scaling: EventManager load time with 1..N worker processes.
+
+Usage: python benchmarks/bench_parallel_load.py [--events 1000000] [--max-workers N] [--shards 0]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_manager import EventManager  # noqa: E402
+
+
+def write_events(filename, first, count):
+    start = datetime(2024, 1, 1)
+    with open(filename, mode='w', newline='') as file:
+        file.write('name,date,comments,category,notifications\n')
+        for i in range(first, first + count):
+            date = (start + timedelta(minutes=7 * i)).strftime('%d-%m-%Y %H:%M')
+            file.write(f"event {i},{date},some comment,{('work', 'personal')[i % 2]},check if someone is ooo\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=1000000)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--shards', type=int, default=0, help="write a directory of this many shards instead of one file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.shards:
+            path = tmp
+            per_shard = args.events // args.shards
+            for shard in range(args.shards):
+                write_events(os.path.join(tmp, f"events-{shard:03d}.csv"), shard * per_shard, per_shard)
+        else:
+            path = os.path.join(tmp, 'events.csv')
+            write_events(path, 0, args.events)
+
+        print(f"{'workers':>8} {'load (s)':>10} {'speed-up':>10}")
+        baseline = None
+        workers = 1
+        while workers <= args.max_workers:
+            begin = time.perf_counter()
+            manager = EventManager(path, workers=workers)
+            elapsed = time.perf_counter() - begin
+            assert len(manager.events) == (args.events // args.shards * args.shards if args.shards else args.events)
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>10.2f} {baseline / elapsed:>9.1f}x")
+            workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Repeating events: query cost inside a window versus the number of occurrences.
+
+Every repeating event started years before the queried window and repeats
+daily, weekly or monthly without end, so materializing the occurrences would
+mean millions of rows. The window queries should only pay for the
+occurrences inside the window, and the counts are checked against a brute
+force enumeration.
+
+Usage: python benchmarks/bench_recurrence.py [--events 10000] [--repeating 1000] [--years 20]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from events import FREQUENCIES, Event, minute_bounds  # noqa: E402
+from event_manager import EventManager  # noqa: E402
+
+
+def make_events(count, repeating, years, window_start):
+    first = window_start - timedelta(days=365 * years)
+    events = []
+    for i in range(count):
+        date = first + timedelta(minutes=i * 7919 % (60 * 24 * 365 * years))
+        recurrence = FREQUENCIES[i % len(FREQUENCIES)] if i < repeating else None
+        events.append(Event(f"event {i}", date, "", ('work', 'personal')[i % 2], "", id=i + 1, recurrence=recurrence))
+    return events
+
+
+def brute_force(events, low, high):
+    """Occurrences in [low, high), found by stepping through every occurrence from the first."""
+    total = 0
+    for event in events:
+        if event.recurrence is None:
+            total += low <= event.minutes < high
+            continue
+        n = 0
+        while (minutes := event.recurrence.occurrence(event.minutes, n)) < high:
+            total += minutes >= low
+            n += 1
+    return total
+
+
+def timed(label, function, runs=20):
+    best = None
+    for _ in range(runs):
+        begin = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - begin
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:>32} {best * 1000:>9.2f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=10000)
+    parser.add_argument('--repeating', type=int, default=1000)
+    parser.add_argument('--years', type=int, default=20)
+    args = parser.parse_args()
+
+    month_start, month_end = datetime(2025, 3, 1), datetime(2025, 4, 1)
+    events = make_events(args.events, args.repeating, args.years, month_start)
+    with tempfile.TemporaryDirectory() as directory:
+        manager = EventManager(os.path.join(directory, 'events.csv'), lazy=True)
+        manager.events = events
+
+        week_end = month_start + timedelta(days=7)
+        week = timed("iter_events (one week)", lambda: list(manager.iter_events(month_start, week_end)))
+        summary = timed("summarize_events (one month)", lambda: manager.summarize_events((month_start, month_end)))
+
+        expected_week = brute_force(events, *minute_bounds(month_start, week_end))
+        expected_month = brute_force(events, *minute_bounds(month_start, month_end))
+        assert len(week) == expected_week, (len(week), expected_week)
+        assert sum(summary.values()) == expected_month, (sum(summary.values()), expected_month)
+        assert all(a.minutes <= b.minutes for a, b in zip(week, week[1:])), "occurrences out of date order"
+        print(f"{len(week)} occurrences in the week and {expected_month} in the month match a brute-force "
+              f"expansion; {len(events)} events stored")
+
+
+if __name__ == '__main__':
+    main()
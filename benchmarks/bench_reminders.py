@@ -0,0 +1,57 @@
+"""Reminder scheduler scaling: reset, schedule, cancel and dispatch with millions of reminders.
+
+Usage: python benchmarks/bench_reminders.py [--events 1000000]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from events import Event  # noqa: E402
+from reminders import ReminderScheduler  # noqa: E402
+
+NOW = datetime(2025, 1, 1)
+
+
+def make_events(first, count):
+    return [Event(f"event {i}", NOW + timedelta(minutes=1 + i * 7919 % (60 * 24 * 365)), "", "work", "ping", id=i)
+            for i in range(first, first + count)]
+
+
+def timed(label, count, function):
+    begin = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - begin
+    print(f"{label:>28} {elapsed:>9.3f} s {elapsed / max(count, 1) * 1e6:>9.2f} us/op")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=1000000)
+    args = parser.parse_args()
+    changes = max(1, args.events // 10)
+
+    events = make_events(0, args.events)
+    extra = make_events(args.events, changes)
+    scheduler = ReminderScheduler(clock=lambda: NOW)
+
+    timed(f"reset ({args.events})", args.events, lambda: scheduler.reset(events))
+    timed(f"schedule ({changes})", changes, lambda: [scheduler.schedule(event) for event in extra])
+    timed(f"cancel ({changes})", changes, lambda: [scheduler.cancel(event.id) for event in events[::10]])
+    timed("next_due", 1, scheduler.next_due)
+
+    # A day's worth of reminders, then everything that is left
+    day = timed("pop_due (first day)", 1, lambda: scheduler.pop_due(NOW + timedelta(days=1)))
+    rest = timed("pop_due (everything else)", len(scheduler),
+                 lambda: scheduler.pop_due(NOW + timedelta(days=400)))
+    expected = args.events + changes - len(events[::10])
+    assert len(day) + len(rest) == expected, (len(day) + len(rest), expected)
+    print(f"{len(day) + len(rest)} reminders dispatched, none lost or repeated")
+
+
+if __name__ == '__main__':
+    main()
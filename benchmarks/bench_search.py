@@ -0,0 +1,68 @@
+"""Full-text search latency: TextIndex build time and query p50/p99 at N events.
+
+The vocabulary grows with the number of events (one distinct word per five
+events), as it does for real free text, so the build time shows how indexing
+scales with new words. Exits with status 1 if the p99 or the common-word query
+is over the target.
+
+Usage: python benchmarks/bench_search.py [--events 1000000] [--queries 200] [--target-ms 50]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from events import Event  # noqa: E402
+from text_index import TextIndex  # noqa: E402
+
+NOTIFICATIONS = ["check if someone is ooo", "don't forget to commit code file", "use several options", ""]
+
+
+def make_events(count, vocabulary):
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        name = ' '.join(random.choices(vocabulary, k=3))
+        comments = ' '.join(random.choices(vocabulary, k=6))
+        yield Event(name, start + timedelta(minutes=7 * i), comments, 'work', random.choice(NOTIFICATIONS))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=1000000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--target-ms', type=float, default=50.0, help="p99 and common-word query latency target")
+    args = parser.parse_args()
+
+    random.seed(0)
+    vocabulary = [f"{random.choice('bcdfghklmnprstvw')}{random.choice('aeiou')}{random.choice('lmnrst')}{i}"
+                  for i in range(max(1000, args.events // 5))]
+    begin = time.perf_counter()
+    index = TextIndex(make_events(args.events, vocabulary))
+    print(f"indexed {args.events} events in {time.perf_counter() - begin:.1f} s "
+          f"({len(index.vocabulary)} distinct words)")
+
+    queries = [random.choice(vocabulary) for _ in range(args.queries // 2)]
+    queries += [random.choice(vocabulary)[:4] + ' ' + random.choice(vocabulary) for _ in range(args.queries // 2)]
+    timings = []
+    for query in queries:
+        begin = time.perf_counter()
+        index.search(query)
+        timings.append((time.perf_counter() - begin) * 1000)
+    timings.sort()
+    p50 = timings[len(timings) // 2]
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(f"query latency: p50 {p50:.2f} ms, p99 {p99:.2f} ms (target p99 <= {args.target_ms:.0f} ms)")
+    # A word in a quarter of all events is the worst case: every match has to be ranked
+    begin = time.perf_counter()
+    index.search('ooo')
+    common = (time.perf_counter() - begin) * 1000
+    print(f"common-word query 'ooo': {common:.1f} ms (target <= {args.target_ms:.0f} ms)")
+    return 0 if p99 <= args.target_ms and common <= args.target_ms else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
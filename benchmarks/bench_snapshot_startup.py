@@ -0,0 +1,85 @@
+"""Startup time: events.csv versus the memory-mapped binary snapshot.
+
+Times opening the events and answering a first one-month query, for a fully
+loaded EventManager and a lazy one over each format, and for a bare
+EventSnapshot. Also checks both formats give the same answers.
+
+Usage: python benchmarks/bench_snapshot_startup.py [--events 1000000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from snapshot import EventSnapshot, csv_to_snapshot  # noqa: E402
+from event_manager import EventManager  # noqa: E402
+
+START = datetime(2024, 1, 1)
+
+
+def write_events(filename, count):
+    with open(filename, mode='w', newline='') as file:
+        file.write('name,date,comments,category,notifications,id\n')
+        for i in range(count):
+            date = (START + timedelta(minutes=7 * i)).strftime('%d-%m-%Y %H:%M')
+            file.write(f"event {i},{date},some comment,{('work', 'personal', 'gym')[i % 3]},"
+                       f"check if someone is ooo,{i + 1}\n")
+
+
+def timed(function):
+    begin = time.perf_counter()
+    result = function()
+    return time.perf_counter() - begin, result
+
+
+def count_categories(events):
+    summary = {}
+    for event in events:
+        summary[event.category] = summary.get(event.category, 0) + 1
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=1000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_filename = os.path.join(tmp, 'events.csv')
+        snapshot_filename = os.path.join(tmp, 'events.evsnap')
+        write_events(csv_filename, args.events)
+        elapsed, _ = timed(lambda: csv_to_snapshot(csv_filename, snapshot_filename))
+        print(f"{args.events} events: csv {os.path.getsize(csv_filename) / 1e6:.1f} MB, "
+              f"snapshot {os.path.getsize(snapshot_filename) / 1e6:.1f} MB (converted in {elapsed:.2f} s)")
+
+        start = START + timedelta(days=31)
+        end = start + timedelta(days=30)
+        cases = [
+            ('csv, full load', lambda: EventManager(csv_filename).events_between(start, end)),
+            ('snapshot, full load', lambda: EventManager(snapshot_filename).events_between(start, end)),
+            ('csv, lazy', lambda: EventManager(csv_filename, lazy=True).events_between(start, end)),
+            ('snapshot, lazy', lambda: EventManager(snapshot_filename, lazy=True).events_between(start, end)),
+        ]
+        print(f"{'':>22} {'open + first query (s)':>24}")
+        answers = []
+        for label, case in cases:
+            elapsed, events = timed(case)
+            answers.append([event.to_dict() for event in events])
+            print(f"{label:>22} {elapsed:>24.3f}")
+
+        def open_and_summarize():
+            with EventSnapshot(snapshot_filename) as snapshot:
+                return snapshot.summarize(start, end)
+        elapsed, summary = timed(open_and_summarize)
+        print(f"{'EventSnapshot summary':>22} {elapsed:>24.4f}")
+
+        assert all(answer == answers[0] for answer in answers), "formats disagree"
+        assert summary == count_categories(EventManager(csv_filename, lazy=True).iter_events(start, end))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Cold-start import time of the app modules, with a budget.
+
+Imports each module in a fresh interpreter under `python -X importtime` and
+reports its cumulative import time. For app.py the time spent importing
+Streamlit itself is left out: `streamlit run` has already imported it before
+it runs the app. Exits with status 1 if a module goes over its budget, or if
+one of the heavy modules that should only load on demand is imported at
+startup.
+
+Usage: python benchmarks/bench_startup.py [--budget-ms 60] [--runs 5] [--modules app todoll]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Only needed on some code paths; importing them at startup is a regression
+LAZY_MODULES = ['numpy', 'pandas', 'multiprocessing', 'concurrent.futures', 'ctypes', 'pip', 'gitdb', 'packaging']
+# Already imported by the host process before our module runs
+HOST_MODULES = {'app': 'streamlit'}
+
+
+def import_times(module):
+    """{imported module: cumulative microseconds} for a cold import of `module`."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=ROOT,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed: {result.stderr.strip().splitlines()[-1]}")
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # A module is only reported the first time it is imported
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def measure(module, runs):
+    """Best of `runs`: (own import ms, imported modules that should have been lazy)."""
+    best = None
+    for _ in range(runs):
+        times = import_times(module)
+        elapsed = times[module] - times.get(HOST_MODULES.get(module), 0)
+        best = elapsed if best is None else min(best, elapsed)
+    eager = [name for name in LAZY_MODULES if name in times]
+    return best / 1000, eager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget-ms', type=float, default=60.0)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--modules', nargs='+', default=['app', 'todoll'])
+    args = parser.parse_args()
+
+    print(f"{'module':>10} {'import (ms)':>12} {'budget':>8}  check")
+    ok = True
+    for module in args.modules:
+        try:
+            elapsed, eager = measure(module, args.runs)
+        except RuntimeError as error:
+            print(f"{module:>10} {'-':>12} {args.budget_ms:>8.0f}  {error}")
+            ok = False
+            continue
+        problems = []
+        if elapsed > args.budget_ms:
+            problems.append("over budget")
+        if eager:
+            problems.append(f"imports {', '.join(eager)} at startup")
+        ok = ok and not problems
+        print(f"{module:>10} {elapsed:>12.1f} {args.budget_ms:>8.0f}  {'; '.join(problems) or 'ok'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+from collections import defaultdict
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+# Inverted index from category to events.
+#
+# `events_by_category` holds one posting set per exact category. Lowercased
+# categories are grouped in `categories_by_lower`, and a trigram index over
+# the (few) distinct lowercased categories narrows a case-insensitive
+# substring search down to the categories that can contain it. Combined with
+# a timeframe, the smaller of the category postings and the date window is
+# walked and checked against the other.
+class CategoryIndex:
+    def __init__(self, events=()):
+        self.events_by_category = defaultdict(set)
+        self.categories_by_lower = defaultdict(set)
+        self.trigrams = defaultdict(set)
+        for event in events:
+            self.add(event)
+
+    def add(self, event):
+        category = event.category or ''
+        postings = self.events_by_category[category]
+        if not postings:
+            lowered = category.lower()
+            if not self.categories_by_lower[lowered]:
+                for trigram in _trigrams(lowered):
+                    self.trigrams[trigram].add(lowered)
+            self.categories_by_lower[lowered].add(category)
+        postings.add(event)
+
+    def remove(self, event):
+        category = event.category or ''
+        postings = self.events_by_category[category]
+        postings.discard(event)
+        if postings:
+            return
+        del self.events_by_category[category]
+        lowered = category.lower()
+        self.categories_by_lower[lowered].discard(category)
+        if not self.categories_by_lower[lowered]:
+            del self.categories_by_lower[lowered]
+            for trigram in _trigrams(lowered):
+                self.trigrams[trigram].discard(lowered)
+                if not self.trigrams[trigram]:
+                    del self.trigrams[trigram]
+
+    def categories(self, category, contains=False):
+        """The distinct categories equal to `category`, or containing it case-insensitively."""
+        if not contains:
+            return [category] if category in self.events_by_category else []
+        needle = category.lower()
+        if len(needle) >= 3:
+            candidates = None
+            for trigram in _trigrams(needle):
+                found = self.trigrams.get(trigram, set())
+                candidates = found.copy() if candidates is None else candidates & found
+                if not candidates:
+                    return []
+        else:
+            candidates = self.categories_by_lower.keys()
+        return [original for lowered in candidates if needle in lowered
+                for original in self.categories_by_lower[lowered]]
+
+    def select(self, category, time_index, low, high, contains=False):
+        """Events in the category whose minute stamp is in [low, high), in date order."""
+        postings = [self.events_by_category[name] for name in self.categories(category, contains)]
+        if sum(len(events) for events in postings) <= time_index.count_minutes(low, high):
+            selected = [event for events in postings for event in events if low <= event.minutes < high]
+            selected.sort(key=lambda event: event.minutes)
+            return selected
+        members = postings[0] if len(postings) == 1 else set().union(*postings)
+        return [event for event in time_index.between_minutes(low, high) if event in members]
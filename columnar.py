@@ -0,0 +1,127 @@
+import csv
+
+import numpy as np
+
+DATE_FORMAT = '%d-%m-%Y %H:%M'
+
+
+# Packed UTF-8 strings: one bytes buffer plus an offsets array, instead of a
+# separate Python str object per row.
+class StringColumn:
+    def __init__(self, values):
+        # Fields left blank may be None, as in snapshot.py
+        encoded = [(value or '').encode() for value in values]
+        self.offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=self.offsets[1:])
+        self.buffer = b''.join(encoded)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        return self.buffer[self.offsets[index]:self.offsets[index + 1]].decode()
+
+    def take(self, indices):
+        return StringColumn(self[i] for i in indices)
+
+    def to_list(self):
+        return [self[i] for i in range(len(self))]
+
+
+# Array-backed event store for bulk analytics.
+#
+# Dates are a datetime64[m] column and categories are dictionary-encoded as
+# int32 codes into `self.categories`, so filtering is a boolean mask and a
+# category summary is a bincount over the codes.
+class ColumnarEventStore:
+    def __init__(self, names, dates, comments, categories, notifications):
+        self.dates = np.asarray(dates, dtype='datetime64[m]')
+        categories = np.array([category or '' for category in categories], dtype=object).astype(str)
+        self.categories, codes = np.unique(categories, return_inverse=True)
+        self.category_codes = codes.astype(np.int32)
+        self.names = StringColumn(names)
+        self.comments = StringColumn(comments)
+        self.notifications = StringColumn(notifications)
+
+    @classmethod
+    def from_events(cls, events):
+        events = list(events)
+        return cls([event.name for event in events],
+                   np.array([event.minutes for event in events], dtype=np.int64).astype('datetime64[m]'),
+                   [event.comments for event in events],
+                   [event.category for event in events],
+                   [event.notifications for event in events])
+
+    @classmethod
+    def from_csv(cls, filename):
+        columns = {'name': [], 'date': [], 'comments': [], 'category': [], 'notifications': []}
+        with open(filename, mode='r', newline='') as file:
+            for row in csv.DictReader(file):
+                for key, values in columns.items():
+                    values.append(row[key])
+        # 'DD-MM-YYYY HH:MM' -> ISO 'YYYY-MM-DDTHH:MM', parsed in one numpy call
+        iso_dates = [f"{d[6:10]}-{d[3:5]}-{d[0:2]}T{d[11:16]}" for d in columns['date']]
+        return cls(columns['name'], np.array(iso_dates, dtype='datetime64[m]'), columns['comments'],
+                   columns['category'], columns['notifications'])
+
+    def __len__(self):
+        return len(self.dates)
+
+    def mask(self, start, end, category="", include_end=False):
+        """Boolean mask of rows in the window whose category contains `category` (case-insensitive)."""
+        start = np.datetime64(start, 'm')
+        end = np.datetime64(end, 'm')
+        selected = (self.dates >= start) & ((self.dates <= end) if include_end else (self.dates < end))
+        if category:
+            # Match against the (small) dictionary once, not against every row
+            matching = [code for code, value in enumerate(self.categories) if category.lower() in value.lower()]
+            selected &= np.isin(self.category_codes, matching)
+        return selected
+
+    def filter_events(self, start, end, category="", include_end=False):
+        """Return a new store holding only the rows selected by `mask`."""
+        return self.take(np.flatnonzero(self.mask(start, end, category, include_end)))
+
+    def summarize_events(self, start, end, include_end=False):
+        selected = self.category_codes[self.mask(start, end, include_end=include_end)]
+        counts = np.bincount(selected, minlength=len(self.categories))
+        return {str(self.categories[code]): int(counts[code]) for code in np.flatnonzero(counts)}
+
+    def take(self, indices):
+        store = ColumnarEventStore.__new__(ColumnarEventStore)
+        store.dates = self.dates[indices]
+        store.categories = self.categories
+        store.category_codes = self.category_codes[indices]
+        store.names = self.names.take(indices)
+        store.comments = self.comments.take(indices)
+        store.notifications = self.notifications.take(indices)
+        return store
+
+    def to_numpy(self):
+        """Columns as a dict of NumPy arrays (strings decoded into object arrays)."""
+        return {
+            'name': np.array(self.names.to_list(), dtype=object),
+            'date': self.dates.copy(),
+            'comments': np.array(self.comments.to_list(), dtype=object),
+            'category': self.categories[self.category_codes],
+            'notifications': np.array(self.notifications.to_list(), dtype=object),
+        }
+
+    def to_dataframe(self):
+        import pandas
+
+        columns = self.to_numpy()
+        columns['category'] = pandas.Categorical.from_codes(self.category_codes, categories=self.categories)
+        return pandas.DataFrame(columns)
+
+    def rows(self):
+        """Yield rows in the same dict format as Event.to_dict()."""
+        dates = self.dates.astype(object)
+        for i in range(len(self)):
+            yield {
+                'name': self.names[i],
+                'date': dates[i].strftime(DATE_FORMAT),
+                'comments': self.comments[i],
+                'category': str(self.categories[self.category_codes[i]]),
+                'notifications': self.notifications[i],
+            }
@@ -0,0 +1,138 @@
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from journal import FIELDNAMES
+
+
+class ConflictError(Exception):
+    """Edits or removals that were dropped because another writer changed those events first."""
+
+    def __init__(self, event_ids):
+        super().__init__(f"event(s) {', '.join(map(str, event_ids))} were changed by another writer")
+        self.event_ids = event_ids
+
+
+# Exclusive lock on a file, shared by processes and threads.
+#
+# The lock is advisory (flock on POSIX, msvcrt.locking on Windows), so every
+# writer of the events file has to take it. It is reentrant within a thread.
+class FileLock:
+    def __init__(self, path):
+        self.path = path
+        self.thread_lock = threading.RLock()
+        self.depth = 0
+        self.file = None
+
+    def __enter__(self):
+        self.thread_lock.acquire()
+        if self.depth == 0:
+            try:
+                self.file = open(self.path, mode='a+b')
+                _lock_file(self.file)
+            except BaseException:
+                if self.file is not None:
+                    self.file.close()
+                    self.file = None
+                self.thread_lock.release()
+                raise
+        self.depth += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        self.depth -= 1
+        if self.depth == 0:
+            _unlock_file(self.file)
+            self.file.close()
+            self.file = None
+        self.thread_lock.release()
+
+
+def _lock_file(file):
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        return
+    file.seek(0)
+    while True:
+        try:
+            msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            # LK_LOCK gives up after about ten seconds; keep waiting
+            continue
+
+
+def _unlock_file(file):
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+    else:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+# Function to reserve `count` event ids that no other writer of the same file
+# will hand out. The next free id is kept in `counter_filename`; the caller
+# must hold the file lock. Returns the reserved ids as a range.
+def reserve_ids(counter_filename, minimum, count=64):
+    try:
+        with open(counter_filename, mode='r') as file:
+            stored = int(file.read() or 0)
+    except (FileNotFoundError, ValueError):
+        stored = 0
+    first = max(stored, minimum)
+    with open(counter_filename, mode='w') as file:
+        file.write(str(first + count))
+    return range(first, first + count)
+
+
+def same_row(row, expected):
+    """True if `row` still holds the values of `expected` (rows from CSV have string ids)."""
+    if row is None:
+        return False
+    return all(str(row.get(key) or '') == str(expected.get(key) or '') for key in FIELDNAMES)
+
+
+# Function to merge our changes into the rows another writer left on disk.
+#
+# `rows` maps ids to rows and is updated in place; rows without an id are keyed
+# by something else (see events.row_key) and left as they are. `changes` are
+# (op, id, before, after) tuples: an edit or removal only applies if the row
+# on disk still equals `before`, otherwise someone else got there first and it
+# is reported as a conflict. Removing an event that is already gone is fine.
+# Ids come from reserve_ids(), so adds should not collide; if one does (a
+# writer that did not reserve its ids), it gets the next free id.
+#
+# Returns the changes that were applied (with their final ids) and the ids
+# of the conflicting ones.
+def merge_changes(rows, changes):
+    applied = []
+    conflicts = []
+    renamed = {}
+    for op, event_id, before, after in changes:
+        if event_id in renamed:
+            # A later change to an add that was renumbered; its row has the new id
+            event_id = renamed[event_id]
+            before = before and dict(before, id=event_id)
+        if op == 'add':
+            if event_id in rows:
+                renamed[event_id] = max(key for key in rows if isinstance(key, int)) + 1
+                event_id = renamed[event_id]
+            after = dict(after, id=event_id)
+            rows[event_id] = after
+        elif same_row(rows.get(event_id), before):
+            if op == 'edit':
+                after = dict(after, id=event_id)
+                rows[event_id] = after
+            else:
+                del rows[event_id]
+        elif op == 'remove' and event_id not in rows:
+            continue
+        else:
+            conflicts.append(event_id)
+            continue
+        applied.append((op, event_id, before, after))
+    return applied, conflicts
@@ -0,0 +1,664 @@
+import contextlib
+import csv
+import functools
+import heapq
+import io
+import json
+import os
+import threading
+from datetime import datetime
+from operator import attrgetter
+
+from background_writer import BackgroundWriter
+from category_index import CategoryIndex
+from concurrency import ConflictError, FileLock, merge_changes, reserve_ids
+from event_stream import category_matches, iter_event_rows
+from events import Event, minute_bounds, repeats_between, row_id, row_key
+from file_watcher import FileTail, FileWatcher
+from journal import EventJournal, check_no_journal, write_csv_atomic
+from parallel_loader import load_parallel
+from rollups import CategoryRollup
+from sqlite_store import DEFAULT_DATABASE, SQLiteEventStore
+from text_index import TextIndex
+from time_index import TimeIndex
+from timeframes import DEFAULT_CALENDAR, resolve_timeframe
+
+
+def _locked(method):
+    # Every session of the Streamlit server (and the API's worker threads) shares
+    # one manager, so the public methods hold its lock while they run
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return locked
+
+
+# Events with their indexes, kept in sync with one of the storages.
+#
+# Shared by the todoll.py CLI, the Streamlit page (app.py) and the Django event
+# API; each front end picks its storage and category matching mode.
+class EventManager:
+    def __init__(self, filename='events.csv', storage='csv', database=DEFAULT_DATABASE, lazy=False,
+                 workers=1, durability='sync', watch=False, calendar=None, category_contains=False):
+        self.filename = filename
+        # 'journal' appends each mutation to a log instead of rewriting the CSV
+        self.journal = EventJournal(filename, fsync=durability == 'fsync') if storage == 'journal' else None
+        # 'sqlite' keeps the events in a table of the Django project database
+        self.database = SQLiteEventStore(database) if storage == 'sqlite' else None
+        # workers > 1 parses the CSV in a process pool; `filename` may also be a
+        # directory of *.csv shards (a read-only archive)
+        self.workers = workers
+        # A filename ending in .evsnap is a binary snapshot (see snapshot.py): it is
+        # memory-mapped instead of parsed, and lazy queries run on the mapping
+        self.binary_snapshot = storage == 'csv' and filename.endswith('.evsnap')
+        # Events by stable id, in insertion order. A dict gives O(1) lookup and
+        # removal (it tombstones deleted slots and compacts them on resize).
+        # lazy=True defers loading until the events are needed; until then
+        # timeframe queries stream through the file instead.
+        self.by_id = None
+        self.next_id = 1
+        self.time_index = None
+        # Repeating events by id; their later occurrences are only generated
+        # for the window a query asks about
+        self.recurring = {}
+        # Set by set_scheduler(); kept up to date with the events like the indexes
+        self.scheduler = None
+        # Mutations made inside `with manager.batch():` are persisted in one flush
+        self.batch_depth = 0
+        self.deferred = []
+        # durability='sync' writes every change before returning (CSV files are
+        # replaced atomically), 'fsync' also fsyncs each journal append, and
+        # 'async' hands file writes to a background thread that coalesces them;
+        # call flush() to wait for it. SQLite always commits on the caller's thread.
+        self.writer = None
+        if durability == 'async' and storage != 'sqlite':
+            self.writer = BackgroundWriter(self._write_batches)
+        # Other processes may write the same files. Writes hold this lock and,
+        # if the files changed since we read them, merge with what is on disk.
+        self.file_lock = FileLock(filename + '.lock') if storage != 'sqlite' else contextlib.nullcontext()
+        self.disk_stamp = None
+        self.free_ids = range(0)
+        # Rows or journal records other processes append are tailed from here
+        # (see refresh()); SQLite and snapshot files are reloaded instead
+        tailed = self.journal.journal_filename if self.journal is not None else filename
+        self.tail = None if storage == 'sqlite' or self.binary_snapshot or os.path.isdir(filename) else FileTail(tailed)
+        # watch=True lets refresh() ask inotify (or a stat poll) whether anything changed
+        self.watcher = FileWatcher(self._storage_files()) if watch else None
+        # Weeks, quarters and years in timeframes follow this timeframes.Calendar
+        self.calendar = calendar or DEFAULT_CALENDAR
+        # Category filters match exactly, or with category_contains=True as a
+        # case-insensitive substring (what the Streamlit page offers)
+        self.category_contains = category_contains
+        # Bumped on every change so cached views can tell the events are different
+        self.generation = 0
+        # Held by every public method; take it to group several calls
+        self.lock = threading.RLock()
+        if storage == 'csv':
+            check_no_journal(self.filename)
+        if not lazy:
+            self._load()
+
+    def _storage_files(self):
+        if self.journal is not None:
+            return [self.filename, self.journal.journal_filename]
+        if self.database is not None:
+            return [self.database.database, self.database.database + '-wal']
+        return [self.filename]
+
+    def _disk_stamp(self):
+        stamp = []
+        for path in self._storage_files():
+            try:
+                stat = os.stat(path)
+                stamp.append((stat.st_ino, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                stamp.append(None)
+        return stamp
+
+    @_locked
+    def is_stale(self):
+        """True if another process changed the storage files since we last loaded or saved."""
+        if self.writer is not None and self.writer.has_pending():
+            # Our queued writes are newer than whatever is on disk
+            return False
+        return self._disk_stamp() != self.disk_stamp
+
+    def flush(self):
+        """Wait until every change has been written to storage."""
+        if self.writer is not None:
+            self.writer.flush()
+
+    @_locked
+    def reload(self):
+        try:
+            self.flush()
+        finally:
+            self._load()
+            self.generation += 1
+
+    @_locked
+    def refresh(self):
+        """Bring the loaded events up to date with changes other processes made.
+
+        Rows appended to the CSV file and records appended to the journal are
+        tailed into the events and their indexes; if a file was rewritten (or
+        with SQLite storage) everything is reloaded. Returns True if the events
+        may have changed. A ConflictError (or OSError) from a background write
+        that failed since the last call is raised here, after the reload.
+        """
+        if self.writer is not None:
+            try:
+                self.flush()
+            except ConflictError:
+                # Show the other writer's version of the events we could not change
+                self.reload()
+                raise
+        if self.watcher is not None and not self.watcher.changed():
+            return False
+        if self.by_id is None or not self.is_stale():
+            return False
+        with self.file_lock:
+            changes = self._read_appended()
+            if changes is not None:
+                for event_id, event in changes:
+                    self._apply_outside_change(event_id, event)
+                self.disk_stamp = self._disk_stamp()
+        if changes is None:
+            self.reload()
+        else:
+            self.generation += 1
+        return True
+
+    def _read_appended(self):
+        """(id, event) pairs appended to the storage since we last synced (None: removed), or None to reload."""
+        if self.tail is None or self.writer is not None and self.writer.has_pending():
+            return None
+        if self.journal is not None and self._disk_stamp()[0] != self.disk_stamp[0]:
+            # Another process compacted the journal into a new snapshot
+            return None
+        data = self.tail.read_appended()
+        if data is None:
+            return None
+        try:
+            if self.journal is not None:
+                records = [json.loads(line) for line in data.splitlines()]
+                changes = [(record['id'], None) if record['op'] == 'remove' else
+                           (record['row']['id'], Event.from_dict(record['row'])) for record in records]
+                self.journal.pending += len(records)
+                return changes
+            with open(self.filename, mode='r', newline='') as file:
+                fieldnames = next(csv.reader(file), None)
+            rows = csv.DictReader(io.StringIO(data.decode(), newline=''), fieldnames=fieldnames)
+            return [(event.id, event) for event in Event.from_dicts(rows)]
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    def _apply_outside_change(self, event_id, event):
+        # `event` replaces (or adds) the event with that id; None removes it
+        old = self.by_id.pop(event_id, None) if event is None else self.by_id.get(event_id)
+        if old is not None:
+            self._unindex(old)
+        if event is None:
+            return
+        if event.id is None:
+            # A row appended without an id gets one, as on a full load
+            event.id = self._reserve_id()
+        self.next_id = max(self.next_id, event.id + 1)
+        self.by_id[event.id] = event
+        self._index(event)
+
+    def _mark_synced(self):
+        # The storage files now hold what we wrote or read; outside changes start from here
+        self.disk_stamp = self._disk_stamp()
+        if self.tail is not None:
+            self.tail.mark()
+
+    def _event_map(self):
+        if self.by_id is None:
+            self._load()
+        return self.by_id
+
+    def _load(self):
+        with self.file_lock:
+            events = self.load_events()
+            self._mark_synced()
+        self.events = events
+
+    @property
+    @_locked
+    def events(self):
+        """All events in insertion order (a new list on every access)."""
+        return list(self._event_map().values())
+
+    @events.setter
+    @_locked
+    def events(self, events):
+        self.by_id = {event.id: event for event in events if event.id is not None}
+        self.next_id = max(self.by_id, default=0) + 1
+        for event in events:
+            # Rows written before events had ids get one now
+            if event.id is None:
+                event.id = self._reserve_id()
+        self.by_id = {event.id: event for event in events}
+        self.time_index = TimeIndex(events)
+        self.rollup = CategoryRollup(events)
+        self.category_index = CategoryIndex(events)
+        # Built by the first search(); most loads never search
+        self.text_index = None
+        self.recurring = {event.id: event for event in events if event.recurrence is not None}
+        if self.scheduler is not None:
+            self.scheduler.reset(events)
+
+    @_locked
+    def get_event(self, event_id):
+        return self._event_map().get(event_id)
+
+    def load_events(self):
+        if self.journal is not None:
+            events = Event.from_dicts(self.journal.load_rows())
+            if any(event.id is None for event in events):
+                # Journal records refer to ids, so store the ids handed out below right away
+                self.events = events
+                self.save_events()
+            return events
+        if self.database is not None:
+            return Event.from_dicts(self.database.load())
+
+        if self.binary_snapshot:
+            from snapshot import EventSnapshot
+
+            try:
+                with EventSnapshot(self.filename) as snapshot:
+                    return snapshot.load_events()
+            except FileNotFoundError:
+                return []
+        if self.workers > 1 or os.path.isdir(self.filename):
+            return load_parallel(self.filename, self.workers)
+
+        events = []
+        try:
+            with open(self.filename, mode='r', newline='') as file:
+                reader = csv.DictReader(file)
+                events = Event.from_dicts(reader)
+        except FileNotFoundError:
+            pass
+        return events
+
+    @_locked
+    def save_events(self):
+        """Overwrite the storage with the in-memory events."""
+        # A queued write must not land on top of this one later
+        self.flush()
+        rows = [event.to_dict() for event in self.events]
+        with self.file_lock:
+            if self.journal is not None:
+                self.journal.compact(rows)
+            elif self.database is not None:
+                self.database.replace_all(rows)
+            else:
+                self._write_csv(rows)
+            self._mark_synced()
+
+    def _write_csv(self, rows):
+        check_no_journal(self.filename)
+        if os.path.isdir(self.filename):
+            raise ValueError(f"{self.filename} is a sharded archive and cannot be saved")
+        if self.binary_snapshot:
+            from snapshot import write_snapshot
+
+            write_snapshot(self.filename, rows)
+            return
+        write_csv_atomic(self.filename, rows)
+
+    def _read_csv(self):
+        if self.binary_snapshot:
+            return [event.to_dict() for event in self.load_events()]
+        try:
+            with open(self.filename, mode='r', newline='') as file:
+                return list(csv.DictReader(file))
+        except FileNotFoundError:
+            return []
+
+    @_locked
+    def add_event(self, name, date, comments, category, notifications, recurrence=None):
+        event = Event(name, date, comments, category, notifications, recurrence=recurrence)
+        self._event_map()
+        if self.database is not None:
+            # The database hands out the ids
+            event.id = self.database.insert(event.to_dict())
+        else:
+            event.id = self._reserve_id()
+        self.next_id = max(self.next_id, event.id + 1)
+        self.by_id[event.id] = event
+        self._index(event)
+        self._record('add', event)
+        return event
+
+    @_locked
+    def add_events(self, events):
+        """Add many events (tuples or dicts of add_event's arguments) with a single flush."""
+        with self.batch():
+            return [self.add_event(**event) if isinstance(event, dict) else self.add_event(*event)
+                    for event in events]
+
+    @_locked
+    def edit_event(self, event_id, **kwargs):
+        event = self._event_map()[event_id]
+        before = event.to_dict()
+        # The indexes are keyed by date, category and text, so take the event out before they change
+        self._unindex(event)
+        for key, value in kwargs.items():
+            if value is not None:
+                setattr(event, key, value)
+        self._index(event)
+        self._record('edit', event, before)
+
+    @_locked
+    def remove_event(self, event_id):
+        """Remove the event with that id; raises KeyError if there is none."""
+        event = self._event_map().pop(event_id)
+        self._unindex(event)
+        self._record('remove', event, event.to_dict())
+
+    @_locked
+    def remove_events(self, event_ids):
+        """Remove the events with the given ids with a single flush."""
+        with self.batch():
+            for event_id in event_ids:
+                self.remove_event(event_id)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Defer persistence of the mutations made inside the block to one flush at the end.
+
+        With csv storage that is one rewrite of the file, with journal storage one
+        append and with sqlite storage one transaction. Batches may be nested; the
+        outermost one flushes. If the outermost block raises, none of its changes
+        are kept: they are not written and the events are reloaded from storage.
+        """
+        with self.lock:
+            self._event_map()
+            self.batch_depth += 1
+            try:
+                if self.database is not None and self.batch_depth == 1:
+                    with self.database.transaction():
+                        yield
+                else:
+                    yield
+            except BaseException:
+                if self.batch_depth == 1:
+                    # The sqlite transaction was rolled back; drop the deferred changes
+                    # of the other storages and the in-memory changes too
+                    self.deferred = []
+                    self.reload()
+                raise
+            finally:
+                self.batch_depth -= 1
+                if not self.batch_depth:
+                    deferred, self.deferred = self.deferred, []
+                    if deferred:
+                        self._persist(deferred)
+
+    def _reserve_id(self):
+        # Ids come in blocks reserved in a file shared by every writer, so
+        # concurrent adds from other processes never pick the same id. Every id
+        # we hand out comes from here; rows written by tools that do not reserve
+        # ids may still have taken one of the block, so those are skipped.
+        while True:
+            if not self.free_ids:
+                with self.file_lock:
+                    self.free_ids = reserve_ids(self.filename + '.ids', self.next_id)
+            event_id, self.free_ids = self.free_ids[0], self.free_ids[1:]
+            if event_id not in self.by_id:
+                self.next_id = max(self.next_id, event_id + 1)
+                return event_id
+
+    @_locked
+    def set_scheduler(self, scheduler):
+        """Have `scheduler` (a reminders.ReminderScheduler) follow every change to the events."""
+        self.scheduler = scheduler
+        scheduler.reset(self.events)
+
+    def _index(self, event):
+        self.time_index.add(event)
+        self.rollup.add(event)
+        self.category_index.add(event)
+        if self.text_index is not None:
+            self.text_index.add(event)
+        if event.recurrence is not None:
+            self.recurring[event.id] = event
+        if self.scheduler is not None:
+            self.scheduler.schedule(event)
+
+    def _unindex(self, event):
+        self.time_index.remove(event)
+        self.rollup.remove(event)
+        self.category_index.remove(event)
+        if self.text_index is not None:
+            self.text_index.remove(event)
+        self.recurring.pop(event.id, None)
+        if self.scheduler is not None:
+            self.scheduler.cancel(event.id)
+
+    def _record(self, op, event, before=None):
+        """Persist one add/edit/remove of `event` with the configured storage.
+
+        `before` is the event's row before an edit or removal; the write only
+        applies if storage still holds it (optimistic concurrency).
+        """
+        change = (op, event.id, before, None if op == 'remove' else event.to_dict())
+        if self.batch_depth and self.database is None:
+            self.deferred.append(change)
+        else:
+            self._persist([change])
+
+    def _persist(self, changes):
+        self.generation += 1
+        if self.writer is not None:
+            # Copying the event list is cheap; the rows are built and written on the writer thread
+            self.writer.submit((changes, list(self.by_id.values())))
+            return
+        try:
+            merged = self._write_changes(changes, self.events)
+        except ConflictError:
+            # Show the other writer's version of the events we could not change
+            self.reload()
+            raise
+        if merged:
+            # Pick up the other writers' changes (and the new ids of renumbered adds)
+            self.reload()
+
+    def _write_batches(self, items):
+        # Everything queued since the last write: all the changes, and the newest snapshot.
+        # A merge leaves disk_stamp behind, so is_stale() tells the caller to reload.
+        self._write_changes([change for changes, _ in items for change in changes], items[-1][1])
+
+    def _write_changes(self, changes, events):
+        """Write `changes`; returns True if they had to be merged with another writer's."""
+        if self.database is not None:
+            conflicts = []
+            for op, event_id, before, after in changes:
+                # Adds were inserted by add_event to get their id
+                if op == 'edit' and not self.database.update(event_id, after, expected=before):
+                    conflicts.append(event_id)
+                elif op == 'remove' and not self.database.delete(event_id, expected=before):
+                    conflicts.append(event_id)
+            # Our own write must not look like an outside change
+            self._mark_synced()
+            if conflicts:
+                raise ConflictError(conflicts)
+            return False
+
+        with self.file_lock:
+            if self._disk_stamp() == self.disk_stamp:
+                # Nobody else wrote since we read the files
+                if self.journal is not None:
+                    self._log_changes(changes)
+                    if self.journal.needs_compaction():
+                        self.journal.compact([event.to_dict() for event in events])
+                else:
+                    self._write_csv([event.to_dict() for event in events])
+                self._mark_synced()
+                return False
+
+            # Apply our changes to the other writer's version of the rows
+            disk_rows = self.journal.load_rows() if self.journal is not None else self._read_csv()
+            # Rows another writer appended without an id must not collapse into one
+            rows = {row_key(row, position): row for position, row in enumerate(disk_rows)}
+            changes, conflicts = merge_changes(rows, changes)
+            if self.journal is not None:
+                self._log_changes(changes)
+                if self.journal.needs_compaction():
+                    self.journal.compact(list(rows.values()))
+            else:
+                self._write_csv(list(rows.values()))
+        if conflicts:
+            raise ConflictError(conflicts)
+        return True
+
+    def _log_changes(self, changes):
+        self.journal.log_many([{'op': 'remove', 'id': event_id} if op == 'remove' else {'op': op, 'row': after}
+                               for op, event_id, _, after in changes])
+
+    @_locked
+    def iter_events(self, start=None, end=None, category=None, include_end=False):
+        """Iterate over the events in the optional window and category.
+
+        Until the event list is loaded (lazy=True with csv storage) this reads
+        the file incrementally with bounded memory and stops as soon as the
+        caller does; otherwise it answers from the in-memory indexes, taking
+        the window's events under the lock so other threads may change them
+        while the caller iterates.
+        """
+        if self.by_id is None and (self.binary_snapshot or self.journal is None and self.database is None):
+            return self._stream_events(start, end, category, include_end)
+
+        self._event_map()
+        if category:
+            # Intersect the category postings with the date window
+            low, high = minute_bounds(start or datetime.min, end or datetime.max, include_end or end is None)
+            events = self.category_index.select(category, self.time_index, low, high, contains=self.category_contains)
+        elif start is not None or end is not None:
+            events = self.time_index.between(start or datetime.min, end or datetime.max,
+                                             include_end=include_end or end is None)
+        else:
+            events = self.events
+        if end is not None and self.recurring:
+            # Later occurrences of repeating events are generated for this window only
+            events = heapq.merge(events, self._repeats(start, end, category, include_end), key=attrgetter('minutes'))
+        return iter(list(events))
+
+    def _stream_events(self, start, end, category, include_end):
+        # Reads the storage file, not the shared in-memory state
+        if self.binary_snapshot:
+            from snapshot import EventSnapshot
+
+            try:
+                snapshot = EventSnapshot(self.filename)
+            except FileNotFoundError:
+                return
+            with snapshot:
+                # Only the selected rows are decoded into events
+                yield from snapshot.occurrences(start, end, category, contains=self.category_contains,
+                                                include_end=include_end)
+            return
+        for row, date in iter_event_rows(self.filename, start, end, category, contains=self.category_contains,
+                                         include_end=include_end):
+            yield Event(row['name'], date, row['comments'], row['category'], row['notifications'], row_id(row),
+                        row.get('recurrence'))
+
+    def _repeats(self, start, end, category=None, include_end=False):
+        """The later occurrences of the repeating events inside the window, in date order."""
+        low, high = minute_bounds(start or datetime.min, end, include_end)
+        events = [event for event in self.recurring.values()
+                  if category_matches(event.category, category, contains=self.category_contains)]
+        return repeats_between(events, low, high)
+
+    def _add_repeats(self, summary, start, end, include_end=False):
+        """Add the later occurrences inside the window to `summary`; they are counted, not generated."""
+        low, high = minute_bounds(start, end, include_end)
+        for event in self.recurring.values():
+            repeats = event.count_repeats(low, high)
+            if repeats:
+                summary[event.category] = summary.get(event.category, 0) + repeats
+        return summary
+
+    @_locked
+    def search(self, query, limit=20):
+        """Full-text search over name, comments and notifications; best matches first."""
+        events = self._event_map()
+        if self.text_index is None:
+            self.text_index = TextIndex(events.values())
+        return [event for event, _ in self.text_index.search(query, limit)]
+
+    @_locked
+    def count(self):
+        return len(self._event_map())
+
+    @_locked
+    def list_page(self, offset=0, limit=50):
+        """One page of the events in date order, so a listing never holds more than `limit` of them."""
+        self._event_map()
+        return self.time_index.page(offset, limit)
+
+    @_locked
+    def events_between(self, start, end):
+        """Return the events with start <= date < end, sorted by date."""
+        return list(self.iter_events(start, end))
+
+    @_locked
+    def to_columnar(self):
+        """Snapshot the events into a NumPy-backed ColumnarEventStore for bulk analytics."""
+        # NumPy is only imported when the analytics are used, not on every app start
+        from columnar import ColumnarEventStore
+
+        return ColumnarEventStore.from_events(self.events)
+
+    @_locked
+    def filter_events(self, timeframe='today', category=None, now=None):
+        """Events in the timeframe (see timeframes.resolve_timeframe) and category, in date order."""
+        start, end = resolve_timeframe(timeframe, now, self.calendar)
+
+        if self.database is not None:
+            self._event_map()
+            rows = self.database.select(start, end, category, contains=self.category_contains)
+            events = [Event.from_dict(row) for row in rows]
+            return list(heapq.merge(events, self._repeats(start, end, category), key=attrgetter('minutes')))
+
+        # Walks the date (or category) index between the window's bounds
+        return list(self.iter_events(start, end, category))
+
+    @_locked
+    def summarize_events(self, timeframe, now=None):
+        """Number of events per category in the timeframe (see timeframes.resolve_timeframe)."""
+        start, end = resolve_timeframe(timeframe, now, self.calendar)
+
+        if self.database is not None:
+            self._event_map()
+            return self._add_repeats(self.database.summarize(start, end), start, end)
+
+        if self.by_id is not None:
+            # Answered from the per-day/week/month category counts
+            return self._add_repeats(self.rollup.summarize(*minute_bounds(start, end), self.time_index), start, end)
+
+        if self.binary_snapshot:
+            from snapshot import EventSnapshot
+
+            # Counted on the mapped category codes without building the events
+            try:
+                with EventSnapshot(self.filename) as snapshot:
+                    return snapshot.summarize(start, end)
+            except FileNotFoundError:
+                return {}
+
+        # Summarizing the number of events by category
+        summary = {}
+        for event in self.iter_events(start, end):
+            summary[event.category] = summary.get(event.category, 0) + 1
+
+        return summary
+
+    @_locked
+    def list_events(self):
+        return self.events
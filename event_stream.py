@@ -0,0 +1,52 @@
+import csv
+import glob
+import os
+from datetime import datetime
+
+from events import Recurrence, from_minutes, minute_bounds, to_minutes
+from fast_dates import parse_event_date
+
+
+def category_matches(value, category, contains=False):
+    """Exact match, or case-insensitive substring match with `contains`. An empty category matches everything."""
+    if not category:
+        return True
+    if contains:
+        return category.lower() in (value or '').lower()
+    return value == category
+
+
+# Function to read events.csv incrementally.
+#
+# Yields (row, date) pairs for the rows inside the optional window and
+# category, holding only one row in memory at a time. The file is closed as
+# soon as the caller stops iterating. A directory is read as an archive of
+# *.csv shards, one after another.
+#
+# A repeating row (non-empty recurrence) is yielded once more with the date of
+# each later occurrence inside the window; without an `end` the window is
+# unbounded and only the row itself is yielded.
+def iter_event_rows(filename, start=None, end=None, category=None, contains=False, include_end=False):
+    if os.path.isdir(filename):
+        for shard in sorted(glob.glob(os.path.join(filename, '*.csv'))):
+            yield from iter_event_rows(shard, start, end, category, contains, include_end)
+        return
+    try:
+        file = open(filename, mode='r', newline='')
+    except FileNotFoundError:
+        return
+    low, high = minute_bounds(start or datetime.min, end, include_end) if end is not None else (None, None)
+    with file:
+        for row in csv.DictReader(file):
+            # The category test is cheaper than parsing the date, so do it first
+            if not category_matches(row['category'], category, contains):
+                continue
+            date = parse_event_date(row['date'])
+            if not (start is not None and date < start
+                    or end is not None and (date > end if include_end else date >= end)):
+                yield row, date
+            if high is not None and row.get('recurrence'):
+                recurrence = Recurrence.parse(row['recurrence'])
+                first = to_minutes(date)
+                for n in recurrence.between(first, low, high, first=1):
+                    yield row, from_minutes(recurrence.occurrence(first, n))
@@ -0,0 +1,273 @@
+import calendar
+import heapq
+import sys
+from datetime import MAXYEAR, datetime, timedelta
+from operator import attrgetter
+
+from fast_dates import parse_event_date, parse_event_dates
+
+EPOCH = datetime(1970, 1, 1)
+MINUTE = timedelta(minutes=1)
+
+
+def to_minutes(date):
+    """Whole minutes since 1970-01-01 (seconds are dropped)."""
+    return (date - EPOCH) // MINUTE
+
+
+def from_minutes(minutes):
+    return EPOCH + timedelta(minutes=minutes)
+
+
+def minute_bounds(start, end, include_end=False):
+    """The half-open [low, high) range of minute stamps with start <= date < end (or <= end)."""
+    low = to_minutes(start)
+    if from_minutes(low) != start:
+        low += 1
+    high = to_minutes(end)
+    if include_end or from_minutes(high) != end:
+        high += 1
+    return low, high
+
+
+def row_id(row):
+    # Files written before events had ids have no (or an empty) id column
+    value = row.get('id')
+    return int(value) if value not in (None, '') else None
+
+
+def row_key(row, position):
+    """Key of a row in a file: its id, or ('row', position) for a row without one."""
+    event_id = row_id(row)
+    return ('row', position) if event_id is None else event_id
+
+
+# Minutes between two occurrences of the fixed-length frequencies
+_STEP_MINUTES = {'daily': 24 * 60, 'weekly': 7 * 24 * 60}
+FREQUENCIES = ('daily', 'weekly', 'monthly')
+
+
+# Recurrence rule of a repeating event.
+#
+# Written as "FREQUENCY[;interval=N][;count=N][;until=DD-MM-YYYY HH:MM]",
+# e.g. "weekly;count=10" or "monthly;interval=3;until=31-12-2025 23:59",
+# which fits in one CSV field. The event's own date is occurrence 0;
+# occurrence n is n * interval days, weeks or months later (monthly dates
+# on the 29th-31st fall on the last day of shorter months). Every method
+# works out occurrence numbers arithmetically, so nothing is enumerated
+# outside the window asked for.
+class Recurrence:
+    __slots__ = ('frequency', 'interval', 'count', 'until')
+
+    def __init__(self, frequency, interval=1, count=None, until=None):
+        if frequency not in FREQUENCIES:
+            raise ValueError(f"recurrence frequency must be one of {', '.join(FREQUENCIES)}, not {frequency!r}")
+        if interval < 1 or count is not None and count < 1:
+            raise ValueError("recurrence interval and count must be positive")
+        self.frequency = frequency
+        self.interval = interval
+        self.count = count
+        # Last minute an occurrence may start at
+        self.until = until
+
+    @classmethod
+    def parse(cls, text):
+        """Parse a rule; an empty text means the event does not repeat (None)."""
+        if not text:
+            return None
+        frequency, *options = text.strip().lower().split(';')
+        values = {}
+        for option in options:
+            key, _, value = option.partition('=')
+            if key.strip() not in ('interval', 'count', 'until') or not value:
+                raise ValueError(f"invalid recurrence option {option!r}")
+            values[key.strip()] = value.strip()
+        until = values.get('until')
+        return cls(frequency.strip(), int(values.get('interval', 1)),
+                   int(values['count']) if 'count' in values else None,
+                   to_minutes(parse_event_date(until)) if until else None)
+
+    def __str__(self):
+        text = self.frequency
+        if self.interval != 1:
+            text += f";interval={self.interval}"
+        if self.count is not None:
+            text += f";count={self.count}"
+        if self.until is not None:
+            text += f";until={from_minutes(self.until).strftime('%d-%m-%Y %H:%M')}"
+        return text
+
+    def __eq__(self, other):
+        return isinstance(other, Recurrence) and str(self) == str(other)
+
+    def occurrence(self, start, n):
+        """Minute stamp of occurrence `n` of an event starting at minute `start`."""
+        step = _STEP_MINUTES.get(self.frequency)
+        if step is not None:
+            return start + n * self.interval * step
+        date = from_minutes(start)
+        year, month = divmod(date.month - 1 + n * self.interval, 12)
+        year += date.year
+        if year > MAXYEAR:
+            # Past the last representable date: later than any window
+            return sys.maxsize
+        day = min(date.day, calendar.monthrange(year, month + 1)[1])
+        return to_minutes(date.replace(year=year, month=month + 1, day=day))
+
+    def first_at_or_after(self, start, minute):
+        """The first occurrence number whose stamp is >= `minute` (ignoring count and until)."""
+        if minute <= start:
+            return 0
+        step = _STEP_MINUTES.get(self.frequency)
+        if step is not None:
+            return -(-(minute - start) // (step * self.interval))
+        # Months have different lengths: estimate, then step to the exact one
+        first, target = from_minutes(start), from_minutes(minute)
+        n = max(0, ((target.year - first.year) * 12 + target.month - first.month) // self.interval - 1)
+        while self.occurrence(start, n) < minute:
+            n += 1
+        return n
+
+    def end(self, start):
+        """One past the last occurrence number, or None if the event repeats forever."""
+        ends = []
+        if self.count is not None:
+            ends.append(self.count)
+        if self.until is not None:
+            ends.append(self.first_at_or_after(start, self.until + 1))
+        return min(ends) if ends else None
+
+    def between(self, start, low, high, first=0):
+        """The occurrence numbers (from `first` on) with stamps in [low, high), as a range."""
+        begin = max(first, self.first_at_or_after(start, low))
+        stop = self.first_at_or_after(start, high)
+        end = self.end(start)
+        if end is not None:
+            stop = min(stop, end)
+        return range(begin, max(begin, stop))
+
+
+def _intern(value):
+    # Categories and notification texts repeat a lot; keep one copy of each
+    return sys.intern(value) if type(value) is str else value
+
+
+# Compact event record.
+#
+# Slotted (no per-instance __dict__), the date is kept as integer minutes
+# since the epoch and exposed as a datetime through the `date` property, and
+# the repetitive category/notifications strings are interned.
+class Event:
+    __slots__ = ('id', 'name', 'minutes', 'comments', '_category', '_notifications', '_recurrence')
+
+    def __init__(self, name, date, comments, category, notifications, id=None, recurrence=None):
+        # Stable identifier handed out by the EventManager
+        self.id = id
+        self.name = name
+        self.minutes = to_minutes(date)
+        self.comments = comments
+        self._category = _intern(category)
+        self._notifications = _intern(notifications)
+        self.recurrence = recurrence
+
+    @property
+    def date(self):
+        return from_minutes(self.minutes)
+
+    @date.setter
+    def date(self, date):
+        self.minutes = to_minutes(date)
+
+    @property
+    def category(self):
+        return self._category
+
+    @category.setter
+    def category(self, category):
+        self._category = _intern(category)
+
+    @property
+    def notifications(self):
+        return self._notifications
+
+    @notifications.setter
+    def notifications(self, notifications):
+        self._notifications = _intern(notifications)
+
+    @property
+    def recurrence(self):
+        """The Recurrence rule of a repeating event, or None."""
+        return self._recurrence
+
+    @recurrence.setter
+    def recurrence(self, recurrence):
+        # Accepts a rule, its text, or ''/None for "does not repeat"
+        self._recurrence = Recurrence.parse(recurrence) if isinstance(recurrence, str) else recurrence
+
+    def repeats(self, low, high):
+        """The later occurrences (after this first one) with minute stamps in [low, high), as events."""
+        if self._recurrence is None:
+            return
+        for n in self._recurrence.between(self.minutes, low, high, first=1):
+            yield Event.from_minutes(self.name, self._recurrence.occurrence(self.minutes, n), self.comments,
+                                     self._category, self._notifications, self.id, self._recurrence)
+
+    def count_repeats(self, low, high):
+        """How many of the later occurrences fall in [low, high), without generating them."""
+        if self._recurrence is None:
+            return 0
+        return len(self._recurrence.between(self.minutes, low, high, first=1))
+
+    def next_start(self, after):
+        """Minute stamp of the first occurrence starting after minute `after`, or None."""
+        if self._recurrence is None:
+            return self.minutes if self.minutes > after else None
+        n = self._recurrence.first_at_or_after(self.minutes, after + 1)
+        end = self._recurrence.end(self.minutes)
+        if end is not None and n >= end:
+            return None
+        minutes = self._recurrence.occurrence(self.minutes, n)
+        return minutes if minutes != sys.maxsize else None
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'date': self.date.strftime('%d-%m-%Y %H:%M'),
+            'comments': self.comments,
+            'category': self.category,
+            'notifications': self.notifications,
+            'id': self.id,
+            'recurrence': str(self._recurrence) if self._recurrence is not None else '',
+        }
+
+    @classmethod
+    def from_minutes(cls, name, minutes, comments, category, notifications, id=None, recurrence=None):
+        """Build an event from a minute stamp, skipping the datetime round trip."""
+        event = cls.__new__(cls)
+        event.id = id
+        event.name = name
+        event.minutes = minutes
+        event.comments = comments
+        event.category = category
+        event.notifications = notifications
+        event.recurrence = recurrence
+        return event
+
+    @classmethod
+    def from_dict(cls, row):
+        return cls(row['name'], parse_event_date(row['date']), row['comments'], row['category'], row['notifications'],
+                   row_id(row), row.get('recurrence'))
+
+    @classmethod
+    def from_dicts(cls, rows):
+        """Build events from many rows, parsing the date column in bulk."""
+        rows = list(rows)
+        dates = parse_event_dates(row['date'] for row in rows)
+        return [cls(row['name'], date, row['comments'], row['category'], row['notifications'], row_id(row),
+                    row.get('recurrence'))
+                for row, date in zip(rows, dates)]
+
+
+def repeats_between(events, low, high):
+    """The later occurrences of the repeating `events` with minute stamps in [low, high), in date order."""
+    return heapq.merge(*(event.repeats(low, high) for event in events), key=attrgetter('minutes'))
@@ -0,0 +1,59 @@
+import re
+from datetime import datetime
+
+DATE_FORMAT = '%d-%m-%Y %H:%M'
+
+_DATE_LAYOUT = re.compile(r'(\d\d)-(\d\d)-(\d{4}) (\d\d):(\d\d)', re.ASCII)
+_DATE_COLUMN_LAYOUT = re.compile(r'(?:\d\d-\d\d-\d{4} \d\d:\d\d\n)*', re.ASCII)
+_date_memo = {}
+_MEMO_LIMIT = 100000
+
+
+# Fast parser for the fixed 'DD-MM-YYYY HH:MM' layout used in events.csv.
+#
+# Well-formed values are parsed by slicing and int() and memoized, since the
+# same dates repeat a lot. Anything else (or an out-of-range field) goes
+# through datetime.strptime, so malformed input is accepted or rejected
+# exactly as before, with strptime's error message.
+def parse_event_date(text):
+    date = _date_memo.get(text)
+    if date is not None:
+        return date
+    match = _DATE_LAYOUT.fullmatch(text)
+    try:
+        if match is None:
+            raise ValueError(text)
+        day, month, year, hour, minute = match.groups()
+        date = datetime(int(year), int(month), int(day), int(hour), int(minute))
+    except ValueError:
+        return datetime.strptime(text, DATE_FORMAT)
+    if len(_date_memo) >= _MEMO_LIMIT:
+        _date_memo.clear()
+    _date_memo[text] = date
+    return date
+
+
+def parse_event_dates(texts):
+    """Parse a whole date column; NumPy converts the distinct values in one call when it is installed."""
+    texts = list(texts)
+    try:
+        import numpy as np
+    except ImportError:
+        return [parse_event_date(text) for text in texts]
+
+    distinct = list(dict.fromkeys(texts))
+    # One regex pass over the joined column checks the layout of every value; the
+    # length check rules out values that themselves contain a newline
+    column = '\n'.join(distinct) + '\n'
+    if len(column) != 17 * len(distinct) or _DATE_COLUMN_LAYOUT.fullmatch(column) is None:
+        return [parse_event_date(text) for text in texts]
+    iso = [f"{text[6:10]}-{text[3:5]}-{text[0:2]}T{text[11:16]}" for text in distinct]
+    try:
+        dates = np.array(iso, dtype='datetime64[m]')
+    except ValueError:
+        return [parse_event_date(text) for text in texts]
+    if (dates < np.datetime64('0001-01-01T00:00')).any():
+        # Year 0000 parses in NumPy but not in datetime
+        return [parse_event_date(text) for text in texts]
+    parsed = dict(zip(distinct, dates.astype('datetime64[us]').astype(object).tolist()))
+    return [parsed[text] for text in texts]
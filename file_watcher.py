@@ -0,0 +1,151 @@
+import os
+import select
+import struct
+import sys
+import time
+
+# inotify event masks (see inotify(7))
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_Q_OVERFLOW = 0x4000
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def _file_stamp(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+# Watcher that tells when any of a set of files may have changed.
+#
+# On Linux it uses inotify on the files' directories, so that files replaced
+# by an atomic rename are seen too; everywhere else (or if inotify is not
+# available) it polls os.stat every `poll_interval` seconds. changed() may
+# report a change that turns out to be our own write, never the other way
+# round.
+class FileWatcher:
+    def __init__(self, paths, poll_interval=1.0):
+        self.paths = [os.path.abspath(path) for path in paths]
+        self.poll_interval = poll_interval
+        self.stamps = [_file_stamp(path) for path in self.paths]
+        self.fd = _inotify_watch(self.paths) if sys.platform.startswith('linux') else None
+        self.names = {os.path.basename(path) for path in self.paths}
+
+    def changed(self, timeout=0):
+        """True if a watched file changed since the last call; waits up to `timeout` seconds for one."""
+        if self.fd is not None:
+            return self._read_inotify(timeout)
+        deadline = time.monotonic() + timeout
+        while True:
+            stamps = [_file_stamp(path) for path in self.paths]
+            if stamps != self.stamps:
+                self.stamps = stamps
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self.poll_interval, remaining))
+
+    def _read_inotify(self, timeout):
+        deadline = time.monotonic() + timeout
+        changed = False
+        while True:
+            # Once a change was seen, only drain the events already queued
+            wait = 0 if changed else max(0, deadline - time.monotonic())
+            if not select.select([self.fd], [], [], wait)[0]:
+                return changed
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                continue
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                name = data[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length].rstrip(b'\0')
+                # Other files in the same directories are ignored; an overflow may hide ours
+                changed = changed or os.fsdecode(name) in self.names or bool(mask & _IN_Q_OVERFLOW)
+                offset += _EVENT_HEADER.size + length
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+def _inotify_watch(paths):
+    """A non-blocking inotify descriptor watching the directories of `paths`, or None if inotify is unavailable."""
+    import ctypes
+    import ctypes.util
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    for directory in {os.path.dirname(path) for path in paths}:
+        if libc.inotify_add_watch(fd, os.fsencode(directory), _WATCH_MASK) < 0:
+            # Out of watches, or the directory is missing: fall back to polling
+            os.close(fd)
+            return None
+    return fd
+
+
+# Reader for the bytes appended to a file since the last mark().
+#
+# mark() remembers the file's identity, its size and its last few bytes.
+# read_appended() then returns only the complete lines written after that
+# point, or None if the file was replaced, truncated or rewritten, in which
+# case the caller has to read it all again.
+class FileTail:
+    CHECK_BYTES = 64
+
+    def __init__(self, path):
+        self.path = path
+        self.inode = None
+        self.position = 0
+        self.check = b''
+
+    def mark(self):
+        """Remember the current end of the file as the point to read from."""
+        try:
+            with open(self.path, mode='rb') as file:
+                self.inode = os.fstat(file.fileno()).st_ino
+                self.position = file.seek(0, os.SEEK_END)
+                self.check = self._read_check(file)
+        except FileNotFoundError:
+            self.inode = None
+            self.position = 0
+            self.check = b''
+
+    def read_appended(self):
+        """The complete lines appended since mark() (maybe b''), or None if the file was rewritten."""
+        try:
+            file = open(self.path, mode='rb')
+        except FileNotFoundError:
+            return None
+        with file:
+            stat = os.fstat(file.fileno())
+            if stat.st_ino != self.inode or stat.st_size < self.position or self._read_check(file) != self.check:
+                return None
+            file.seek(self.position)
+            data = file.read(stat.st_size - self.position)
+        # A writer may be in the middle of a line; leave it for the next call
+        data = data[:data.rfind(b'\n') + 1]
+        self.position += len(data)
+        self.check = (self.check + data)[-self.CHECK_BYTES:]
+        return data
+
+    def _read_check(self, file):
+        start = max(0, self.position - self.CHECK_BYTES)
+        file.seek(start)
+        return file.read(self.position - start)
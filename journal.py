@@ -0,0 +1,164 @@
+import csv
+import json
+import os
+
+from events import row_key
+
+FIELDNAMES = ['name', 'date', 'comments', 'category', 'notifications', 'id', 'recurrence']
+
+
+# Function to replace a CSV file without ever leaving a half-written one.
+#
+# The rows go to a temporary file in the same directory, which is fsynced and
+# then renamed over `filename`; the rename is atomic, so readers and a crash
+# see either the old file or the new one.
+def write_csv_atomic(filename, rows, fieldnames=FIELDNAMES):
+    tmp_filename = filename + '.tmp'
+    with open(tmp_filename, mode='w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_filename, filename)
+    _fsync_directory(filename)
+
+
+def _fsync_directory(filename):
+    # Makes the rename itself durable; directories cannot be opened on Windows
+    if os.name != 'posix':
+        return
+    descriptor = os.open(os.path.dirname(os.path.abspath(filename)), os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+# Function to refuse rewriting the snapshot of journal storage as a plain CSV file.
+#
+# The latest changes are in "<snapshot>.journal"; rewriting the snapshot changes
+# the stamp the journal was written against, so the next load would drop them.
+def check_no_journal(filename):
+    if os.path.exists(filename + '.journal'):
+        raise ValueError(f"{filename} has a journal ({filename}.journal); open it with storage='journal'")
+
+
+# Append-only journal storage for events.
+#
+# The snapshot is a normal events.csv file. Every mutation is appended as one
+# JSON line to "<snapshot>.journal" instead of rewriting the whole CSV, and the
+# journal is folded back into the snapshot every `compact_every` records.
+#
+# The first journal line records the size and mtime of the snapshot it applies
+# to. If compaction crashes after the new snapshot is in place but before the
+# journal is reset, the header no longer matches and the stale journal is
+# ignored, so records are never replayed twice.
+class EventJournal:
+    def __init__(self, filename='events.csv', compact_every=1000, fsync=False):
+        self.filename = filename
+        self.journal_filename = filename + '.journal'
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self.pending = 0
+
+    def load_rows(self):
+        """Read the snapshot and replay the journal on top of it."""
+        try:
+            with open(self.filename, mode='r', newline='') as file:
+                # Journal records address rows by id; rows without one cannot be referenced
+                rows = {row_key(row, position): row for position, row in enumerate(csv.DictReader(file))}
+        except FileNotFoundError:
+            self.compact([])
+            return []
+
+        self.pending = 0
+        try:
+            with open(self.journal_filename, mode='rb') as file:
+                header = file.readline()
+                if not self._header_matches(header):
+                    # Missing, torn or stale header: the snapshot is the truth.
+                    self._reset_journal()
+                    return list(rows.values())
+                good_offset = file.tell()
+                for line in file:
+                    try:
+                        if not line.endswith(b'\n'):
+                            raise ValueError("torn record")
+                        self._apply(rows, json.loads(line))
+                    except (ValueError, KeyError, IndexError):
+                        # A crash mid-append leaves a partial last record; drop it.
+                        break
+                    good_offset += len(line)
+                    self.pending += 1
+            if good_offset != os.path.getsize(self.journal_filename):
+                with open(self.journal_filename, mode='r+b') as file:
+                    file.truncate(good_offset)
+        except FileNotFoundError:
+            self._reset_journal()
+        return list(rows.values())
+
+    def log_add(self, row):
+        self._append({'op': 'add', 'row': row})
+
+    def log_edit(self, row):
+        self._append({'op': 'edit', 'row': row})
+
+    def log_remove(self, event_id):
+        self._append({'op': 'remove', 'id': event_id})
+
+    def log_many(self, records):
+        """Append several records with one write."""
+        self._append_all(records)
+
+    def needs_compaction(self):
+        return self.pending >= self.compact_every
+
+    def compact(self, rows):
+        """Write `rows` as the new snapshot and start an empty journal."""
+        write_csv_atomic(self.filename, rows)
+        self._reset_journal()
+
+    def _apply(self, rows, record):
+        op = record['op']
+        if op == 'add':
+            rows[record['row']['id']] = record['row']
+        elif op == 'edit':
+            if record['row']['id'] not in rows:
+                raise KeyError(record['row']['id'])
+            rows[record['row']['id']] = record['row']
+        elif op == 'remove':
+            del rows[record['id']]
+        else:
+            raise ValueError(f"unknown journal op {op!r}")
+
+    def _append(self, record):
+        self._append_all([record])
+
+    def _append_all(self, records):
+        data = b''.join(json.dumps(record).encode() + b'\n' for record in records)
+        with open(self.journal_filename, mode='ab') as file:
+            file.write(data)
+            if self.fsync:
+                file.flush()
+                os.fsync(file.fileno())
+        self.pending += len(records)
+
+    def _snapshot_stamp(self):
+        stat = os.stat(self.filename)
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    def _header_matches(self, header):
+        try:
+            return json.loads(header).get('snapshot') == self._snapshot_stamp()
+        except (ValueError, AttributeError):
+            return False
+
+    def _reset_journal(self):
+        tmp_filename = self.journal_filename + '.tmp'
+        with open(tmp_filename, mode='wb') as file:
+            file.write(json.dumps({'snapshot': self._snapshot_stamp()}).encode() + b'\n')
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_filename, self.journal_filename)
+        self.pending = 0
@@ -0,0 +1,6 @@
+from django.apps import AppConfig
+
+
+class EventsApiConfig(AppConfig):
+    name = 'events_api'
+    verbose_name = "Event API"
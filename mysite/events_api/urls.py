@@ -0,0 +1,12 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'events_api'
+
+urlpatterns = [
+    path('', views.events, name='events'),
+    path('bulk/', views.bulk_create, name='bulk'),
+    path('summary/', views.summary, name='summary'),
+    path('<int:event_id>/', views.event, name='event'),
+]
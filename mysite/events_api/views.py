@@ -0,0 +1,205 @@
+import json
+from datetime import datetime
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_http_methods, require_POST
+
+from concurrency import ConflictError
+from event_manager import EventManager
+from events import Recurrence
+from timeframes import resolve_timeframe
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 1000
+MAX_BULK = 10000
+
+_manager = None
+
+
+# The views are async, but EventManager is not thread-safe: every call to it
+# goes through sync_to_async's thread-sensitive executor, which runs them one
+# at a time on a single thread.
+def _get_manager():
+    """The process-wide EventManager, brought up to date with other processes' changes."""
+    global _manager
+    if _manager is None:
+        _manager = EventManager(str(settings.EVENTS_FILE), storage=settings.EVENTS_STORAGE,
+                                database=str(settings.DATABASES['default']['NAME']), watch=True)
+    _manager.refresh()
+    return _manager
+
+
+def event_json(event):
+    return {
+        'id': event.id,
+        'name': event.name,
+        'date': event.date.isoformat(timespec='minutes'),
+        'comments': event.comments,
+        'category': event.category,
+        'notifications': event.notifications,
+        'recurrence': str(event.recurrence or ''),
+    }
+
+
+def error(message, status=400):
+    return JsonResponse({'error': message}, status=status)
+
+
+def parse_date(value, field):
+    try:
+        date = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field!r} must be an ISO 8601 date, e.g. 2025-01-31T09:30")
+    if date.tzinfo is not None:
+        raise ValueError(f"{field!r} must be a local time without a UTC offset")
+    return date
+
+
+def parse_event(data):
+    """add_event() keyword arguments from a JSON event object."""
+    if not isinstance(data, dict):
+        raise ValueError("an event must be a JSON object")
+    event = {key: str(data.get(key) or '') for key in ('name', 'comments', 'category', 'notifications')}
+    event['date'] = parse_date(data.get('date'), 'date')
+    try:
+        event['recurrence'] = Recurrence.parse(str(data.get('recurrence') or ''))
+    except ValueError as exc:
+        raise ValueError(f"'recurrence' is invalid: {exc}")
+    return event
+
+
+def parse_int(value, field, default, maximum=None):
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"{field!r} must be an integer")
+    if number < 0:
+        raise ValueError(f"{field!r} must not be negative")
+    if maximum is not None and number > maximum:
+        raise ValueError(f"{field!r} must be at most {maximum}")
+    return number
+
+
+def read_json(request):
+    try:
+        return json.loads(request.body)
+    except ValueError:
+        raise ValueError("the request body must be JSON")
+
+
+def _list_events(start, end, category, offset, limit):
+    manager = _get_manager()
+    if start is None and end is None and not category:
+        events = manager.list_page(offset, limit + 1)
+    else:
+        # iter_events walks the date/category indexes in date order; stop after one more than the page
+        events = list(islice(manager.iter_events(start, end, category), offset, offset + limit + 1))
+    return [event_json(event) for event in events]
+
+
+def _add_events(events):
+    return [event_json(event) for event in _get_manager().add_events(events)]
+
+
+def _remove_event(event_id):
+    manager = _get_manager()
+    if manager.get_event(event_id) is None:
+        return False
+    manager.remove_event(event_id)
+    return True
+
+
+def _get_event(event_id):
+    event = _get_manager().get_event(event_id)
+    return None if event is None else event_json(event)
+
+
+def _summarize(start, end):
+    return _get_manager().summarize_events((start, end))
+
+
+# GET: events in date order, optionally from `start` (inclusive) to `end`
+# (exclusive) or in a `timeframe` (e.g. this_week, next_7_days or
+# 01-01-2025..31-01-2025), and in `category`, `limit` at a time from `offset`.
+# With an end, repeating events appear once per occurrence inside the window.
+# POST: create one event.
+@csrf_exempt
+@require_http_methods(['GET', 'POST'])
+async def events(request):
+    try:
+        if request.method == 'POST':
+            new_event = parse_event(read_json(request))
+            created = await sync_to_async(_add_events)([new_event])
+            return JsonResponse(created[0], status=201)
+
+        params = request.GET
+        if params.get('timeframe'):
+            start, end = resolve_timeframe(params['timeframe'])
+        else:
+            start = parse_date(params['start'], 'start') if params.get('start') else None
+            end = parse_date(params['end'], 'end') if params.get('end') else None
+        offset = parse_int(params.get('offset'), 'offset', 0)
+        limit = parse_int(params.get('limit'), 'limit', DEFAULT_LIMIT, MAX_LIMIT)
+    except ValueError as exc:
+        return error(str(exc))
+    page = await sync_to_async(_list_events)(start, end, params.get('category') or None, offset, limit)
+    return JsonResponse({
+        'events': page[:limit],
+        'offset': offset,
+        'limit': limit,
+        'next_offset': offset + limit if len(page) > limit else None,
+    })
+
+
+# POST {"events": [...]}: create many events with a single write.
+@csrf_exempt
+@require_POST
+async def bulk_create(request):
+    try:
+        data = read_json(request)
+        rows = data.get('events') if isinstance(data, dict) else None
+        if not isinstance(rows, list):
+            raise ValueError("expected {\"events\": [...]}")
+        if len(rows) > MAX_BULK:
+            raise ValueError(f"at most {MAX_BULK} events per request")
+        new_events = [parse_event(row) for row in rows]
+    except ValueError as exc:
+        return error(str(exc))
+    created = await sync_to_async(_add_events)(new_events)
+    return JsonResponse({'events': created}, status=201)
+
+
+@csrf_exempt
+@require_http_methods(['GET', 'DELETE'])
+async def event(request, event_id):
+    if request.method == 'GET':
+        found = await sync_to_async(_get_event)(event_id)
+        return JsonResponse(found) if found is not None else error("event not found", status=404)
+    try:
+        removed = await sync_to_async(_remove_event)(event_id)
+    except ConflictError as exc:
+        return error(str(exc), status=409)
+    return HttpResponse(status=204) if removed else error("event not found", status=404)
+
+
+# GET ?timeframe=...: number of events per category in the timeframe (default
+# today), with the exact [start, end) window it resolved to.
+@require_GET
+async def summary(request):
+    timeframe = request.GET.get('timeframe', 'today')
+    try:
+        start, end = resolve_timeframe(timeframe)
+    except ValueError as exc:
+        return error(f"'timeframe': {exc}")
+    return JsonResponse({
+        'timeframe': timeframe,
+        'start': start.isoformat(timespec='minutes'),
+        'end': end.isoformat(timespec='minutes'),
+        'summary': await sync_to_async(_summarize)(start, end),
+    })
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -37,6 +38,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'events_api',
 ]
 
 MIDDLEWARE = [
@@ -121,3 +123,16 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Event API (events_api app)
+# The event storage modules (event_manager.py and friends) live in the repository
+# root, next to this project.
+EVENTS_ROOT = BASE_DIR.parent
+if str(EVENTS_ROOT) not in sys.path:
+    sys.path.append(str(EVENTS_ROOT))
+
+# 'journal' shares events.csv with the Streamlit app; 'sqlite' keeps the
+# events in the default database above
+EVENTS_FILE = EVENTS_ROOT / 'events.csv'
+EVENTS_STORAGE = 'journal'
@@ -0,0 +1,131 @@
+import csv
+import glob
+import heapq
+import io
+import os
+from operator import itemgetter
+
+from events import Event, row_id, to_minutes
+from fast_dates import parse_event_dates
+
+# Bytes read at a time while looking for record boundaries
+SCAN_CHUNK = 1 << 20
+
+
+def shard_files(directory):
+    """The *.csv shard files of an archive directory, in name order."""
+    return sorted(glob.glob(os.path.join(directory, '*.csv')))
+
+
+def split_byte_ranges(filename, parts):
+    """Split the rows of a CSV file into up to `parts` byte ranges that start and end on record boundaries.
+
+    Quoted fields may hold newlines (comments can span lines), so a newline only
+    ends a record if an even number of quote characters precede it; escaped
+    quotes come in pairs and leave that count even.
+    """
+    size = os.path.getsize(filename)
+    with open(filename, mode='rb') as file:
+        # Quote parity is tracked from the start of the file
+        bounds = [_next_record(file, 0, False)]
+        position, odd = bounds[0], False
+        for i in range(1, parts):
+            offset = bounds[0] + (size - bounds[0]) * i // parts
+            if offset <= bounds[-1]:
+                continue
+            odd ^= _odd_quotes(file, position, offset)
+            position = offset
+            bound = _next_record(file, offset, odd)
+            if bound > bounds[-1]:
+                bounds.append(bound)
+                position, odd = bound, False
+        bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+
+
+def _odd_quotes(file, start, end):
+    """True if the bytes in [start, end) hold an odd number of quote characters."""
+    file.seek(start)
+    count = 0
+    while start < end:
+        chunk = file.read(min(SCAN_CHUNK, end - start))
+        if not chunk:
+            break
+        count += chunk.count(b'"')
+        start += len(chunk)
+    return count % 2 == 1
+
+
+def _next_record(file, position, odd):
+    """Offset just past the first newline at or after `position` that ends a record (or the end of the file).
+
+    `odd` tells whether an odd number of quotes precede `position`.
+    """
+    file.seek(position)
+    while True:
+        chunk = file.read(SCAN_CHUNK)
+        if not chunk:
+            return position
+        start = 0
+        while True:
+            newline = chunk.find(b'\n', start)
+            if newline < 0:
+                odd ^= chunk.count(b'"', start) % 2 == 1
+                break
+            odd ^= chunk.count(b'"', start, newline) % 2 == 1
+            if not odd:
+                return position + newline + 1
+            start = newline + 1
+        position += len(chunk)
+
+
+def _read_header(filename):
+    with open(filename, mode='r', newline='') as file:
+        return next(csv.reader(file), [])
+
+
+# Worker: parse one shard file or one byte range into date-sorted plain tuples,
+# which are much cheaper to send back to the parent than Event objects.
+def _parse_task(task):
+    filename, start, end = task
+    if start is None:
+        with open(filename, mode='r', newline='') as file:
+            rows = list(csv.DictReader(file))
+    else:
+        with open(filename, mode='rb') as file:
+            file.seek(start)
+            text = file.read(end - start).decode()
+        rows = list(csv.DictReader(io.StringIO(text, newline=''), fieldnames=_read_header(filename)))
+    dates = parse_event_dates(row['date'] for row in rows)
+    records = [(to_minutes(date), row['name'], row['comments'], row['category'], row['notifications'], row_id(row),
+                row.get('recurrence'))
+               for row, date in zip(rows, dates)]
+    records.sort(key=itemgetter(0))
+    return records
+
+
+# Function to load events with a process pool.
+#
+# `path` is either a directory of shard files or a single CSV file, which is
+# split into one byte range per worker. The shards are parsed in parallel and
+# merged in date order.
+def load_parallel(path, workers=None):
+    workers = workers or os.cpu_count() or 1
+    if os.path.isdir(path):
+        tasks = [(filename, None, None) for filename in shard_files(path)]
+    elif os.path.exists(path):
+        tasks = [(path, start, end) for start, end in split_byte_ranges(path, workers)]
+    else:
+        return []
+
+    if workers == 1 or len(tasks) <= 1:
+        results = [_parse_task(task) for task in tasks]
+    else:
+        # multiprocessing is slow to import; only pay for it when a pool is used
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(min(workers, len(tasks))) as pool:
+            results = list(pool.map(_parse_task, tasks))
+    return [Event.from_minutes(name, minutes, comments, category, notifications, event_id, recurrence)
+            for minutes, name, comments, category, notifications, event_id, recurrence
+            in heapq.merge(*results, key=itemgetter(0))]
@@ -0,0 +1,258 @@
+import heapq
+import itertools
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from events import from_minutes, to_minutes
+
+# Waits are capped so a changed system clock is noticed within this time
+MAX_WAIT_SECONDS = 60
+
+logger = logging.getLogger(__name__)
+
+
+class Reminder:
+    __slots__ = ('event_id', 'name', 'date', 'category', 'message', 'due')
+
+    def __init__(self, event, due, date=None):
+        self.event_id = event.id
+        self.name = event.name
+        # The occurrence reminded of; a repeating event's first one by default
+        self.date = date or event.date
+        self.category = event.category
+        self.message = event.notifications
+        self.due = due
+
+    def to_dict(self):
+        return {
+            'event_id': self.event_id,
+            'name': self.name,
+            'date': self.date.isoformat(timespec='minutes'),
+            'category': self.category,
+            'message': self.message,
+            'due': self.due.isoformat(timespec='minutes'),
+        }
+
+
+# Scheduler for the reminders in the events' notifications field.
+#
+# Every upcoming event with a non-empty `notifications` text gets one reminder,
+# due `lead` before the event. Reminders sit in a min-heap keyed by due minute,
+# and the dispatch thread sleeps until the head is due (or an earlier one is
+# scheduled). Scheduling is O(log n); cancelling marks the entry stale in O(1)
+# and the heap is rebuilt once more than half of it is stale. A repeating
+# event only has its next occurrence in the heap; once that reminder is
+# dispatched, the one after it is scheduled. The (event id, occurrence) pairs
+# already reminded of are remembered until the occurrence starts, so a reload
+# or an edit of the event does not send them again. Reminders are
+# kept in memory only, so one that was due while the process was down fires
+# when it starts again, as long as the event itself has not started.
+#
+# Sinks are callables taking a Reminder; a failing sink is logged and does not
+# stop the others.
+class ReminderScheduler:
+    def __init__(self, sinks=(), lead=timedelta(minutes=15), clock=datetime.now):
+        self.sinks = list(sinks)
+        self.lead_minutes = lead // timedelta(minutes=1)
+        self.clock = clock
+        # (due minute, sequence number, event, occurrence minute); the sequence
+        # number breaks ties and tells a live entry from a stale one
+        self.heap = []
+        self.live = {}
+        # (event id, occurrence minute) of the reminders already returned by pop_due()
+        self.sent = set()
+        self.sequence = itertools.count()
+        self.stale = 0
+        self.condition = threading.Condition()
+        self.thread = None
+        self.stopped = False
+
+    def __len__(self):
+        return len(self.live)
+
+    def _entry(self, event, now):
+        # Only occurrences that have not started yet are reminded of
+        start = event.next_start(now) if event.notifications else None
+        while start is not None and (event.id, start) in self.sent:
+            start = event.next_start(start)
+        if start is None:
+            return None
+        return start - self.lead_minutes, next(self.sequence), event, start
+
+    def reset(self, events):
+        """Replace every reminder with those of `events` (one heapify instead of n pushes)."""
+        now = to_minutes(self.clock())
+        entries = [entry for entry in (self._entry(event, now) for event in events) if entry is not None]
+        with self.condition:
+            self._forget_started(now)
+            heapq.heapify(entries)
+            self.heap = entries
+            self.live = {event.id: sequence for _, sequence, event, _ in entries}
+            self.stale = 0
+            self.condition.notify()
+
+    def schedule(self, event):
+        """Add the reminder of a new or changed event (replacing its previous one)."""
+        entry = self._entry(event, to_minutes(self.clock()))
+        with self.condition:
+            self._cancel(event.id)
+            if entry is None:
+                return
+            heapq.heappush(self.heap, entry)
+            self.live[event.id] = entry[1]
+            if self.heap[0] is entry:
+                # Due before whatever the thread is waiting for
+                self.condition.notify()
+
+    def cancel(self, event_id):
+        with self.condition:
+            self._cancel(event_id)
+
+    def _cancel(self, event_id):
+        if self.live.pop(event_id, None) is None:
+            return
+        self.stale += 1
+        if self.stale > len(self.heap) // 2:
+            self.heap = [entry for entry in self.heap if self.live.get(entry[2].id) == entry[1]]
+            heapq.heapify(self.heap)
+            self.stale = 0
+
+    def _drop_stale_head(self):
+        while self.heap and self.live.get(self.heap[0][2].id) != self.heap[0][1]:
+            heapq.heappop(self.heap)
+            self.stale -= 1
+
+    def pop_due(self, now=None):
+        """Remove and return the reminders due at `now` (default: the clock), earliest first."""
+        now = to_minutes(now or self.clock())
+        due = []
+        with self.condition:
+            self._drop_stale_head()
+            while self.heap and self.heap[0][0] <= now:
+                minute, _, event, start = heapq.heappop(self.heap)
+                del self.live[event.id]
+                self.sent.add((event.id, start))
+                due.append(Reminder(event, from_minutes(minute), from_minutes(start)))
+                # Occurrences that started meanwhile are skipped, not reminded of late
+                following = self._entry(event, max(start, now)) if event.recurrence is not None else None
+                if following is not None:
+                    heapq.heappush(self.heap, following)
+                    self.live[event.id] = following[1]
+                self._drop_stale_head()
+            if due:
+                self._forget_started(now)
+        return due
+
+    def _forget_started(self, now):
+        # Occurrences that have started are never scheduled again, so they need not be remembered
+        self.sent = {sent for sent in self.sent if sent[1] > now}
+
+    def next_due(self):
+        """When the next reminder is due, or None if there is none."""
+        with self.condition:
+            self._drop_stale_head()
+            return from_minutes(self.heap[0][0]) if self.heap else None
+
+    def dispatch(self, reminders):
+        for reminder in reminders:
+            for sink in self.sinks:
+                try:
+                    sink(reminder)
+                except Exception:
+                    logger.exception("Reminder sink %r failed for event %s", sink, reminder.event_id)
+
+    def start(self):
+        """Dispatch reminders on a daemon thread as they fall due."""
+        if self.thread is None:
+            self.stopped = False
+            self.thread = threading.Thread(target=self._run, name='reminders', daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.stopped:
+                    reminders = self.pop_due()
+                    if reminders:
+                        break
+                    self.condition.wait(self._seconds_until_next())
+                if self.stopped:
+                    return
+            # Sinks may be slow (SMTP, HTTP); do not hold up schedule() meanwhile
+            self.dispatch(reminders)
+
+    def _seconds_until_next(self):
+        due = self.next_due()
+        if due is None:
+            return MAX_WAIT_SECONDS
+        return min(MAX_WAIT_SECONDS, max(0.0, (due - self.clock()).total_seconds()))
+
+
+# Function to send LogSink's reminders to `stream` (stderr by default). They are
+# logged at INFO, which an unconfigured process drops, so a front end that does
+# not set up logging itself calls this once.
+def enable_reminder_log(stream=None):
+    if not logger.handlers:
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter('%(asctime)s %(name)s: %(message)s'))
+        logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+
+class LogSink:
+    def __init__(self, log=logger):
+        self.log = log
+
+    def __call__(self, reminder):
+        self.log.info("Reminder: %s at %s (%s): %s", reminder.name, reminder.date.strftime('%d-%m-%Y %H:%M'),
+                      reminder.category, reminder.message)
+
+
+# Sink that mails reminders. The defaults point at a local debugging server,
+# e.g. `python -m aiosmtpd -n -l localhost:1025`, which prints what it gets.
+class SMTPSink:
+    def __init__(self, to_address, from_address='todo@localhost', host='localhost', port=1025, timeout=10):
+        self.to_address = to_address
+        self.from_address = from_address
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    def __call__(self, reminder):
+        # Imported here so the scheduler does not slow down app start-up
+        import smtplib
+        from email.message import EmailMessage
+
+        message = EmailMessage()
+        message['From'] = self.from_address
+        message['To'] = self.to_address
+        message['Subject'] = f"Reminder: {reminder.name} at {reminder.date.strftime('%d-%m-%Y %H:%M')}"
+        message.set_content(reminder.message)
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            smtp.send_message(message)
+
+
+# Sink that POSTs each reminder as JSON to a URL.
+class WebhookSink:
+    def __init__(self, url, timeout=10):
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self, reminder):
+        import urllib.request
+
+        request = urllib.request.Request(self.url, data=json.dumps(reminder.to_dict()).encode(),
+                                         headers={'Content-Type': 'application/json'}, method='POST')
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
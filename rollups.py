@@ -0,0 +1,88 @@
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+
+MINUTES_PER_DAY = 24 * 60
+# 1970-01-01 was a Thursday; shifting by 3 makes weeks start on Monday
+_WEEK_SHIFT = 3
+_EPOCH_DAY = date(1970, 1, 1)
+
+
+def _week_of(day):
+    return (day + _WEEK_SHIFT) // 7
+
+
+def _month_of(day):
+    calendar_day = _EPOCH_DAY + timedelta(days=day)
+    return calendar_day.year, calendar_day.month
+
+
+def _month_start(year, month):
+    return (date(year, month, 1) - _EPOCH_DAY).days
+
+
+def _next_month_start(year, month):
+    return _month_start(year + 1, 1) if month == 12 else _month_start(year, month + 1)
+
+
+# Materialized per-category counts.
+#
+# Every event is counted in its day, (Monday-based) week and month bucket, and
+# the buckets are updated as events are added and removed. A summary over a
+# window adds up the largest whole buckets that fit inside it, and only the
+# partial days at either end are counted from the date index, so the cost
+# depends on the number of buckets rather than on the number of events.
+class CategoryRollup:
+    def __init__(self, events=()):
+        self.days = defaultdict(Counter)
+        self.weeks = defaultdict(Counter)
+        self.months = defaultdict(Counter)
+        for event in events:
+            self.add(event)
+
+    def add(self, event):
+        self._update(event, 1)
+
+    def remove(self, event):
+        self._update(event, -1)
+
+    def _update(self, event, delta):
+        day = event.minutes // MINUTES_PER_DAY
+        for buckets, key in ((self.days, day), (self.weeks, _week_of(day)), (self.months, _month_of(day))):
+            counts = buckets[key]
+            counts[event.category] += delta
+            if counts[event.category] <= 0:
+                del counts[event.category]
+                if not counts:
+                    del buckets[key]
+
+    def summarize(self, low, high, time_index):
+        """Per-category counts of the events with a minute stamp in [low, high)."""
+        summary = Counter()
+        first_day = -(-low // MINUTES_PER_DAY)
+        end_day = high // MINUTES_PER_DAY
+        if first_day >= end_day:
+            # No whole day inside the window
+            self._count(summary, time_index.between_minutes(low, high))
+            return dict(summary)
+
+        self._count(summary, time_index.between_minutes(low, first_day * MINUTES_PER_DAY))
+        day = first_day
+        while day < end_day:
+            year, month = _month_of(day)
+            next_month = _next_month_start(year, month)
+            if day == _month_start(year, month) and next_month <= end_day:
+                summary.update(self.months.get((year, month), {}))
+                day = next_month
+            elif (day + _WEEK_SHIFT) % 7 == 0 and day + 7 <= end_day:
+                summary.update(self.weeks.get(_week_of(day), {}))
+                day += 7
+            else:
+                summary.update(self.days.get(day, {}))
+                day += 1
+        self._count(summary, time_index.between_minutes(end_day * MINUTES_PER_DAY, high))
+        return dict(summary)
+
+    @staticmethod
+    def _count(summary, events):
+        for event in events:
+            summary[event.category] += 1
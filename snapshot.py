@@ -0,0 +1,229 @@
+import argparse
+import csv
+import heapq
+import mmap
+import os
+import struct
+from datetime import datetime
+from operator import attrgetter
+
+import numpy as np
+
+from event_stream import category_matches
+from events import Event, minute_bounds, repeats_between, row_id, to_minutes
+from fast_dates import parse_event_dates
+from journal import _fsync_directory, write_csv_atomic
+
+SNAPSHOT_SUFFIX = '.evsnap'
+MAGIC = b'EVSNAP02'
+# magic, row count, category count, heap size
+_HEADER = struct.Struct('<8sqqq')
+# Each row has four strings in the heap: name, comments, notifications, recurrence
+_NAME, _COMMENTS, _NOTIFICATIONS, _RECURRENCE = range(4)
+_STRINGS_PER_ROW = 4
+
+
+def _layout(count, categories, heap_size):
+    """(offset, dtype, length) of every section after the header, 8-byte aligned."""
+    sections = {}
+    offset = _HEADER.size
+    for name, dtype, length in (('ids', np.int64, count),
+                                ('minutes', np.int64, count),
+                                ('positions', np.int64, count),
+                                ('category_codes', np.int32, count),
+                                ('category_offsets', np.int64, categories + 1),
+                                ('string_offsets', np.int64, count * _STRINGS_PER_ROW + 1),
+                                ('heap', np.uint8, heap_size)):
+        offset = (offset + 7) & ~7
+        sections[name] = (offset, np.dtype(dtype), length)
+        offset += np.dtype(dtype).itemsize * length
+    return sections
+
+
+# Function to write events as a binary snapshot.
+#
+# `rows` are dicts in the Event.to_dict() format, in insertion order. The rows
+# are stored sorted by date, so a timeframe query is two binary searches over
+# the fixed-width minutes column, and `positions` keeps each row's place in
+# insertion order. Categories are dictionary-encoded as int32 codes; the
+# category names and every row's strings are UTF-8 in one heap addressed by
+# offset columns. Like write_csv_atomic, the file is replaced atomically.
+def write_snapshot(filename, rows):
+    rows = list(rows)
+    minutes = np.array([to_minutes(date) for date in parse_event_dates(row['date'] for row in rows)],
+                       dtype=np.int64)
+    positions = np.argsort(minutes, kind='stable')
+    rows = [rows[i] for i in positions]
+    categories, codes = np.unique(np.array([row['category'] or '' for row in rows], dtype=object).astype(str),
+                                  return_inverse=True)
+
+    strings = [category.encode() for category in categories]
+    for row in rows:
+        strings += [(row['name'] or '').encode(), (row['comments'] or '').encode(),
+                    (row['notifications'] or '').encode(), (row.get('recurrence') or '').encode()]
+    offsets = np.zeros(len(strings) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in strings], out=offsets[1:])
+    heap = b''.join(strings)
+
+    columns = {
+        # 0 stands for "no id yet"; EventManager hands out ids from 1
+        'ids': [row_id(row) or 0 for row in rows],
+        'minutes': minutes[positions],
+        'positions': positions,
+        'category_codes': codes,
+        'category_offsets': offsets[:len(categories) + 1],
+        'string_offsets': offsets[len(categories):],
+        'heap': np.frombuffer(heap, dtype=np.uint8),
+    }
+    tmp_filename = filename + '.tmp'
+    with open(tmp_filename, mode='wb') as file:
+        file.write(_HEADER.pack(MAGIC, len(rows), len(categories), len(heap)))
+        for name, (offset, dtype, length) in _layout(len(rows), len(categories), len(heap)).items():
+            file.write(b'\0' * (offset - file.tell()))
+            file.write(np.asarray(columns[name], dtype=dtype).tobytes())
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_filename, filename)
+    _fsync_directory(filename)
+
+
+# Read-only, memory-mapped view of a snapshot written by write_snapshot().
+#
+# The columns are NumPy arrays over the mapping itself, so opening a snapshot
+# costs a few system calls whatever its size, and window/category queries and
+# summaries run on the mapped columns without building a Python object per
+# row. Strings are only decoded for the rows that are actually read.
+class EventSnapshot:
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, mode='rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.map) < _HEADER.size:
+            self.map.close()
+            raise ValueError(f"{filename} is not an event snapshot")
+        magic, count, categories, heap_size = _HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            self.map.close()
+            raise ValueError(f"{filename} is not an event snapshot")
+        sections = _layout(count, categories, heap_size)
+        for name, (offset, dtype, length) in sections.items():
+            setattr(self, name, np.frombuffer(self.map, dtype=dtype, count=length, offset=offset))
+        self.heap_start = sections['heap'][0]
+        self.categories = [self._string(self.category_offsets, code) for code in range(categories)]
+
+    def close(self):
+        # The arrays point into the mapping and must go before it can be closed
+        for name in _layout(0, 0, 0):
+            setattr(self, name, None)
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self.minutes)
+
+    def _string(self, offsets, index):
+        start = self.heap_start + int(offsets[index])
+        return self.map[start:self.heap_start + int(offsets[index + 1])].decode()
+
+    def window(self, start=None, end=None, include_end=False):
+        """The [low, high) row range with start <= date < end (or <= end)."""
+        low = None if start is None else minute_bounds(start, start)[0]
+        high = None if end is None else minute_bounds(end, end, include_end)[1]
+        first = 0 if low is None else int(np.searchsorted(self.minutes, low, side='left'))
+        last = len(self) if high is None else int(np.searchsorted(self.minutes, high, side='left'))
+        return first, max(first, last)
+
+    def _in_category(self, rows, category, contains):
+        # Match against the (small) category dictionary once, not against every row
+        matching = [code for code, value in enumerate(self.categories) if category_matches(value, category, contains)]
+        return rows[np.isin(self.category_codes[rows], matching)]
+
+    def select(self, start=None, end=None, category=None, contains=False, include_end=False):
+        """Row numbers (in date order) inside the optional window and category, as an array."""
+        first, last = self.window(start, end, include_end)
+        rows = np.arange(first, last)
+        return self._in_category(rows, category, contains) if category else rows
+
+    def recurring(self, category=None, contains=False):
+        """The repeating events, optionally only those in `category`."""
+        lengths = np.diff(self.string_offsets)[_RECURRENCE::_STRINGS_PER_ROW]
+        rows = np.flatnonzero(lengths)
+        return list(self.iter_events(self._in_category(rows, category, contains) if category else rows))
+
+    def occurrences(self, start=None, end=None, category=None, contains=False, include_end=False):
+        """Yield the events in the window in date order, with the later occurrences of repeating ones."""
+        events = self.iter_events(self.select(start, end, category, contains, include_end))
+        if end is None:
+            # An unbounded window only lists the stored events
+            yield from events
+            return
+        low, high = minute_bounds(start or datetime.min, end, include_end)
+        yield from heapq.merge(events, repeats_between(self.recurring(category, contains), low, high),
+                               key=attrgetter('minutes'))
+
+    def summarize(self, start=None, end=None, include_end=False):
+        """Number of events per category inside the optional window."""
+        first, last = self.window(start, end, include_end)
+        counts = np.bincount(self.category_codes[first:last], minlength=len(self.categories))
+        summary = {self.categories[code]: int(counts[code]) for code in np.flatnonzero(counts)}
+        if end is not None:
+            # Repeats are counted arithmetically, without generating them
+            low, high = minute_bounds(start or datetime.min, end, include_end)
+            for event in self.recurring():
+                repeats = event.count_repeats(low, high)
+                if repeats:
+                    summary[event.category] = summary.get(event.category, 0) + repeats
+        return summary
+
+    def event(self, row):
+        strings = self.string_offsets
+        base = row * _STRINGS_PER_ROW
+        event_id = int(self.ids[row])
+        return Event.from_minutes(self._string(strings, base + _NAME), int(self.minutes[row]),
+                                  self._string(strings, base + _COMMENTS), self.categories[self.category_codes[row]],
+                                  self._string(strings, base + _NOTIFICATIONS), event_id or None,
+                                  self._string(strings, base + _RECURRENCE))
+
+    def iter_events(self, rows=None):
+        """Yield the events at the given row numbers (all rows in date order by default)."""
+        for row in range(len(self)) if rows is None else rows:
+            yield self.event(int(row))
+
+    def load_events(self):
+        """All events, in insertion order."""
+        return list(self.iter_events(np.argsort(self.positions)))
+
+
+def snapshot_to_csv(snapshot_filename, csv_filename):
+    with EventSnapshot(snapshot_filename) as snapshot:
+        write_csv_atomic(csv_filename, [event.to_dict() for event in snapshot.load_events()])
+
+
+def csv_to_snapshot(csv_filename, snapshot_filename):
+    with open(csv_filename, mode='r', newline='') as file:
+        write_snapshot(snapshot_filename, csv.DictReader(file))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert events between events.csv and the binary snapshot format.")
+    parser.add_argument('direction', choices=('to-snapshot', 'to-csv'))
+    parser.add_argument('source')
+    parser.add_argument('target', nargs='?', help="defaults to the source with the other extension")
+    args = parser.parse_args()
+
+    suffix = SNAPSHOT_SUFFIX if args.direction == 'to-snapshot' else '.csv'
+    target = args.target or os.path.splitext(args.source)[0] + suffix
+    if args.direction == 'to-snapshot':
+        csv_to_snapshot(args.source, target)
+    else:
+        snapshot_to_csv(args.source, target)
+    print(f"Wrote {target}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+import argparse
+import contextlib
+import csv
+import os
+import sqlite3
+from datetime import datetime
+
+# The Django project's database (see mysite/mysite/settings.py)
+DEFAULT_DATABASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mysite', 'db.sqlite3')
+
+CSV_DATE_FORMAT = '%d-%m-%Y %H:%M'
+# ISO dates sort correctly as text, so range queries can use the date index
+SQL_DATE_FORMAT = '%Y-%m-%d %H:%M'
+
+_SELECT_ROWS = ("SELECT id, name, strftime('%d-%m-%Y %H:%M', date) AS date, comments, category, notifications, "
+                "recurrence FROM todo_events")
+_COLUMNS = ('id', 'name', 'date', 'comments', 'category', 'notifications', 'recurrence')
+
+
+# SQLite storage for events.
+#
+# Rows are returned in the same dict format as Event.to_dict(), so the
+# managers can build Events with Event.from_dict().
+class SQLiteEventStore:
+    def __init__(self, database=DEFAULT_DATABASE):
+        self.database = database
+        self.connection = sqlite3.connect(database, check_same_thread=False)
+        self.in_transaction = False
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS todo_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL DEFAULT '',
+                    date TEXT NOT NULL,
+                    comments TEXT NOT NULL DEFAULT '',
+                    category TEXT NOT NULL DEFAULT '',
+                    notifications TEXT NOT NULL DEFAULT '',
+                    recurrence TEXT NOT NULL DEFAULT ''
+                )""")
+            columns = {row['name'] for row in self.connection.execute("PRAGMA table_info(todo_events)")}
+            if 'recurrence' not in columns:
+                # Tables created before events could repeat
+                self.connection.execute("ALTER TABLE todo_events ADD COLUMN recurrence TEXT NOT NULL DEFAULT ''")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS todo_events_date ON todo_events (date)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS todo_events_category ON todo_events (category, date)")
+
+    def close(self):
+        self.connection.close()
+
+    def load(self):
+        """Return every event row (with its id), in insertion order."""
+        cursor = self.connection.execute(_SELECT_ROWS + " ORDER BY id")
+        return [_row_dict(row) for row in cursor]
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Group the writes made inside the block into one transaction (rolled back on error)."""
+        if self.in_transaction:
+            yield
+            return
+        self.in_transaction = True
+        try:
+            with self.connection:
+                yield
+        finally:
+            self.in_transaction = False
+
+    def _write(self, query, params):
+        if self.in_transaction:
+            return self.connection.execute(query, params)
+        with self.connection:
+            return self.connection.execute(query, params)
+
+    def insert(self, row):
+        """Insert a row and return the id the database gave it."""
+        cursor = self._write(
+            "INSERT INTO todo_events (name, date, comments, category, notifications, recurrence) "
+            "VALUES (?, ?, ?, ?, ?, ?)", _row_params(row))
+        return cursor.lastrowid
+
+    def insert_many(self, rows, batch_size=10000):
+        """Insert rows in batched transactions; returns the number of rows inserted."""
+        count = 0
+        batch = []
+        for row in rows:
+            batch.append(_row_params(row))
+            if len(batch) >= batch_size:
+                count += self._insert_batch(batch)
+                batch = []
+        if batch:
+            count += self._insert_batch(batch)
+        return count
+
+    def update(self, row_id, row, expected=None):
+        """Update a row; with `expected`, only if it still holds those values. Returns whether it did."""
+        query, params = _match_row(row_id, expected)
+        cursor = self._write("UPDATE todo_events SET name = ?, date = ?, comments = ?, category = ?, "
+                             "notifications = ?, recurrence = ? " + query, _row_params(row) + params)
+        return cursor.rowcount > 0
+
+    def delete(self, row_id, expected=None):
+        """Delete a row; with `expected`, only if it still holds those values. Returns whether it did."""
+        query, params = _match_row(row_id, expected)
+        return self._write("DELETE FROM todo_events " + query, params).rowcount > 0
+
+    def replace_all(self, rows):
+        """Replace the whole table with `rows` (keeping their ids) in one transaction."""
+        with self.connection:
+            self.connection.execute("DELETE FROM todo_events")
+            self.connection.executemany(
+                "INSERT INTO todo_events (id, name, date, comments, category, notifications, recurrence) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", ((row.get('id'),) + _row_params(row) for row in rows))
+
+    def select(self, start, end, category=None, contains=False, include_end=False):
+        """Rows in the time window, optionally filtered by exact or case-insensitive substring category."""
+        query = _SELECT_ROWS + " WHERE date >= ? AND date " + ("<= ?" if include_end else "< ?")
+        params = [start.strftime(SQL_DATE_FORMAT), end.strftime(SQL_DATE_FORMAT)]
+        if category and contains:
+            query += " AND instr(lower(category), lower(?)) > 0"
+            params.append(category)
+        elif category:
+            query += " AND category = ?"
+            params.append(category)
+        cursor = self.connection.execute(query + " ORDER BY date, id", params)
+        return [_row_dict(row) for row in cursor]
+
+    def summarize(self, start, end, include_end=False):
+        query = ("SELECT category, COUNT(*) FROM todo_events WHERE date >= ? AND date "
+                 + ("<= ?" if include_end else "< ?") + " GROUP BY category ORDER BY category")
+        cursor = self.connection.execute(query, (start.strftime(SQL_DATE_FORMAT), end.strftime(SQL_DATE_FORMAT)))
+        return {category: count for category, count in cursor}
+
+    def import_csv(self, filename, batch_size=10000):
+        with open(filename, mode='r', newline='') as file:
+            return self.insert_many(csv.DictReader(file), batch_size)
+
+    def _insert_batch(self, batch):
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO todo_events (name, date, comments, category, notifications, recurrence) "
+                "VALUES (?, ?, ?, ?, ?, ?)", batch)
+        return len(batch)
+
+
+def _row_params(row):
+    date = datetime.strptime(row['date'], CSV_DATE_FORMAT).strftime(SQL_DATE_FORMAT)
+    return (row['name'] or '', date, row['comments'] or '', row['category'] or '', row['notifications'] or '',
+            row.get('recurrence') or '')
+
+
+def _match_row(row_id, expected):
+    # Optimistic concurrency: the WHERE clause also checks the values we last saw
+    if expected is None:
+        return "WHERE id = ?", (row_id,)
+    return ("WHERE id = ? AND name = ? AND date = ? AND comments = ? AND category = ? AND notifications = ? "
+            "AND recurrence = ?", (row_id,) + _row_params(expected))
+
+
+def _row_dict(row):
+    return {key: row[key] for key in _COLUMNS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import events from a CSV file into the SQLite event store.")
+    parser.add_argument('csv_file', nargs='?', default='events.csv')
+    parser.add_argument('--database', default=DEFAULT_DATABASE)
+    args = parser.parse_args()
+
+    store = SQLiteEventStore(args.database)
+    count = store.import_csv(args.csv_file)
+    store.close()
+    print(f"Imported {count} event(s) from {args.csv_file} into {args.database}")
+
+
+if __name__ == '__main__':
+    main()
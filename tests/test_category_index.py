@@ -0,0 +1,64 @@
+import random
+from datetime import datetime
+
+import pytest
+
+from category_index import CategoryIndex
+from events import Event, to_minutes
+from time_index import TimeIndex
+
+CATEGORIES = ('Work', 'work', 'Homework', 'personal', 'health', 'wo', '', None)
+
+
+@pytest.fixture
+def events():
+    rng = random.Random(5)
+    first = to_minutes(datetime(2025, 3, 1))
+    return [Event.from_minutes(f'event {i}', first + rng.randrange(30 * 1440), '', rng.choice(CATEGORIES), '', i)
+            for i in range(2000)]
+
+
+def brute_force(events, low, high, match):
+    return sorted((event for event in events if low <= event.minutes < high and match(event.category or '')),
+                  key=lambda event: event.minutes)
+
+
+def test_categories_match_exactly_or_as_a_case_insensitive_substring(events):
+    index = CategoryIndex(events)
+    assert index.categories('work') == ['work']
+    assert index.categories('Personal') == []
+    assert sorted(index.categories('WOR', contains=True)) == ['Homework', 'Work', 'work']
+    assert sorted(index.categories('wo', contains=True)) == ['Homework', 'Work', 'wo', 'work']
+    assert index.categories('xyz', contains=True) == []
+
+
+@pytest.mark.parametrize('category, contains', [('work', False), ('ork', True), ('WORK', True), ('e', True),
+                                                ('health', False), ('', False)])
+def test_select_matches_a_scan_for_short_and_long_windows(events, category, contains):
+    index, time_index = CategoryIndex(events), TimeIndex(events)
+    first = to_minutes(datetime(2025, 3, 1))
+    if contains:
+        def match(name):
+            return category.lower() in name.lower()
+    else:
+        def match(name):
+            return name == category
+
+    # A short window walks the dates, a long one the category postings
+    for low, high in [(first + 1440, first + 1500), (first, first + 30 * 1440)]:
+        selected = index.select(category, time_index, low, high, contains)
+        expected = brute_force(events, low, high, match)
+        assert sorted(event.id for event in selected) == sorted(event.id for event in expected)
+        assert [event.minutes for event in selected] == [event.minutes for event in expected]
+
+
+def test_removing_the_last_event_of_a_category_forgets_it(events):
+    index = CategoryIndex(events)
+    for event in events:
+        if event.category != 'Homework':
+            index.remove(event)
+
+    assert list(index.events_by_category) == ['Homework']
+    assert index.categories('work', contains=True) == ['Homework']
+    assert index.categories('wo', contains=True) == ['Homework']
+    assert all(index.trigrams.values()) and set().union(*index.trigrams.values()) == {'homework'}
@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from event_manager import EventManager
+
+
+def test_to_columnar_filters_and_summarizes_like_the_manager(tmp_path):
+    manager = EventManager(str(tmp_path / 'events.csv'))
+    manager.add_event('meeting', datetime(2025, 3, 3, 9), 'slides', 'Work', 'ping')
+    manager.add_event('gym', datetime(2025, 3, 4, 18), '', 'health', '')
+    manager.add_event('next month', datetime(2025, 4, 1, 9), '', 'work', '')
+    # Prompts left blank in the CLI give None fields
+    manager.add_event('blank', datetime(2025, 3, 5, 12), None, None, None)
+
+    store = manager.to_columnar()
+    start, end = datetime(2025, 3, 1), datetime(2025, 4, 1)
+    assert len(store) == 4
+    assert store.summarize_events(start, end) == {'': 1, 'Work': 1, 'health': 1}
+    assert store.filter_events(start, end, 'WOR').names.to_list() == ['meeting']
+    assert list(store.filter_events(start, end).rows()) == [
+        {'name': 'meeting', 'date': '03-03-2025 09:00', 'comments': 'slides', 'category': 'Work',
+         'notifications': 'ping'},
+        {'name': 'gym', 'date': '04-03-2025 18:00', 'comments': '', 'category': 'health', 'notifications': ''},
+        {'name': 'blank', 'date': '05-03-2025 12:00', 'comments': '', 'category': '', 'notifications': ''}]
@@ -0,0 +1,202 @@
+import csv
+import os
+import threading
+from datetime import datetime
+
+import pytest
+
+from concurrency import ConflictError, FileLock, merge_changes, reserve_ids
+from event_manager import EventManager
+from events import row_key
+from journal import FIELDNAMES
+
+
+def make_row(event_id, name, date='01-03-2025 10:00'):
+    return {'name': name, 'date': date, 'comments': '', 'category': 'work', 'notifications': '',
+            'id': '' if event_id is None else str(event_id), 'recurrence': ''}
+
+
+def keyed(rows):
+    return {row_key(row, position): row for position, row in enumerate(rows)}
+
+
+def test_merge_applies_changes_to_the_other_writers_rows():
+    rows = keyed([make_row(1, 'a'), make_row(2, 'b'), make_row(3, 'c')])
+    changes = [('add', 4, None, make_row(4, 'd')),
+               ('edit', 1, make_row(1, 'a'), make_row(1, 'a2')),
+               ('remove', 2, make_row(2, 'b'), None)]
+
+    applied, conflicts = merge_changes(rows, changes)
+
+    assert conflicts == []
+    assert [op for op, *_ in applied] == ['add', 'edit', 'remove']
+    assert sorted(row['name'] for row in rows.values()) == ['a2', 'c', 'd']
+
+
+def test_merge_reports_changes_to_rows_someone_else_changed():
+    rows = keyed([make_row(1, 'edited elsewhere'), make_row(2, 'b')])
+    changes = [('edit', 1, make_row(1, 'a'), make_row(1, 'a2')),
+               ('remove', 2, make_row(2, 'old b'), None)]
+
+    applied, conflicts = merge_changes(rows, changes)
+
+    assert applied == []
+    assert conflicts == [1, 2]
+    assert rows[1]['name'] == 'edited elsewhere' and rows[2]['name'] == 'b'
+
+
+def test_merge_ignores_removing_a_row_that_is_already_gone():
+    rows = keyed([make_row(1, 'a')])
+    applied, conflicts = merge_changes(rows, [('remove', 2, make_row(2, 'b'), None)])
+    assert (applied, conflicts) == ([], [])
+    assert list(rows) == [1]
+
+
+def test_merge_renumbers_an_add_whose_id_is_taken():
+    rows = keyed([make_row(1, 'a'), make_row(5, 'theirs')])
+    changes = [('add', 5, None, make_row(5, 'ours')),
+               ('edit', 5, make_row(5, 'ours'), make_row(5, 'ours, edited'))]
+
+    applied, conflicts = merge_changes(rows, changes)
+
+    assert conflicts == []
+    assert [event_id for _, event_id, _, _ in applied] == [6, 6]
+    assert rows[5]['name'] == 'theirs'
+    assert rows[6] == dict(make_row(6, 'ours, edited'), id=6)
+
+
+def test_merge_keeps_every_row_without_an_id():
+    rows = keyed([make_row(1, 'a'), make_row(None, 'no id 1'), make_row(None, 'no id 2')])
+    assert len(rows) == 3
+
+    applied, conflicts = merge_changes(rows, [('add', 1, None, make_row(1, 'ours'))])
+
+    assert conflicts == []
+    # The id-less keys are not ids: the next free id comes from the numbered rows
+    assert applied[0][1] == 2
+    assert sorted(row['name'] for row in rows.values()) == ['a', 'no id 1', 'no id 2', 'ours']
+
+
+def test_add_keeps_rows_another_process_appended_without_ids(tmp_path):
+    filename = str(tmp_path / 'events.csv')
+    manager = EventManager(filename)
+    manager.add_event('ours', datetime(2025, 3, 1, 9), '', 'work', '')
+
+    # Another writer appends two rows from an older version without ids
+    with open(filename, mode='a', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
+        writer.writerow(make_row(None, 'theirs 1'))
+        writer.writerow(make_row(None, 'theirs 2'))
+    manager.add_event('ours too', datetime(2025, 3, 2, 9), '', 'work', '')
+
+    events = EventManager(filename).events
+    assert sorted(event.name for event in events) == ['ours', 'ours too', 'theirs 1', 'theirs 2']
+    assert len({event.id for event in events}) == 4
+
+
+def test_file_lock_is_reentrant_and_excludes_other_holders(tmp_path):
+    path = str(tmp_path / 'events.csv.lock')
+    lock, other = FileLock(path), FileLock(path)
+    acquired = threading.Event()
+
+    def take_other():
+        with other:
+            acquired.set()
+
+    with lock:
+        with lock:
+            thread = threading.Thread(target=take_other)
+            thread.start()
+            # Locks taken through different open files exclude each other
+            assert not acquired.wait(0.2)
+        assert not acquired.is_set()
+    thread.join(5)
+    assert acquired.is_set()
+
+
+def test_reserved_ids_never_overlap(tmp_path):
+    counter = str(tmp_path / 'events.csv.ids')
+    first = reserve_ids(counter, 1, count=10)
+    second = reserve_ids(counter, 1, count=10)
+    # A writer that already uses higher ids moves the counter past them
+    third = reserve_ids(counter, 100, count=10)
+
+    assert (first, second, third) == (range(1, 11), range(11, 21), range(100, 110))
+    assert reserve_ids(counter, 1, count=1) == range(110, 111)
+
+
+@pytest.mark.parametrize('storage', ['csv', 'journal'])
+def test_two_writers_on_one_file_keep_each_others_changes(tmp_path, storage):
+    filename = str(tmp_path / 'events.csv')
+    first, second = EventManager(filename, storage=storage), EventManager(filename, storage=storage)
+
+    shared = first.add_event('shared', datetime(2025, 3, 1, 9), '', 'work', '')
+    second.add_event('from second', datetime(2025, 3, 1, 10), '', 'work', '')
+    first.add_event('from first', datetime(2025, 3, 1, 11), '', 'work', '')
+    # `second` loaded before `shared` was added, and merges its edit into the file
+    second.refresh()
+    second.edit_event(shared.id, name='shared, edited')
+
+    events = EventManager(filename, storage=storage).events
+    assert sorted(event.name for event in events) == ['from first', 'from second', 'shared, edited']
+    assert len({event.id for event in events}) == 3
+
+
+@pytest.mark.parametrize('storage', ['csv', 'journal'])
+def test_edit_of_an_event_another_writer_changed_is_a_conflict(tmp_path, storage):
+    filename = str(tmp_path / 'events.csv')
+    first = EventManager(filename, storage=storage)
+    meeting = first.add_event('meeting', datetime(2025, 3, 1, 9), '', 'work', '')
+    second = EventManager(filename, storage=storage)
+
+    first.edit_event(meeting.id, name='meeting at 10')
+    with pytest.raises(ConflictError) as error:
+        second.edit_event(meeting.id, name='meeting at 11')
+
+    assert error.value.event_ids == [meeting.id]
+    # The losing writer is shown the winning version
+    assert second.get_event(meeting.id).name == 'meeting at 10'
+    assert EventManager(filename, storage=storage).get_event(meeting.id).name == 'meeting at 10'
+
+
+
+@pytest.mark.parametrize('rewrite', [True, False])
+def test_rows_without_ids_read_by_refresh_do_not_share_ids_with_later_adds(tmp_path, rewrite):
+    filename = str(tmp_path / 'events.csv')
+    manager = EventManager(filename)
+    manager.add_event('ours', datetime(2025, 3, 1, 9), '', 'work', '')
+
+    if rewrite:
+        # Another tool rewrites the file (refresh() reloads it) with a row without an id
+        with open(filename, newline='') as file:
+            rows = list(csv.DictReader(file))
+        with open(filename + '.new', mode='w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
+            writer.writeheader()
+            writer.writerows(rows + [make_row(None, 'theirs')])
+        os.replace(filename + '.new', filename)
+    else:
+        # ... or appends one (refresh() tails it in)
+        with open(filename, mode='a', newline='') as file:
+            csv.DictWriter(file, fieldnames=FIELDNAMES).writerow(make_row(None, 'theirs'))
+    assert manager.refresh()
+    manager.add_event('ours too', datetime(2025, 3, 2, 9), '', 'work', '')
+
+    assert sorted(event.name for event in manager.events) == ['ours', 'ours too', 'theirs']
+    assert sorted(event.name for event in EventManager(filename).events) == ['ours', 'ours too', 'theirs']
+
+
+@pytest.mark.parametrize('storage', ['csv', 'journal'])
+def test_refresh_raises_the_conflict_of_a_background_write(tmp_path, storage):
+    filename = str(tmp_path / 'events.csv')
+    first = EventManager(filename, storage=storage)
+    meeting = first.add_event('meeting', datetime(2025, 3, 1, 9), '', 'work', '')
+    second = EventManager(filename, storage=storage, durability='async')
+
+    first.edit_event(meeting.id, name='meeting at 10')
+    second.edit_event(meeting.id, name='meeting at 11')
+    with pytest.raises(ConflictError):
+        second.refresh()
+
+    assert second.get_event(meeting.id).name == 'meeting at 10'
+    assert not second.refresh()
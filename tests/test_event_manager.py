@@ -0,0 +1,84 @@
+from datetime import datetime
+
+import pytest
+
+from event_manager import EventManager
+
+
+@pytest.fixture(params=['csv', 'journal', 'sqlite'])
+def storage(request, tmp_path):
+    return {'filename': str(tmp_path / 'events.csv'), 'storage': request.param,
+            'database': str(tmp_path / 'db.sqlite3')}
+
+
+def names(manager):
+    return sorted(event.name for event in manager.events)
+
+
+def test_batch_is_saved_once_it_completes(storage):
+    manager = EventManager(**storage)
+    with manager.batch():
+        manager.add_event('first', datetime(2025, 3, 1, 9), '', 'work', '')
+        manager.add_event('second', datetime(2025, 3, 2, 9), '', 'work', '')
+
+    assert names(EventManager(**storage)) == ['first', 'second']
+
+
+def test_failed_batch_keeps_none_of_its_changes(storage):
+    manager = EventManager(**storage)
+    kept = manager.add_event('kept', datetime(2025, 3, 1, 9), '', 'work', '')
+
+    with pytest.raises(ValueError):
+        with manager.batch():
+            manager.add_event('added', datetime(2025, 3, 2, 9), '', 'work', '')
+            manager.remove_event(kept.id)
+            manager.add_event('bad', datetime(2025, 3, 3, 9), '', 'work', '', recurrence='yearly')
+
+    assert names(manager) == ['kept']
+    assert names(EventManager(**storage)) == ['kept']
+
+
+def test_failed_import_adds_nothing(storage):
+    manager = EventManager(**storage)
+    events = [{'name': 'ok', 'date': datetime(2025, 3, 1, 9), 'comments': '', 'category': 'work',
+               'notifications': ''},
+              ('bad', datetime(2025, 3, 2, 9), '', 'work', '', 'yearly')]
+
+    with pytest.raises(ValueError):
+        manager.add_events(events)
+
+    assert manager.count() == 0
+    assert EventManager(**storage).count() == 0
+
+
+def test_edit_and_remove_are_saved(storage):
+    manager = EventManager(**storage)
+    meeting = manager.add_event('meeting', datetime(2025, 3, 1, 9), '', 'work', '')
+    lunch = manager.add_event('lunch', datetime(2025, 3, 1, 12), '', 'personal', '')
+
+    manager.edit_event(meeting.id, name='meeting, moved', date=datetime(2025, 3, 4, 9))
+    manager.remove_event(lunch.id)
+    with pytest.raises(KeyError):
+        manager.remove_event(lunch.id)
+
+    [event] = EventManager(**storage).events
+    assert (event.id, event.name, event.date) == (meeting.id, 'meeting, moved', datetime(2025, 3, 4, 9))
+
+
+def test_category_matching_mode(tmp_path):
+    filename = str(tmp_path / 'events.csv')
+    EventManager(filename).add_event('meeting', datetime(2025, 3, 1, 9), '', 'Work', '')
+    window = (datetime(2025, 3, 1), datetime(2025, 3, 2))
+
+    assert EventManager(filename).filter_events(window, 'wor') == []
+    assert [event.name for event in EventManager(filename, category_contains=True).filter_events(window, 'wor')] \
+        == ['meeting']
+
+
+def test_async_writes_are_on_disk_after_flush(tmp_path):
+    filename = str(tmp_path / 'events.csv')
+    manager = EventManager(filename, storage='journal', durability='async')
+    manager.add_events([('event', datetime(2025, 3, 1, hour), '', 'work', '') for hour in range(10)])
+    manager.flush()
+
+    assert EventManager(filename, storage='journal').count() == 10
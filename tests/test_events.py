@@ -0,0 +1,117 @@
+import random
+import sys
+from datetime import datetime
+
+import pytest
+
+from events import Event, Recurrence, from_minutes, repeats_between, to_minutes
+
+
+def dates(event, low, high):
+    return [occurrence.date for occurrence in event.repeats(to_minutes(low), to_minutes(high))]
+
+
+def brute_force(rule, start, low, high):
+    """Occurrence numbers in [low, high), found by stepping through every occurrence from the first."""
+    numbers = []
+    n = 0
+    end = rule.end(start)
+    while (end is None or n < end) and (minutes := rule.occurrence(start, n)) < high:
+        if minutes >= low:
+            numbers.append(n)
+        n += 1
+    return numbers
+
+
+@pytest.mark.parametrize('text', ['daily', 'weekly;interval=2', 'monthly;count=12',
+                                  'monthly;interval=3;until=31-12-2025 23:59'])
+def test_recurrence_text_round_trips(text):
+    assert str(Recurrence.parse(text)) == text
+    assert Recurrence.parse(text) == Recurrence.parse(text.upper())
+
+
+@pytest.mark.parametrize('text', ['yearly', 'daily;interval=0', 'daily;count=0', 'daily;every=2', 'weekly;count=',
+                                  'daily;interval=x', 'monthly;until=2025'])
+def test_invalid_recurrence_raises_value_error(text):
+    with pytest.raises(ValueError):
+        Recurrence.parse(text)
+
+
+def test_monthly_dates_on_the_31st_fall_on_the_last_day_of_shorter_months():
+    event = Event('rent', datetime(2025, 1, 31, 9), '', 'home', '', recurrence='monthly')
+    assert dates(event, datetime(2025, 1, 1), datetime(2025, 6, 1)) == [
+        datetime(2025, 2, 28, 9), datetime(2025, 3, 31, 9), datetime(2025, 4, 30, 9), datetime(2025, 5, 31, 9)]
+    leap = Event('rent', datetime(2024, 1, 31, 9), '', 'home', '', recurrence='monthly')
+    assert dates(leap, datetime(2024, 2, 1), datetime(2024, 3, 1)) == [datetime(2024, 2, 29, 9)]
+
+
+def test_repeats_leave_out_the_first_occurrence_and_respect_count_and_until():
+    standup = Event('standup', datetime(2025, 3, 3, 9), '', 'work', '', recurrence='daily;count=3')
+    assert dates(standup, datetime(2025, 3, 1), datetime(2025, 4, 1)) == [datetime(2025, 3, 4, 9),
+                                                                           datetime(2025, 3, 5, 9)]
+    review = Event('review', datetime(2025, 3, 3, 9), '', 'work', '',
+                   recurrence='weekly;interval=2;until=31-03-2025 09:00')
+    assert dates(review, datetime(2025, 3, 1), datetime(2025, 5, 1)) == [datetime(2025, 3, 17, 9),
+                                                                          datetime(2025, 3, 31, 9)]
+
+
+def test_repeats_keep_the_id_and_fields_of_the_event():
+    event = Event('standup', datetime(2025, 3, 3, 9), 'notes', 'work', 'ping', id=7, recurrence='daily')
+    [repeat] = event.repeats(to_minutes(datetime(2025, 3, 4)), to_minutes(datetime(2025, 3, 5)))
+    assert (repeat.id, repeat.name, repeat.comments, repeat.category, repeat.notifications) == \
+        (7, 'standup', 'notes', 'work', 'ping')
+    assert str(repeat.recurrence) == 'daily'
+
+
+@pytest.mark.parametrize('text', ['daily;interval=3', 'weekly;count=40', 'monthly', 'monthly;interval=5;count=30',
+                                  'daily;until=01-06-2027 12:00'])
+def test_between_and_count_repeats_match_a_brute_force_walk(text):
+    rng = random.Random(text)
+    rule = Recurrence.parse(text)
+    start = to_minutes(datetime(2024, 1, 31, 12, 30))
+    event = Event.from_minutes('event', start, '', 'work', '', recurrence=rule)
+    for _ in range(200):
+        low = start + rng.randrange(-30, 1200) * 1440 + rng.randrange(1440)
+        high = low + rng.randrange(0, 400) * 1440 + rng.randrange(1440)
+        expected = brute_force(rule, start, low, high)
+        assert list(rule.between(start, low, high)) == expected
+        assert event.count_repeats(low, high) == len([n for n in expected if n > 0])
+
+
+def test_next_start_is_strictly_after_the_given_minute():
+    standup = Event('standup', datetime(2025, 3, 3, 9), '', 'work', '', recurrence='daily;count=2')
+    first = to_minutes(datetime(2025, 3, 3, 9))
+    assert standup.next_start(first - 1) == first
+    assert from_minutes(standup.next_start(first)) == datetime(2025, 3, 4, 9)
+    assert standup.next_start(first + 1440) is None
+
+    once = Event('dentist', datetime(2025, 3, 3, 9), '', 'health', '')
+    assert once.next_start(first - 1) == first
+    assert once.next_start(first) is None
+
+
+def test_monthly_occurrences_past_the_last_year_are_later_than_any_window():
+    rule = Recurrence.parse('monthly;interval=12000')
+    start = to_minutes(datetime(9000, 1, 1))
+    assert rule.occurrence(start, 1) == sys.maxsize
+    event = Event.from_minutes('far', start, '', 'x', '', recurrence=rule)
+    assert event.next_start(start) is None
+
+
+def test_repeats_between_merges_the_events_in_date_order():
+    morning = Event('morning', datetime(2025, 3, 3, 8), '', 'work', '', recurrence='daily')
+    weekly = Event('weekly', datetime(2025, 3, 3, 7), '', 'work', '', recurrence='weekly')
+    low, high = to_minutes(datetime(2025, 3, 9)), to_minutes(datetime(2025, 3, 12))
+    merged = list(repeats_between([morning, weekly], low, high))
+
+    assert [event.date for event in merged] == sorted(event.date for event in merged)
+    assert [event.name for event in merged] == ['morning', 'weekly', 'morning', 'morning']
+    assert merged[1].date == datetime(2025, 3, 10, 7)
+
+
+def test_event_round_trips_through_its_row():
+    event = Event('standup', datetime(2025, 3, 3, 9), 'a, "quoted"\nnote', 'work', 'ping', id=3,
+                  recurrence='weekly;count=4')
+    again = Event.from_dict({key: '' if value is None else str(value) for key, value in event.to_dict().items()})
+    assert again.to_dict() == event.to_dict()
+    assert again.date == datetime(2025, 3, 3, 9)
@@ -0,0 +1,94 @@
+import json
+import os
+import sys
+
+import pytest
+
+django = pytest.importorskip('django')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'mysite'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mysite.settings')
+django.setup()
+
+from django.test import Client, override_settings  # noqa: E402
+
+from events_api import views  # noqa: E402
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # A fresh manager on a file of our own for every test
+    monkeypatch.setattr(views, '_manager', None)
+    with override_settings(EVENTS_FILE=tmp_path / 'events.csv', EVENTS_STORAGE='journal', ALLOWED_HOSTS=['testserver']):
+        yield Client()
+
+
+def post(client, path, data):
+    return client.post(path, json.dumps(data), content_type='application/json')
+
+
+def event(name, date, **fields):
+    return dict({'name': name, 'date': date, 'category': 'work'}, **fields)
+
+
+def test_created_events_are_listed_in_date_order_a_page_at_a_time(client):
+    assert post(client, '/api/events/', event('second', '2025-03-02T09:00')).status_code == 201
+    response = post(client, '/api/events/bulk/', {'events': [event('first', '2025-03-01T09:00'),
+                                                             event('third', '2025-03-03T09:00')]})
+    assert response.status_code == 201
+    assert [created['name'] for created in response.json()['events']] == ['first', 'third']
+
+    page = client.get('/api/events/', {'limit': 2}).json()
+    assert [listed['name'] for listed in page['events']] == ['first', 'second']
+    assert (page['offset'], page['limit'], page['next_offset']) == (0, 2, 2)
+    page = client.get('/api/events/', {'limit': 2, 'offset': 2}).json()
+    assert [listed['name'] for listed in page['events']] == ['third'] and page['next_offset'] is None
+
+
+def test_windows_categories_and_repeats(client):
+    post(client, '/api/events/bulk/', {'events': [
+        event('standup', '2025-03-03T09:00', recurrence='daily;count=3'),
+        event('gym', '2025-03-04T18:00', category='health'),
+        event('later', '2025-04-01T09:00')]})
+
+    window = client.get('/api/events/', {'timeframe': '03-03-2025..05-03-2025'}).json()
+    assert [(listed['name'], listed['date']) for listed in window['events']] == [
+        ('standup', '2025-03-03T09:00'), ('standup', '2025-03-04T09:00'), ('gym', '2025-03-04T18:00'),
+        ('standup', '2025-03-05T09:00')]
+    by_category = client.get('/api/events/', {'start': '2025-03-01T00:00', 'end': '2025-05-01T00:00',
+                                              'category': 'work'}).json()
+    assert [listed['name'] for listed in by_category['events']] == ['standup'] * 3 + ['later']
+
+    summary = client.get('/api/events/summary/', {'timeframe': '01-03-2025..31-03-2025'}).json()
+    assert summary['summary'] == {'work': 3, 'health': 1}
+    assert (summary['start'], summary['end']) == ('2025-03-01T00:00', '2025-04-01T00:00')
+
+
+def test_get_and_delete_one_event(client):
+    created = post(client, '/api/events/', event('meeting', '2025-03-01T09:00', comments='slides')).json()
+    path = f"/api/events/{created['id']}/"
+
+    assert client.get(path).json() == created
+    assert client.delete(path).status_code == 204
+    assert client.get(path).status_code == 404
+    assert client.delete(path).status_code == 404
+
+
+@pytest.mark.parametrize('path, body', [
+    ('/api/events/', {'name': 'x', 'date': 'tomorrow'}),
+    ('/api/events/', {'name': 'x', 'date': '2025-03-01T09:00+02:00'}),
+    ('/api/events/', {'name': 'x', 'date': '2025-03-01T09:00', 'recurrence': 'yearly'}),
+    ('/api/events/', ['not', 'an', 'object']),
+    ('/api/events/bulk/', {'rows': []}),
+])
+def test_invalid_events_are_rejected(client, path, body):
+    response = post(client, path, body)
+    assert response.status_code == 400 and 'error' in response.json()
+    assert client.get('/api/events/').json()['events'] == []
+
+
+@pytest.mark.parametrize('params', [{'limit': 'x'}, {'offset': -1}, {'limit': views.MAX_LIMIT + 1},
+                                    {'timeframe': 'someday'}, {'start': '01/03/2025'}])
+def test_invalid_queries_are_rejected(client, params):
+    response = client.get('/api/events/', params)
+    assert response.status_code == 400 and 'error' in response.json()
@@ -0,0 +1,110 @@
+import csv
+import os
+from datetime import datetime
+
+import pytest
+
+from event_manager import EventManager
+from file_watcher import FileTail, FileWatcher
+from journal import FIELDNAMES
+
+
+def test_tail_reads_complete_appended_lines_only(tmp_path):
+    path = tmp_path / 'events.csv'
+    path.write_bytes(b'header\n')
+    tail = FileTail(str(path))
+    tail.mark()
+    assert tail.read_appended() == b''
+
+    with open(path, mode='ab') as file:
+        file.write(b'one\ntw')
+    assert tail.read_appended() == b'one\n'
+    with open(path, mode='ab') as file:
+        file.write(b'o\n')
+    assert tail.read_appended() == b'two\n'
+
+
+@pytest.mark.parametrize('how', ['rename', 'truncate', 'rewrite'])
+def test_tail_reports_a_rewritten_file(tmp_path, how):
+    path = tmp_path / 'events.csv'
+    path.write_bytes(b'header\none\n')
+    tail = FileTail(str(path))
+    tail.mark()
+    if how == 'rename':
+        # Same bytes, but a different file
+        (tmp_path / 'new.csv').write_bytes(b'header\none\n')
+        os.replace(tmp_path / 'new.csv', path)
+    else:
+        path.write_bytes(b'header\n' if how == 'truncate' else b'HEADER\none\ntwo\n')
+    assert tail.read_appended() is None
+
+
+def test_watcher_sees_writes_and_renames_of_its_files_only(tmp_path):
+    path = tmp_path / 'events.csv'
+    path.write_text('header\n')
+    watcher = FileWatcher([str(path)], poll_interval=0.01)
+    assert not watcher.changed()
+
+    (tmp_path / 'other.txt').write_text('x')
+    # Polling only looks at the watched files; inotify ignores other names
+    assert not watcher.changed(timeout=0.05)
+    (tmp_path / 'new.csv').write_text('header\nrow\n')
+    os.replace(tmp_path / 'new.csv', path)
+    assert watcher.changed(timeout=1)
+    watcher.close()
+
+
+def append_row(filename, name, event_id=''):
+    with open(filename, mode='a', newline='') as file:
+        csv.DictWriter(file, fieldnames=FIELDNAMES).writerow(
+            {'name': name, 'date': '01-03-2025 10:00', 'comments': '', 'category': 'work', 'notifications': '',
+             'id': event_id, 'recurrence': ''})
+
+
+def test_refresh_tails_rows_appended_to_the_csv_file(tmp_path, monkeypatch):
+    filename = str(tmp_path / 'events.csv')
+    manager = EventManager(filename, watch=True)
+    manager.add_event('ours', datetime(2025, 3, 1, 9), '', 'work', '')
+    manager.refresh()
+    assert not manager.refresh()
+
+    append_row(filename, 'theirs', 40)
+    monkeypatch.setattr(manager, 'reload', lambda: pytest.fail("reloaded instead of tailing"))
+    assert manager.refresh()
+
+    assert manager.get_event(40).name == 'theirs'
+    assert [event.name for event in manager.filter_events((datetime(2025, 3, 1), datetime(2025, 3, 2)))] == \
+        ['ours', 'theirs']
+    assert manager.summarize_events((datetime(2025, 3, 1), datetime(2025, 3, 2))) == {'work': 2}
+
+
+def test_refresh_tails_another_writers_journal_records(tmp_path, monkeypatch):
+    filename = str(tmp_path / 'events.csv')
+    first = EventManager(filename, storage='journal')
+    meeting = first.add_event('meeting', datetime(2025, 3, 1, 9), 'slides', 'work', '')
+    lunch = first.add_event('lunch', datetime(2025, 3, 1, 12), '', 'personal', '')
+    first.search('slides')
+
+    second = EventManager(filename, storage='journal')
+    second.edit_event(meeting.id, comments='notes')
+    second.remove_event(lunch.id)
+    gym = second.add_event('gym', datetime(2025, 3, 1, 18), '', 'health', '')
+
+    monkeypatch.setattr(first, 'reload', lambda: pytest.fail("reloaded instead of tailing"))
+    assert first.refresh()
+    assert [(event.id, event.comments) for event in first.events] == [(meeting.id, 'notes'), (gym.id, '')]
+    assert first.search('notes') == [first.get_event(meeting.id)] and first.search('slides') == []
+    assert first.summarize_events((datetime(2025, 3, 1), datetime(2025, 3, 2))) == {'work': 1, 'health': 1}
+
+
+def test_refresh_reloads_a_rewritten_file(tmp_path):
+    filename = str(tmp_path / 'events.csv')
+    first, second = EventManager(filename), EventManager(filename)
+    meeting = first.add_event('meeting', datetime(2025, 3, 1, 9), '', 'work', '')
+    second.refresh()
+    # The edit rewrites the whole file
+    second.edit_event(meeting.id, name='meeting, moved')
+
+    assert first.refresh()
+    assert [event.name for event in first.events] == ['meeting, moved']
+    assert not first.refresh()
@@ -0,0 +1,131 @@
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+from event_manager import EventManager
+from journal import EventJournal, check_no_journal, write_csv_atomic
+
+
+def make_row(event_id, name):
+    return {'name': name, 'date': '01-03-2025 10:00', 'comments': '', 'category': 'work', 'notifications': '',
+            'id': event_id, 'recurrence': ''}
+
+
+def names(rows):
+    return sorted(row['name'] for row in rows)
+
+
+def test_journal_replays_on_top_of_the_snapshot(tmp_path):
+    filename = str(tmp_path / 'events.csv')
+    journal = EventJournal(filename)
+    journal.compact([make_row(1, 'a'), make_row(2, 'b')])
+    journal.log_add(make_row(3, 'c'))
+    journal.log_edit(make_row(1, 'a2'))
+    journal.log_remove(2)
+
+    reopened = EventJournal(filename)
+    assert names(reopened.load_rows()) == ['a2', 'c']
+    assert reopened.pending == 3
+
+
+def test_torn_last_record_is_dropped_and_truncated(tmp_path):
+    filename = str(tmp_path / 'events.csv')
+    journal = EventJournal(filename)
+    journal.compact([make_row(1, 'a')])
+    journal.log_add(make_row(2, 'b'))
+    good_size = os.path.getsize(journal.journal_filename)
+    # A crash in the middle of an append
+    with open(journal.journal_filename, mode='ab') as file:
+        file.write(json.dumps({'op': 'add', 'row': make_row(3, 'c')}).encode()[:20])
+
+    reopened = EventJournal(filename)
+    assert names(reopened.load_rows()) == ['a', 'b']
+    assert os.path.getsize(journal.journal_filename) == good_size
+
+    # Appends after the recovery are read back normally
+    reopened.log_add(make_row(4, 'd'))
+    assert names(EventJournal(filename).load_rows()) == ['a', 'b', 'd']
+
+
+def test_replay_stops_at_a_record_that_does_not_apply(tmp_path):
+    filename = str(tmp_path / 'events.csv')
+    journal = EventJournal(filename)
+    journal.compact([make_row(1, 'a')])
+    journal.log_many([{'op': 'add', 'row': make_row(2, 'b')}, {'op': 'edit', 'row': make_row(9, 'missing')},
+                      {'op': 'add', 'row': make_row(3, 'c')}])
+
+    assert names(EventJournal(filename).load_rows()) == ['a', 'b']
+
+
+def test_journal_of_an_older_snapshot_is_not_replayed(tmp_path):
+    filename = str(tmp_path / 'events.csv')
+    journal = EventJournal(filename)
+    journal.compact([make_row(1, 'a')])
+    journal.log_remove(1)
+    journal.log_add(make_row(2, 'b'))
+    # Compaction crashed after writing the new snapshot but before starting a new journal
+    write_csv_atomic(filename, [make_row(2, 'b'), make_row(3, 'c')])
+
+    reopened = EventJournal(filename)
+    assert names(reopened.load_rows()) == ['b', 'c']
+    assert reopened.pending == 0
+    # The stale journal was replaced by an empty one for the new snapshot
+    with open(journal.journal_filename, mode='rb') as file:
+        assert len(file.readlines()) == 1
+
+
+def test_missing_snapshot_starts_empty(tmp_path):
+    filename = str(tmp_path / 'events.csv')
+    assert EventJournal(filename).load_rows() == []
+    assert os.path.exists(filename) and os.path.exists(filename + '.journal')
+
+
+def test_compaction_keeps_the_events(tmp_path):
+    filename = str(tmp_path / 'events.csv')
+    journal = EventJournal(filename, compact_every=3)
+    journal.compact([])
+    rows = [make_row(i, f'event {i}') for i in range(1, 5)]
+    for row in rows:
+        journal.log_add(row)
+    assert journal.needs_compaction()
+    journal.compact(rows)
+
+    assert not journal.needs_compaction()
+    assert names(EventJournal(filename).load_rows()) == names(rows)
+
+
+def test_manager_changes_survive_a_restart_with_journal_storage(tmp_path):
+    filename = str(tmp_path / 'events.csv')
+    manager = EventManager(filename, storage='journal', durability='fsync')
+    meeting = manager.add_event('meeting', datetime(2025, 3, 1, 9), '', 'work', '')
+    lunch = manager.add_event('lunch', datetime(2025, 3, 1, 12), '', 'personal', '')
+    manager.edit_event(meeting.id, name='meeting, moved')
+    manager.remove_event(lunch.id)
+    # The changes are in the journal; the snapshot was never rewritten
+    with open(filename) as file:
+        assert len(file.readlines()) == 1
+
+    assert [(event.id, event.name) for event in EventManager(filename, storage='journal').events] == \
+        [(meeting.id, 'meeting, moved')]
+
+
+
+def test_csv_storage_refuses_a_file_with_a_journal(tmp_path):
+    filename = str(tmp_path / 'events.csv')
+    EventManager(filename, storage='journal').add_event('kept', datetime(2025, 3, 1, 9), '', 'work', '')
+
+    with pytest.raises(ValueError, match='journal'):
+        EventManager(filename)
+    assert [event.name for event in EventManager(filename, storage='journal').events] == ['kept']
+
+
+def test_check_no_journal_guards_the_snapshot_of_journal_storage(tmp_path):
+    filename = str(tmp_path / 'events.csv')
+    write_csv_atomic(filename, [make_row(1, 'a')])
+    check_no_journal(filename)
+
+    EventJournal(filename).load_rows()
+    with pytest.raises(ValueError, match='journal'):
+        check_no_journal(filename)
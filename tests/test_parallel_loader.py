@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import parallel_loader
+from events import Event
+from journal import write_csv_atomic
+from parallel_loader import _parse_task, load_parallel, split_byte_ranges
+
+
+def write_events(path, count):
+    events = [Event(f'event {i}', datetime(2025, 1, 1) + timedelta(hours=i),
+                    # Quoted fields with newlines, commas and escaped quotes
+                    f'line one\nline "two", {i}\n' if i % 3 else '', 'work', 'say "hi"\n' if i % 5 == 0 else '',
+                    id=i + 1)
+              for i in range(count)]
+    write_csv_atomic(str(path), [event.to_dict() for event in events])
+    return events
+
+
+def as_tuples(events):
+    return [(event.id, event.name, event.date, event.comments, event.notifications) for event in events]
+
+
+@pytest.mark.parametrize('parts', [1, 2, 3, 5, 8, 50])
+def test_byte_ranges_split_on_records_with_newlines_in_quoted_fields(tmp_path, monkeypatch, parts):
+    # Small chunks exercise the scans across chunk ends
+    monkeypatch.setattr(parallel_loader, 'SCAN_CHUNK', 7)
+    path = tmp_path / 'events.csv'
+    events = write_events(path, 40)
+
+    ranges = split_byte_ranges(str(path), parts)
+
+    assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+    records = [record for start, end in ranges for record in _parse_task((str(path), start, end))]
+    assert sorted(record[5] for record in records) == [event.id for event in events]
+    assert sorted(records, key=lambda record: record[5])[1][2] == events[1].comments
+
+
+def test_load_parallel_matches_a_sequential_load(tmp_path):
+    path = tmp_path / 'events.csv'
+    events = write_events(path, 200)
+
+    assert as_tuples(load_parallel(str(path), 2)) == as_tuples(events)
+    assert as_tuples(load_parallel(str(path), 1)) == as_tuples(events)
+
+
+def test_empty_file_has_no_ranges(tmp_path):
+    path = tmp_path / 'events.csv'
+    write_csv_atomic(str(path), [])
+    assert split_byte_ranges(str(path), 4) == []
+    assert load_parallel(str(path), 4) == []
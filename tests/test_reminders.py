@@ -0,0 +1,81 @@
+import io
+import logging
+from datetime import datetime, timedelta
+
+from events import Event
+from reminders import LogSink, Reminder, ReminderScheduler, enable_reminder_log, logger
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_scheduler(now):
+    return ReminderScheduler(lead=timedelta(minutes=15), clock=Clock(now))
+
+
+def test_reminder_is_due_lead_before_the_event():
+    meeting = Event('meeting', datetime(2025, 3, 3, 10), '', 'work', 'bring slides', id=1)
+    scheduler = make_scheduler(datetime(2025, 3, 3, 9))
+    scheduler.reset([meeting])
+
+    assert scheduler.next_due() == datetime(2025, 3, 3, 9, 45)
+    assert scheduler.pop_due(datetime(2025, 3, 3, 9, 44)) == []
+    [reminder] = scheduler.pop_due(datetime(2025, 3, 3, 9, 45))
+    assert (reminder.event_id, reminder.date) == (1, datetime(2025, 3, 3, 10))
+
+
+def test_sent_reminder_is_not_sent_again_after_a_reset():
+    meeting = Event('meeting', datetime(2025, 3, 3, 10), '', 'work', 'bring slides', id=1)
+    scheduler = make_scheduler(datetime(2025, 3, 3, 9, 50))
+
+    scheduler.reset([meeting])
+    assert [reminder.name for reminder in scheduler.pop_due()] == ['meeting']
+    # A reload of the events, or an edit that keeps the time, must not remind again
+    scheduler.reset([meeting])
+    scheduler.schedule(meeting)
+    assert scheduler.pop_due() == []
+    assert len(scheduler) == 0
+
+
+def test_moved_event_is_reminded_of_again():
+    meeting = Event('meeting', datetime(2025, 3, 3, 10), '', 'work', 'bring slides', id=1)
+    scheduler = make_scheduler(datetime(2025, 3, 3, 9, 50))
+    scheduler.reset([meeting])
+    scheduler.pop_due()
+
+    meeting.date = datetime(2025, 3, 3, 10, 5)
+    scheduler.schedule(meeting)
+    assert [reminder.date for reminder in scheduler.pop_due()] == [datetime(2025, 3, 3, 10, 5)]
+
+
+def test_repeating_event_reminds_of_the_next_occurrence_once():
+    standup = Event('standup', datetime(2025, 3, 3, 9), '', 'work', 'daily', id=2, recurrence='daily')
+    clock = Clock(datetime(2025, 3, 3, 8, 50))
+    scheduler = ReminderScheduler(lead=timedelta(minutes=15), clock=clock)
+    scheduler.reset([standup])
+
+    assert [reminder.date for reminder in scheduler.pop_due()] == [datetime(2025, 3, 3, 9)]
+    scheduler.reset([standup])
+    assert scheduler.pop_due() == []
+    assert scheduler.next_due() == datetime(2025, 3, 4, 8, 45)
+
+    clock.now = datetime(2025, 3, 4, 8, 45)
+    assert [reminder.date for reminder in scheduler.pop_due()] == [datetime(2025, 3, 4, 9)]
+
+
+def test_log_sink_reminders_are_printed_once_the_log_is_enabled():
+    meeting = Event('meeting', datetime(2025, 3, 3, 10), '', 'work', 'bring slides', id=1)
+    stream = io.StringIO()
+    enable_reminder_log(stream)
+    try:
+        LogSink()(Reminder(meeting, datetime(2025, 3, 3, 9, 45)))
+    finally:
+        logger.handlers.clear()
+        logger.setLevel(logging.NOTSET)
+
+    assert 'Reminder: meeting at 03-03-2025 10:00 (work): bring slides' in stream.getvalue()
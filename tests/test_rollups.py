@@ -0,0 +1,67 @@
+import random
+from collections import Counter
+from datetime import datetime
+
+import pytest
+
+from events import Event, to_minutes
+from rollups import CategoryRollup
+from time_index import TimeIndex
+
+CATEGORIES = ('work', 'personal', 'health')
+
+
+def make_events(rng, count, first, days):
+    return [Event.from_minutes(f'event {i}', first + rng.randrange(days * 1440), '', rng.choice(CATEGORIES), '', i)
+            for i in range(count)]
+
+
+def brute_force(events, low, high):
+    return dict(Counter(event.category for event in events if low <= event.minutes < high))
+
+
+@pytest.fixture
+def rng():
+    return random.Random(7)
+
+
+def test_summaries_match_a_scan_over_random_windows(rng):
+    first = to_minutes(datetime(2024, 11, 1))
+    events = make_events(rng, 3000, first, 240)
+    rollup, index = CategoryRollup(events), TimeIndex(events)
+
+    for _ in range(300):
+        low = first - 2000 + rng.randrange(250 * 1440)
+        # Windows from minutes to months, so every bucket size is walked
+        high = low + rng.choice((rng.randrange(120), rng.randrange(3 * 1440), rng.randrange(120 * 1440)))
+        assert rollup.summarize(low, high, index) == brute_force(events, low, high)
+
+
+def test_whole_calendar_periods_use_the_buckets(rng):
+    first = to_minutes(datetime(2025, 1, 1))
+    events = make_events(rng, 1000, first, 365)
+    rollup, index = CategoryRollup(events), TimeIndex(events)
+
+    for low, high in [(datetime(2025, 1, 1), datetime(2026, 1, 1)),
+                      (datetime(2025, 2, 1), datetime(2025, 3, 1)),
+                      # Monday to Monday
+                      (datetime(2025, 3, 3), datetime(2025, 3, 17)),
+                      (datetime(2025, 3, 5, 12), datetime(2025, 3, 5, 13))]:
+        low, high = to_minutes(low), to_minutes(high)
+        assert rollup.summarize(low, high, index) == brute_force(events, low, high)
+
+
+def test_removed_events_leave_the_counts_and_empty_buckets(rng):
+    first = to_minutes(datetime(2025, 1, 1))
+    events = make_events(rng, 500, first, 60)
+    rollup, index = CategoryRollup(events), TimeIndex(events)
+    for event in events[::2]:
+        rollup.remove(event)
+        index.remove(event)
+    kept = events[1::2]
+
+    low, high = first, first + 60 * 1440
+    assert rollup.summarize(low, high, index) == brute_force(kept, low, high)
+    for event in kept:
+        rollup.remove(event)
+    assert (rollup.days, rollup.weeks, rollup.months) == ({}, {}, {})
@@ -0,0 +1,84 @@
+import random
+from datetime import datetime
+
+import pytest
+
+from event_manager import EventManager
+from events import Event, Recurrence, to_minutes
+from snapshot import EventSnapshot, csv_to_snapshot, snapshot_to_csv, write_snapshot
+
+CATEGORIES = ('work', 'Homework', 'personal', '')
+
+
+@pytest.fixture
+def events():
+    rng = random.Random(11)
+    first = to_minutes(datetime(2025, 3, 1))
+    events = [Event.from_minutes(f'event {i} ü', first + rng.randrange(60 * 1440), f'note {i}',
+                                 rng.choice(CATEGORIES), rng.choice(('', 'ping')), i + 1)
+              for i in range(500)]
+    events[3].recurrence = Recurrence.parse('weekly;count=5')
+    events[7].id = None
+    return events
+
+
+def rows(events):
+    return [event.to_dict() for event in events]
+
+
+def test_snapshot_round_trips_the_rows_in_insertion_order(tmp_path, events):
+    filename = str(tmp_path / 'events.evsnap')
+    write_snapshot(filename, rows(events))
+
+    with EventSnapshot(filename) as snapshot:
+        assert len(snapshot) == len(events)
+        assert rows(snapshot.load_events()) == rows(events)
+        # Stored in date order
+        assert list(snapshot.minutes) == sorted(event.minutes for event in events)
+
+    # And through the CSV converters
+    snapshot_to_csv(filename, str(tmp_path / 'events.csv'))
+    csv_to_snapshot(str(tmp_path / 'events.csv'), str(tmp_path / 'again.evsnap'))
+    with EventSnapshot(str(tmp_path / 'again.evsnap')) as snapshot:
+        assert rows(snapshot.load_events()) == rows(events)
+
+
+def test_empty_and_foreign_files(tmp_path):
+    filename = str(tmp_path / 'events.evsnap')
+    write_snapshot(filename, [])
+    with EventSnapshot(filename) as snapshot:
+        assert len(snapshot) == 0 and snapshot.summarize() == {}
+
+    (tmp_path / 'events.csv').write_text('name,date\n')
+    with pytest.raises(ValueError):
+        EventSnapshot(str(tmp_path / 'events.csv'))
+
+
+@pytest.mark.parametrize('timeframe', [(datetime(2025, 3, 10), datetime(2025, 3, 17)),
+                                       (datetime(2025, 3, 1), datetime(2025, 5, 1)),
+                                       (datetime(2025, 3, 5, 10, 30), datetime(2025, 3, 5, 11))])
+@pytest.mark.parametrize('category', [None, 'work'])
+def test_mapped_queries_match_the_loaded_manager(tmp_path, events, timeframe, category):
+    filename = str(tmp_path / 'events.evsnap')
+    write_snapshot(filename, rows(events))
+    mapped = EventManager(filename, lazy=True, category_contains=True)
+    loaded = EventManager(filename, category_contains=True)
+
+    def listed(manager):
+        # Loading gives the row without an id one; the mapped rows leave it None
+        return [(event.name, event.date) for event in manager.filter_events(timeframe, category)]
+
+    assert listed(mapped) == listed(loaded)
+    assert mapped.summarize_events(timeframe) == loaded.summarize_events(timeframe)
+    # The queries ran on the mapping; the events were never loaded
+    assert mapped.by_id is None
+
+
+def test_manager_saves_changes_to_the_snapshot(tmp_path):
+    filename = str(tmp_path / 'events.evsnap')
+    manager = EventManager(filename)
+    meeting = manager.add_event('meeting', datetime(2025, 3, 1, 9), '', 'work', '')
+    manager.add_event('lunch', datetime(2025, 3, 1, 12), '', 'personal', '')
+    manager.edit_event(meeting.id, name='meeting, moved')
+
+    assert [event.name for event in EventManager(filename).events] == ['meeting, moved', 'lunch']
@@ -0,0 +1,59 @@
+from datetime import datetime
+
+from event_manager import EventManager
+from events import Event
+from text_index import TextIndex
+
+
+def make_event(event_id, name, comments='', notifications='', day=1):
+    return Event(name, datetime(2025, 3, day, 9), comments, 'work', notifications, id=event_id)
+
+
+def ids(results):
+    return [event.id for event, _ in results]
+
+
+def test_every_term_must_match_as_a_word_or_a_prefix():
+    index = TextIndex([make_event(1, 'Team meeting', 'quarterly budget'),
+                       make_event(2, 'Budget review', notifications='send the budget'),
+                       make_event(3, 'Dentist', None, None)])
+
+    # Two mentions of "budget" rank above one
+    assert ids(index.search('budget')) == [2, 1]
+    assert ids(index.search('BUDGET meet')) == [1]
+    assert ids(index.search('bud')) == [2, 1]
+    assert ids(index.search('budget dentist')) == []
+    assert index.search('  ') == []
+
+
+def test_whole_words_rank_above_prefixes_and_ties_go_to_the_earlier_event():
+    index = TextIndex([make_event(1, 'plan', day=3), make_event(2, 'planning', day=2), make_event(3, 'plan', day=1)])
+    assert ids(index.search('plan')) == [3, 1, 2]
+    assert ids(index.search('plan', limit=1)) == [3]
+
+
+def test_added_and_removed_events_are_found_and_forgotten():
+    first, second = make_event(1, 'gym'), make_event(2, 'gym class')
+    index = TextIndex([first])
+    index.add(second)
+    assert ids(index.search('gym')) == [1, 2]
+    assert 'class' in index.vocabulary
+
+    index.remove(second)
+    assert ids(index.search('gym')) == [1]
+    assert ids(index.search('class')) == [] and 'class' not in index.vocabulary
+    index.remove(first)
+    assert index.postings == {} and index.vocabulary == [] and index.size == 0
+
+
+def test_manager_search_follows_edits_after_the_first_search(tmp_path):
+    manager = EventManager(str(tmp_path / 'events.csv'))
+    meeting = manager.add_event('meeting', datetime(2025, 3, 1, 9), 'slides', 'work', '')
+    assert manager.search('slides') == [meeting]
+
+    manager.edit_event(meeting.id, comments='notes')
+    lunch = manager.add_event('lunch', datetime(2025, 3, 1, 12), 'notes too', 'personal', '')
+    assert manager.search('slides') == []
+    assert manager.search('notes') == [meeting, lunch]
+    manager.remove_event(meeting.id)
+    assert manager.search('notes') == [lunch]
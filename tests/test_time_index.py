@@ -0,0 +1,42 @@
+import random
+from datetime import datetime
+
+import pytest
+
+from events import Event, to_minutes
+from time_index import TimeIndex
+
+
+def test_queries_match_a_sorted_list_through_adds_and_removes():
+    rng = random.Random(3)
+    first = to_minutes(datetime(2025, 1, 1))
+    index, kept = TimeIndex(), []
+    for i in range(3000):
+        if kept and rng.random() < 0.45:
+            event = kept.pop(rng.randrange(len(kept)))
+            index.remove(event)
+        else:
+            # Few distinct minutes, so equal dates (kept in insertion order) are common
+            event = Event.from_minutes(f'event {i}', first + rng.randrange(500) * 30, '', 'work', '', i)
+            index.add(event)
+            kept.append(event)
+
+        if i % 50 == 0:
+            # A stable sort keeps events with the same date in insertion order
+            ordered = sorted(sorted(kept, key=lambda event: event.id), key=lambda event: event.minutes)
+            low = first + rng.randrange(500) * 30
+            high = low + rng.randrange(200) * 30
+            assert len(index) == len(kept)
+            assert index.between_minutes(low, high) == [event for event in ordered
+                                                         if low <= event.minutes < high]
+            offset = rng.randrange(len(kept) + 1)
+            assert index.page(offset, 20) == ordered[offset:offset + 20]
+
+
+def test_removing_an_event_that_is_not_indexed_raises_value_error():
+    event = Event('meeting', datetime(2025, 3, 3, 9), '', 'work', '', id=1)
+    index = TimeIndex([event])
+    index.remove(event)
+    with pytest.raises(ValueError):
+        index.remove(event)
+    assert len(index) == 0 and index.between_minutes(0, 2 ** 62) == []
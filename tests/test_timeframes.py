@@ -0,0 +1,57 @@
+from datetime import date, datetime
+
+import pytest
+
+from timeframes import Calendar, resolve_timeframe
+
+# A Wednesday
+NOW = datetime(2025, 5, 14, 15, 30)
+
+
+@pytest.mark.parametrize('timeframe, start, end', [
+    ('today', datetime(2025, 5, 14), datetime(2025, 5, 15)),
+    ('yesterday', datetime(2025, 5, 13), datetime(2025, 5, 14)),
+    ('tomorrow', datetime(2025, 5, 15), datetime(2025, 5, 16)),
+    ('this_week', datetime(2025, 5, 12), datetime(2025, 5, 19)),
+    ('last_week', datetime(2025, 5, 5), datetime(2025, 5, 12)),
+    ('next_week', datetime(2025, 5, 19), datetime(2025, 5, 26)),
+    ('this_month', datetime(2025, 5, 1), datetime(2025, 6, 1)),
+    ('last_month', datetime(2025, 4, 1), datetime(2025, 5, 1)),
+    ('next_month', datetime(2025, 6, 1), datetime(2025, 7, 1)),
+    ('this_quarter', datetime(2025, 4, 1), datetime(2025, 7, 1)),
+    ('last_quarter', datetime(2025, 1, 1), datetime(2025, 4, 1)),
+    ('next_year', datetime(2026, 1, 1), datetime(2027, 1, 1)),
+    ('last_7_days', datetime(2025, 5, 8), datetime(2025, 5, 15)),
+    ('next_1_day', datetime(2025, 5, 14), datetime(2025, 5, 15)),
+    ('01-05-2025..31-05-2025', datetime(2025, 5, 1), datetime(2025, 6, 1)),
+    ('01-05-2025 09:00..01-05-2025 17:30', datetime(2025, 5, 1, 9), datetime(2025, 5, 1, 17, 30)),
+    ('2025-05-01..2025-05-02T12:00', datetime(2025, 5, 1), datetime(2025, 5, 2, 12)),
+    ((date(2025, 5, 1), datetime(2025, 5, 3, 8)), datetime(2025, 5, 1), datetime(2025, 5, 3, 8)),
+])
+def test_windows_are_half_open_calendar_periods(timeframe, start, end):
+    assert resolve_timeframe(timeframe, NOW) == (start, end)
+
+
+def test_last_month_and_quarter_cross_the_year():
+    january = datetime(2025, 1, 20)
+    assert resolve_timeframe('last_month', january) == (datetime(2024, 12, 1), datetime(2025, 1, 1))
+    assert resolve_timeframe('last_quarter', january) == (datetime(2024, 10, 1), datetime(2025, 1, 1))
+
+
+def test_calendar_with_sunday_weeks_and_a_fiscal_year_from_april():
+    calendar = Calendar(week_start=6, year_start=4)
+    assert resolve_timeframe('this_week', NOW, calendar) == (datetime(2025, 5, 11), datetime(2025, 5, 18))
+    assert resolve_timeframe('this_year', NOW, calendar) == (datetime(2025, 4, 1), datetime(2026, 4, 1))
+    assert resolve_timeframe('this_quarter', datetime(2025, 3, 31), calendar) == \
+        (datetime(2025, 1, 1), datetime(2025, 4, 1))
+
+
+@pytest.mark.parametrize('timeframe', [
+    'someday', 'last_week_days', '31-02-2025..01-03-2025', '03-05-2025..01-05-2025', (NOW,), 42,
+    '2025-05-01T10:00+02:00..2025-05-02',
+    # Past the dates datetime can hold
+    'last_999999999_days', 'next_999999999_days', '01-01-9999..31-12-9999',
+])
+def test_invalid_timeframes_raise_value_error(timeframe):
+    with pytest.raises(ValueError):
+        resolve_timeframe(timeframe, NOW)
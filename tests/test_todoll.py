@@ -0,0 +1,46 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from todoll import read_import_file
+
+
+def write_json(tmp_path, rows):
+    path = tmp_path / 'import.json'
+    path.write_text(json.dumps(rows))
+    return str(path)
+
+
+def test_read_import_file_parses_csv(tmp_path):
+    path = tmp_path / 'import.csv'
+    path.write_text("name,date,comments,category,notifications,recurrence\n"
+                    "standup,03-03-2025 09:00,,work,,daily;count=5\n"
+                    "lunch,03-03-2025 12:00,,personal,,\n")
+
+    events = read_import_file(str(path))
+
+    assert [event['name'] for event in events] == ['standup', 'lunch']
+    assert events[0]['date'] == datetime(2025, 3, 3, 9)
+    assert str(events[0]['recurrence']) == 'daily;count=5'
+    assert events[1]['recurrence'] is None
+
+
+@pytest.mark.parametrize('bad_row, message', [
+    ({'name': 'b', 'date': '02-03-2025 09:00', 'recurrence': 'yearly'}, 'row 2: recurrence frequency'),
+    ({'name': 'b', 'date': 20250302}, 'row 2: date must be'),
+    ({'name': 'b', 'date': '2025-03-02'}, 'row 2:'),
+    ({'name': 'b'}, 'row 2: date must be'),
+    ({'name': ['b'], 'date': '02-03-2025 09:00'}, 'row 2: name must be a string'),
+    ('b', 'row 2: not an object'),
+])
+def test_read_import_file_rejects_invalid_rows(tmp_path, bad_row, message):
+    filename = write_json(tmp_path, [{'name': 'a', 'date': '01-03-2025 09:00'}, bad_row])
+
+    with pytest.raises(ValueError, match=message):
+        read_import_file(filename)
+
+
+def test_read_import_file_rejects_a_json_object(tmp_path):
+    with pytest.raises(ValueError):
+        read_import_file(write_json(tmp_path, {'name': 'a', 'date': '01-03-2025 09:00'}))
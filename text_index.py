@@ -0,0 +1,98 @@
+import heapq
+import math
+import re
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from itertools import islice
+
+TEXT_FIELDS = ('name', 'comments', 'notifications')
+_TOKEN = re.compile(r'\w+')
+# A word that only starts with the query term counts for less than an exact match
+PREFIX_WEIGHT = 0.5
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+# Inverted index over the free-text fields of events.
+#
+# `postings` maps each word to {event: term frequency}; `vocabulary` is the
+# sorted list of indexed words, so every word starting with a query term is
+# found with one bisect. Every query term must match (as a whole word or a
+# prefix) and results are ranked by tf-idf.
+class TextIndex:
+    def __init__(self, events=()):
+        self.postings = defaultdict(dict)
+        self.size = 0
+        for event in events:
+            self._add_terms(event)
+        # Sorted once; inserting every new word into the sorted list as it comes is quadratic
+        self.vocabulary = sorted(self.postings)
+
+    def _terms(self, event):
+        return Counter(token for field in TEXT_FIELDS for token in tokenize(getattr(event, field)))
+
+    def _add_terms(self, event):
+        # Returns the words seen for the first time
+        new = []
+        for term, count in self._terms(event).items():
+            postings = self.postings[term]
+            if not postings:
+                new.append(term)
+            postings[event] = count
+        self.size += 1
+        return new
+
+    def add(self, event):
+        for term in self._add_terms(event):
+            insort(self.vocabulary, term)
+
+    def remove(self, event):
+        for term in self._terms(event):
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(event, None)
+            if not postings:
+                del self.postings[term]
+                del self.vocabulary[bisect_left(self.vocabulary, term)]
+        self.size -= 1
+
+    def _expand(self, prefix):
+        """Indexed words starting with `prefix`."""
+        position = bisect_left(self.vocabulary, prefix)
+        while position < len(self.vocabulary) and self.vocabulary[position].startswith(prefix):
+            yield self.vocabulary[position]
+            position += 1
+
+    def _term_scores(self, term):
+        scores = defaultdict(float)
+        for word in self._expand(term):
+            postings = self.postings[word]
+            weight = math.log(1 + self.size / len(postings)) * (1 if word == term else PREFIX_WEIGHT)
+            for event, count in postings.items():
+                scores[event] += count * weight
+        return scores
+
+    def search(self, query, limit=20):
+        """Up to `limit` (event, score) pairs matching every term of `query`, best first."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        words = list(islice(self._expand(terms[0]), 2)) if len(terms) == 1 else []
+        if len(words) == 1:
+            # One word: its weight is the same for every match, so rank on the term
+            # frequencies directly instead of building a score per match
+            postings = self.postings[words[0]]
+            weight = math.log(1 + self.size / len(postings)) * (1 if words[0] == terms[0] else PREFIX_WEIGHT)
+            ranked = heapq.nlargest(limit, postings.items(), key=lambda item: (item[1], -item[0].minutes))
+            return [(event, count * weight) for event, count in ranked]
+        per_term = sorted((self._term_scores(term) for term in terms), key=len)
+        scores = per_term[0]
+        for other in per_term[1:]:
+            scores = {event: score + other[event] for event, score in scores.items() if event in other}
+            if not scores:
+                return []
+        # Ties go to the earlier event
+        return heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0].minutes))
@@ -0,0 +1,73 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+from events import minute_bounds
+
+
+# Date-sorted index over events.
+#
+# Keeps the events' integer minute stamps sorted in a compact array next to
+# the events in the same order, so a timeframe query is two binary searches
+# plus a slice instead of a full scan. Events with the same date stay in
+# insertion order.
+#
+# Removal does not shift the arrays: the event's slot is set to None (a
+# tombstone) and queries skip it. Once more than half the slots are
+# tombstones they are all dropped in one pass, so a removal costs O(log n)
+# amortized instead of moving every later entry.
+class TimeIndex:
+    def __init__(self, events=()):
+        ordered = sorted(events, key=lambda event: event.minutes)
+        self._minutes = array('q', [event.minutes for event in ordered])
+        self._events = ordered
+        self._removed = 0
+
+    def __len__(self):
+        return len(self._events) - self._removed
+
+    def add(self, event):
+        position = bisect_right(self._minutes, event.minutes)
+        self._minutes.insert(position, event.minutes)
+        self._events.insert(position, event)
+
+    def remove(self, event):
+        """Remove `event` (matched by identity) using its current date."""
+        position = bisect_left(self._minutes, event.minutes)
+        end = bisect_right(self._minutes, event.minutes, position)
+        for i in range(position, end):
+            if self._events[i] is event:
+                self._events[i] = None
+                self._removed += 1
+                if self._removed > len(self._events) // 2:
+                    self._compact()
+                return
+        raise ValueError("event is not in the index")
+
+    def _compact(self):
+        self._minutes = array('q', [minutes for minutes, event in zip(self._minutes, self._events)
+                                    if event is not None])
+        self._events = [event for event in self._events if event is not None]
+        self._removed = 0
+
+    def between(self, start, end, include_end=False):
+        """Events with start <= date < end (or <= end with `include_end`), in date order."""
+        # Event dates are whole minutes, so round the bounds to the minutes they admit
+        return self.between_minutes(*minute_bounds(start, end, include_end))
+
+    def page(self, offset, limit):
+        """`limit` events starting at position `offset` in date order."""
+        # Positions count live events only, so drop the tombstones first
+        if self._removed:
+            self._compact()
+        return self._events[offset:offset + limit]
+
+    def count_minutes(self, low, high):
+        """Number of slots in [low, high); removed events not yet compacted are counted too."""
+        return bisect_left(self._minutes, high) - bisect_left(self._minutes, low)
+
+    def between_minutes(self, low, high):
+        """Events whose minute stamp is in [low, high), in date order."""
+        events = self._events[bisect_left(self._minutes, low):bisect_left(self._minutes, high)]
+        if self._removed:
+            return [event for event in events if event is not None]
+        return events
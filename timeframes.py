@@ -0,0 +1,137 @@
+import re
+from datetime import date, datetime, timedelta
+
+from fast_dates import parse_event_date
+
+# Timeframes known by name; "last_N_days", "next_N_days" and date ranges are accepted as well
+TIMEFRAMES = ('today', 'yesterday', 'tomorrow', 'this_week', 'last_week', 'next_week', 'this_month', 'last_month',
+              'next_month', 'this_quarter', 'last_quarter', 'next_quarter', 'this_year', 'last_year', 'next_year')
+RANGE_SEPARATOR = '..'
+_DAYS = re.compile(r'(last|next)_(\d+)_days?')
+_SHIFTS = {'last': -1, 'this': 0, 'next': 1}
+_DAY = timedelta(days=1)
+
+
+# Calendar that the week, quarter and year timeframes follow.
+#
+# `week_start` is the first day of the week (0 = Monday ... 6 = Sunday) and
+# `year_start` the first month of the year, e.g. 4 for a fiscal year starting
+# in April; quarters are the three-month periods counted from it.
+class Calendar:
+    def __init__(self, week_start=0, year_start=1):
+        if not 0 <= week_start <= 6:
+            raise ValueError("week_start must be 0 (Monday) to 6 (Sunday)")
+        if not 1 <= year_start <= 12:
+            raise ValueError("year_start must be a month number from 1 to 12")
+        self.week_start = week_start
+        self.year_start = year_start
+
+    def week(self, day, shift=0):
+        """The [start, end) days of the week holding `day`, moved by `shift` weeks."""
+        start = day - timedelta(days=(day.weekday() - self.week_start) % 7) + timedelta(weeks=shift)
+        return start, start + timedelta(weeks=1)
+
+    def months(self, day, length, shift=0):
+        """The [start, end) days of the `length`-month period holding `day`, moved by `shift` periods.
+
+        Periods are aligned on the first month of the year, so length 3 gives
+        quarters and length 12 years.
+        """
+        # Months since the start of year 0 of this calendar
+        index = day.year * 12 + day.month - self.year_start
+        first = index - index % length + shift * length
+        return _month_day(first, self.year_start), _month_day(first + length, self.year_start)
+
+
+DEFAULT_CALENDAR = Calendar()
+
+
+def _month_day(index, year_start):
+    year, month = divmod(index + year_start - 1, 12)
+    return date(year, month + 1, 1)
+
+
+def _midnight(day):
+    return datetime(day.year, day.month, day.day)
+
+
+def _parse_bound(text, is_end):
+    # "DD-MM-YYYY HH:MM" or ISO 8601; a date without a time stands for the
+    # whole day, so as the end of a range it includes that day
+    text = text.strip()
+    for parse in (lambda value: datetime.strptime(value, '%d-%m-%Y').date(), date.fromisoformat):
+        try:
+            day = parse(text)
+        except ValueError:
+            continue
+        return _midnight(day + _DAY if is_end else day)
+    for parse in (parse_event_date, datetime.fromisoformat):
+        try:
+            moment = parse(text)
+        except ValueError:
+            continue
+        if moment.tzinfo is not None:
+            raise ValueError(f"{text!r}: timeframes use local time without a UTC offset")
+        return moment
+    raise ValueError(f"invalid date {text!r} in timeframe; use DD-MM-YYYY [HH:MM] or ISO 8601")
+
+
+# Function to turn a timeframe into the half-open [start, end) window of
+# datetimes it covers.
+#
+# `timeframe` is one of:
+#   - a name from TIMEFRAMES, where days start at midnight and weeks, months,
+#     quarters and years are whole calendar periods of `calendar`
+#   - "last_N_days" (the N days up to and including today) or "next_N_days"
+#     (today and the N - 1 days after it)
+#   - "START..END" with dates as DD-MM-YYYY [HH:MM] or ISO 8601; a date
+#     without a time covers its whole day, so "01-01-2025..31-01-2025" is
+#     all of January
+#   - a (start, end) pair of datetimes or dates, used as is
+# Anything else raises ValueError.
+def resolve_timeframe(timeframe, now=None, calendar=None):
+    try:
+        start, end = _window(timeframe, now, calendar or DEFAULT_CALENDAR)
+    except OverflowError:
+        # e.g. last_999999999_days, or a range ending on 31-12-9999, reach past what datetime can hold
+        raise ValueError(f"timeframe {timeframe!r} reaches outside the supported dates") from None
+    if end < start:
+        raise ValueError(f"timeframe {timeframe!r} ends before it starts")
+    return start, end
+
+
+def _window(timeframe, now, calendar):
+    if isinstance(timeframe, (tuple, list)):
+        if len(timeframe) != 2:
+            raise ValueError("a timeframe range must be a (start, end) pair")
+        return tuple(value if isinstance(value, datetime) else _midnight(value) for value in timeframe)
+    if not isinstance(timeframe, str):
+        raise ValueError(f"invalid timeframe {timeframe!r}")
+    if RANGE_SEPARATOR in timeframe:
+        first, _, last = timeframe.partition(RANGE_SEPARATOR)
+        return _parse_bound(first, False), _parse_bound(last, True)
+    return _named_window(timeframe.strip().lower(), (now or datetime.now()).date(), calendar)
+
+
+def _named_window(name, today, calendar):
+    if name in ('today', 'yesterday', 'tomorrow'):
+        day = today + _DAY * {'yesterday': -1, 'today': 0, 'tomorrow': 1}[name]
+        return _midnight(day), _midnight(day + _DAY)
+
+    match = _DAYS.fullmatch(name)
+    if match is not None:
+        direction, count = match.group(1), int(match.group(2))
+        if direction == 'last':
+            return _midnight(today - _DAY * (count - 1)), _midnight(today + _DAY)
+        return _midnight(today), _midnight(today + _DAY * count)
+
+    shift, _, period = name.partition('_')
+    if shift in _SHIFTS and period in ('week', 'month', 'quarter', 'year'):
+        if period == 'week':
+            start, end = calendar.week(today, _SHIFTS[shift])
+        else:
+            start, end = calendar.months(today, {'month': 1, 'quarter': 3, 'year': 12}[period], _SHIFTS[shift])
+        return _midnight(start), _midnight(end)
+
+    raise ValueError(f"unknown timeframe {name!r}; use one of {', '.join(TIMEFRAMES)}, last_N_days, "
+                     f"next_N_days or START{RANGE_SEPARATOR}END")
@@ -3,33 +3,21 @@ from datetime import datetime, timedelta
 import streamlit as st
 import base64
 
+from events import Event
+from journal import check_no_journal, write_csv_atomic
+from time_index import TimeIndex
+
 # Function to encode an image into base64
 def get_base64_image(image_path):
     with open(image_path, "rb") as img_file:
         return base64.b64encode(img_file.read()).decode()
 
-# Class for Event and EventManager
-class Event:
-    def __init__(self, name, date, comments, category, notifications):
-        self.name = name
-        self.date = date
-        self.comments = comments
-        self.category = category
-        self.notifications = notifications
-
-    def to_dict(self):
-        return {
-            'name': self.name,
-            'date': self.date.strftime('%d-%m-%Y %H:%M'),
-            'comments': self.comments,
-            'category': self.category,
-            'notifications': self.notifications
-        }
-
+# Class for EventManager
 class EventManager:
     def __init__(self, filename='events.csv'):
         self.filename = filename
         self.events = self.load_events()
+        self.time_index = TimeIndex(self.events)
 
     def load_events(self):
         events = []
@@ -37,31 +25,33 @@ class EventManager:
             with open(self.filename, mode='r', newline='') as file:
                 reader = csv.DictReader(file)
                 for row in reader:
-                    row['date'] = datetime.strptime(row['date'], '%d-%m-%Y %H:%M')
-                    events.append(
-                        Event(row['name'], row['date'], row['comments'], row['category'], row['notifications']))
+                    events.append(Event.from_dict(row))
         except FileNotFoundError:
             pass
         return events
 
     def save_events(self):
-        with open(self.filename, mode='w', newline='') as file:
-            writer = csv.DictWriter(file, fieldnames=['name', 'date', 'comments', 'category', 'notifications'])
-            writer.writeheader()
-            for event in self.events:
-                writer.writerow(event.to_dict())
+        # Same columns (recurrence included) and atomic replace as the other front ends.
+        # This page does not read journals, so it must not rewrite a journal's snapshot.
+        check_no_journal(self.filename)
+        write_csv_atomic(self.filename, [event.to_dict() for event in self.events])
 
     def add_event(self, name, date, comments, category, notifications):
         event = Event(name, date, comments, category, notifications)
         self.events.append(event)
+        self.time_index.add(event)
         self.save_events()
 
     def remove_event(self, index):
         """Method to remove an event by its index."""
         if 0 <= index < len(self.events):
-            self.events.pop(index)
+            self.time_index.remove(self.events.pop(index))
             self.save_events()
 
+    def events_between(self, start, end):
+        """Return the events with start <= date < end, sorted by date."""
+        return self.time_index.between(start, end)
+
     def filter_events(self, timeframe="today", category=""):
         now = datetime.now()
         filtered_events = []
@@ -77,10 +67,9 @@ class EventManager:
             end = (start.replace(month=start.month % 12 + 1, day=1) if start.month < 12 else start.replace(month=1, year=start.year+1))
 
         # Filter events based on category and timeframe
-        for event in self.events:
-            if start <= event.date < end:
-                if category.lower() in event.category.lower() if category else True:
-                    filtered_events.append(event)
+        for event in self.events_between(start, end):
+            if category.lower() in event.category.lower() if category else True:
+                filtered_events.append(event)
 
         return filtered_events
 
@@ -101,12 +90,11 @@ class EventManager:
             end_time = end_time.replace(hour=23, minute=59, second=59, microsecond=999999)
 
         # Filter events within the time range
-        for event in self.events:
-            if start_time <= event.date <= end_time:
-                category = event.category
-                if category not in summary:
-                    summary[category] = 0
-                summary[category] += 1
+        for event in self.time_index.between(start_time, end_time, include_end=True):
+            category = event.category
+            if category not in summary:
+                summary[category] = 0
+            summary[category] += 1
 
         return summary
 
@@ -179,8 +167,11 @@ def show_todo_page(image_path):
 
             if st.button("Add Event"):
                 event_date = datetime.combine(date, time)
-                manager.add_event(name, event_date, comments, category, notifications)
-                st.success("Event added successfully!")
+                try:
+                    manager.add_event(name, event_date, comments, category, notifications)
+                    st.success("Event added successfully!")
+                except ValueError as error:
+                    st.error(f"Event not saved: {error}")
 
         elif option == "Remove Event":
             events = manager.events
@@ -189,8 +180,11 @@ def show_todo_page(image_path):
                 event_to_remove = st.selectbox("Select an event to remove", event_names)
                 index = int(event_to_remove.split(":")[0])
                 if st.button("Remove Event"):
-                    manager.remove_event(index)
-                    st.success("Event removed successfully!")
+                    try:
+                        manager.remove_event(index)
+                        st.success("Event removed successfully!")
+                    except ValueError as error:
+                        st.error(f"Event not removed: {error}")
             else:
                 st.write("No events found to remove.")
 
@@ -1,112 +1,17 @@
 import csv
-from datetime import datetime, timedelta
-
-
-class Event:
-    def __init__(self, name, date, comments, category, notifications):
-        self.name = name
-        self.date = date
-        self.comments = comments
-        self.category = category
-        self.notifications = notifications
-
-    def to_dict(self):
-        return {
-            'name': self.name,
-            'date': self.date.strftime('%d-%m-%Y %H:%M'),
-            'comments': self.comments,
-            'category': self.category,
-            'notifications': self.notifications
-        }
-
-
-class EventManager:
-    def __init__(self, filename='events.csv'):
-        self.filename = filename
-        self.events = self.load_events()
-
-    def load_events(self):
-        events = []
-        try:
-            with open(self.filename, mode='r', newline='') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    row['date'] = datetime.strptime(row['date'], '%d-%m-%Y %H:%M')
-                    events.append(
-                        Event(row['name'], row['date'], row['comments'], row['category'], row['notifications']))
-        except FileNotFoundError:
-            pass
-        return events
-
-    def save_events(self):
-        with open(self.filename, mode='w', newline='') as file:
-            writer = csv.DictWriter(file, fieldnames=['name', 'date', 'comments', 'category', 'notifications'])
-            writer.writeheader()
-            for event in self.events:
-                writer.writerow(event.to_dict())
-
-    def add_event(self, name, date, comments, category, notifications):
-        event = Event(name, date, comments, category, notifications)
-        self.events.append(event)
-        self.save_events()
-
-    def edit_event(self, index, **kwargs):
-        for key, value in kwargs.items():
-            if value is not None:
-                setattr(self.events[index], key, value)
-        self.save_events()
-
-    def remove_event(self, index):
-        del self.events[index]
-        self.save_events()
-
-    def filter_events(self, timeframe, category=None):
-        now = datetime.now()
-
-        # Set the start and end based on the timeframe
-        if timeframe == 'today':
-            start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            end = now.replace(hour=23, minute=59, second=59)
-        elif timeframe == 'this_week':
-            start = now - timedelta(days=now.weekday())
-            end = start + timedelta(days=6, hours=23, minutes=59, seconds=59)
-        elif timeframe == 'this_month':
-            start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            end = (start + timedelta(days=31)).replace(day=1) - timedelta(seconds=1)
-        else:
-            return []  # Return an empty list if the timeframe is invalid
-
-        filtered_events = [event for event in self.events if start <= event.date <= end]
-        return [event for event in filtered_events if event.category == category] if category else filtered_events
-
-    def summarize_events(self, timeframe):
-        now = datetime.now()
-
-        if timeframe == 'today':
-            start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            end = now.replace(hour=23, minute=59, second=59)
-        elif timeframe == 'this_week':
-            start = now - timedelta(days=now.weekday())
-            end = start + timedelta(days=6, hours=23, minutes=59, seconds=59)
-        elif timeframe == 'this_month':
-            start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            end = (start + timedelta(days=31)).replace(day=1) - timedelta(seconds=1)
-        else:
-            return {}  # Return an empty dict if the timeframe is invalid
+import json
+from datetime import datetime
 
-        # Summarizing the number of events by category
-        summary = {}
-        for event in self.events:
-            if start <= event.date <= end:
-                summary[event.category] = summary.get(event.category, 0) + 1
+from concurrency import ConflictError
+from event_manager import EventManager
+from events import Recurrence
+from fast_dates import parse_event_date
 
-        return summary
 
-    def list_events(self):
-        return self.events
+TIMEFRAME_PROMPT = "Timeframe (e.g. today, this_week, last_month, next_7_days or DD-MM-YYYY..DD-MM-YYYY): "
 
 
-def get_valid_input(prompt, is_date=False):
+def get_valid_input(prompt, is_date=False, is_recurrence=False):
     while True:
         user_input = input(prompt).strip()
         if not user_input:
@@ -116,15 +21,67 @@ def get_valid_input(prompt, is_date=False):
                 return datetime.strptime(user_input, '%d-%m-%Y %H:%M')
             except ValueError:
                 print("Invalid date format. Please try again (DD-MM-YYYY HH:MM).")
+        elif is_recurrence:
+            if user_input.lower() == 'none':
+                return ''  # Stop repeating
+            try:
+                return Recurrence.parse(user_input)
+            except ValueError as error:
+                print(f"Invalid recurrence: {error}. Please try again (e.g. weekly;count=10).")
         else:
             return user_input
 
 
+IMPORT_TEXT_FIELDS = ('name', 'comments', 'category', 'notifications', 'recurrence')
+
+
+# Function to read events for a bulk import from a CSV file (with the events.csv
+# columns) or a JSON file holding a list of objects with the same keys.
+#
+# Every row is checked before anything is imported; the first invalid one
+# raises ValueError naming its row number.
+def read_import_file(filename):
+    with open(filename, mode='r', newline='') as file:
+        if filename.lower().endswith('.json'):
+            rows = json.load(file)
+        else:
+            rows = list(csv.DictReader(file))
+    if not isinstance(rows, list):
+        raise ValueError("a JSON import must hold a list of events")
+    events = []
+    for number, row in enumerate(rows, start=1):
+        try:
+            events.append(_import_event(row))
+        except ValueError as error:
+            raise ValueError(f"row {number}: {error}") from None
+    return events
+
+
+def _import_event(row):
+    if not isinstance(row, dict):
+        raise ValueError("not an object with the events.csv keys")
+    for key in IMPORT_TEXT_FIELDS:
+        if not isinstance(row.get(key) or '', str):
+            raise ValueError(f"{key} must be a string")
+    if not isinstance(row.get('date'), str):
+        raise ValueError("date must be a DD-MM-YYYY HH:MM string")
+    return {'name': row.get('name') or None,
+            'date': parse_event_date(row['date']),
+            'comments': row.get('comments') or None,
+            'category': row.get('category') or None,
+            'notifications': row.get('notifications') or None,
+            'recurrence': Recurrence.parse(row.get('recurrence'))}
+
+
 def main():
-    manager = EventManager()
+    # The same storage as the Streamlit app and the event API, which share events.csv
+    manager = EventManager(storage='journal')
 
     while True:
-        print("\nOptions: add, edit, remove, list, filter, summarize, exit")
+        # Another process (or the Streamlit app) may have changed the events
+        manager.refresh()
+
+        print("\nOptions: add, import, edit, remove, list, filter, summarize, search, exit")
         option = input("Choose an option: ").strip().lower()
 
         if option == 'add':
@@ -133,12 +90,24 @@ def main():
             comments = get_valid_input("Comments: ")
             category = get_valid_input("Category: ")
             notifications = get_valid_input("Notifications: ")
-            manager.add_event(name, date, comments, category, notifications)
+            recurrence = get_valid_input("Repeats (daily, weekly or monthly[;interval=N][;count=N]"
+                                         "[;until=DD-MM-YYYY HH:MM], leave blank for no): ", is_recurrence=True)
+            manager.add_event(name, date, comments, category, notifications, recurrence)
+
+        elif option == 'import':
+            filename = input("CSV or JSON file to import: ").strip()
+            try:
+                # One batch: a failure leaves none of the file's events behind
+                events = manager.add_events(read_import_file(filename))
+            except (OSError, ValueError, ConflictError) as error:
+                print(f"Could not import {filename}: {error}")
+                continue
+            print(f"Imported {len(events)} event(s).")
 
         elif option == 'edit':
-            index = int(input("Event index to edit: "))
-            if index < 0 or index >= len(manager.events):
-                print("Invalid index. Please try again.")
+            event_id = int(input("Event id to edit: "))
+            if manager.get_event(event_id) is None:
+                print("Invalid id. Please try again.")
                 continue
 
             name = get_valid_input("New event name (leave blank for no change): ")
@@ -146,49 +115,71 @@ def main():
             comments = get_valid_input("New comments (leave blank for no change): ")
             category = get_valid_input("New category (leave blank for no change): ")
             notifications = get_valid_input("New notifications (leave blank for no change): ")
-            manager.edit_event(index, name=name, date=date, comments=comments, category=category,
-                               notifications=notifications)
+            recurrence = get_valid_input("New recurrence (leave blank for no change, 'none' to stop repeating): ",
+                                         is_recurrence=True)
+            try:
+                manager.edit_event(event_id, name=name, date=date, comments=comments, category=category,
+                                   notifications=notifications, recurrence=recurrence)
+            except ConflictError as error:
+                print(f"Not saved: {error}. Please try again.")
 
         elif option == 'remove':
-            index = int(input("Event index to remove: "))
-            if index < 0 or index >= len(manager.events):
-                print("Invalid index. Please try again.")
+            event_id = int(input("Event id to remove: "))
+            if manager.get_event(event_id) is None:
+                print("Invalid id. Please try again.")
                 continue
-            manager.remove_event(index)
+            try:
+                manager.remove_event(event_id)
+            except ConflictError as error:
+                print(f"Not removed: {error}. Please try again.")
 
         elif option == 'list':
             events = manager.list_events()
             if not events:
                 print("No events found.")
             else:
-                for idx, event in enumerate(events):
-                    print(f"[{idx}] {event.name} - {event.date} - {event.category}")
+                for event in events:
+                    print(f"[{event.id}] {event.name} - {event.date} - {event.category}")
 
         elif option == 'filter':
             while True:
-                timeframe = input("Timeframe (today, this_week, this_month): ").strip().lower()
+                timeframe = input(TIMEFRAME_PROMPT).strip()
                 category = input("Category (leave blank for all): ").strip()
 
-                if timeframe in ['today', 'this_week', 'this_month']:
+                try:
                     events = manager.filter_events(timeframe, category or None)
-                    if not events:
-                        print("No events found for the specified criteria.")
-                    else:
-                        for event in events:
-                            print(f"{event.name} - {event.date} - {event.category}")
-                    break
+                except ValueError as error:
+                    print(f"Invalid timeframe: {error}. Please try again.")
+                    continue
+                if not events:
+                    print("No events found for the specified criteria.")
                 else:
-                    print("Invalid timeframe. Please try again.")
+                    for event in events:
+                        print(f"{event.name} - {event.date} - {event.category}")
+                break
 
         elif option == 'summarize':
-            timeframe = input("Timeframe (today, this_week, this_month): ").strip().lower()
-            summary = manager.summarize_events(timeframe)
+            timeframe = input(TIMEFRAME_PROMPT).strip()
+            try:
+                summary = manager.summarize_events(timeframe)
+            except ValueError as error:
+                print(f"Invalid timeframe: {error}")
+                continue
             if not summary:
                 print("No events found for the specified timeframe.")
             else:
                 for category, count in summary.items():
                     print(f"{category}: {count} event(s)")
 
+        elif option == 'search':
+            query = input("Search text: ").strip()
+            events = manager.search(query)
+            if not events:
+                print("No events found.")
+            else:
+                for event in events:
+                    print(f"{event.name} - {event.date} - {event.category}")
+
         elif option == 'exit':
             break
 
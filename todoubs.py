@@ -3,6 +3,8 @@ from datetime import datetime, timedelta
 import streamlit as st
 import base64
 
+from journal import check_no_journal
+
 # Function to encode an image into base64
 def get_base64_image(image_path):
     with open(image_path, "rb") as img_file:
@@ -45,6 +47,8 @@ class EventManager:
         return events
 
     def save_events(self):
+        # This page does not read journals, so it must not rewrite a journal's snapshot
+        check_no_journal(self.filename)
         with open(self.filename, mode='w', newline='') as file:
             writer = csv.DictWriter(file, fieldnames=['name', 'date', 'comments', 'category', 'notifications'])
             writer.writeheader()
@@ -179,8 +183,11 @@ def show_todo_page(image_path):
 
             if st.button("Add Event"):
                 event_date = datetime.combine(date, time)
-                manager.add_event(name, event_date, comments, category, notifications)
-                st.success("Event added successfully!")
+                try:
+                    manager.add_event(name, event_date, comments, category, notifications)
+                    st.success("Event added successfully!")
+                except ValueError as error:
+                    st.error(f"Event not saved: {error}")
 
         elif option == "Remove Event":
             events = manager.events
@@ -189,8 +196,11 @@ def show_todo_page(image_path):
                 event_to_remove = st.selectbox("Select an event to remove", event_names)
                 index = int(event_to_remove.split(":")[0])
                 if st.button("Remove Event"):
-                    manager.remove_event(index)
-                    st.success("Event removed successfully!")
+                    try:
+                        manager.remove_event(index)
+                        st.success("Event removed successfully!")
+                    except ValueError as error:
+                        st.error(f"Event not removed: {error}")
             else:
                 st.write("No events found to remove.")
 